@@ -1,5 +1,7 @@
 """Build command handler for goobits CLI."""
 
+import shutil
+import subprocess
 from pathlib import Path
 from typing import Optional
 
@@ -48,6 +50,38 @@ def _detect_main_cli_path(language: str, generated_files: list[str]) -> Path:
     return Path()
 
 
+def _compile_typescript(output_dir: Path) -> None:
+    """Compile the generated TypeScript with tsc so the CLI runs right away."""
+    local_tsc = output_dir / "node_modules" / ".bin" / "tsc"
+    tsc = str(local_tsc) if local_tsc.exists() else shutil.which("tsc")
+    fallback = (
+        f"run `npm install && npm run build` in {output_dir} before using the CLI"
+    )
+
+    if tsc is None:
+        typer.echo(f"\u26a0\ufe0f  TypeScript compiler not found; {fallback}", err=True)
+        return
+
+    try:
+        result = subprocess.run(
+            [tsc, "-p", "tsconfig.json"],
+            cwd=output_dir,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        typer.echo(f"\u26a0\ufe0f  Could not run tsc ({e}); {fallback}", err=True)
+        return
+
+    if result.returncode != 0:
+        typer.echo(f"\u26a0\ufe0f  tsc failed; {fallback}", err=True)
+        typer.echo((result.stdout or result.stderr).strip(), err=True)
+        return
+
+    typer.echo("\u2705 Compiled TypeScript with tsc")
+
+
 def build_command(
     config_path: Optional[Path] = typer.Argument(
         None, help="Path to goobits.yaml file (defaults to ./goobits.yaml)"
@@ -215,6 +249,13 @@ def build_command(
                 )
                 continue
 
+            # Only write tsconfig.json if the project does not have one yet
+            if full_path.name == "tsconfig.json" and full_path.exists():
+                typer.echo(
+                    f"⏭️  Skipping {full_path} (exists - preserving user configuration)"
+                )
+                continue
+
             # Ensure parent directories exist
             full_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -397,9 +438,9 @@ def build_command(
 
         typer.echo(f"\u2705 Generated setup script: {setup_output_path}")
 
-    # Update package manifests for Node.js and Rust
+    # Update package manifests for Node.js, TypeScript and Rust
     for language in target_languages:
-        if language in ["nodejs", "rust"]:
+        if language in ["nodejs", "typescript", "rust"]:
             from goobits_cli.core.manifest import update_manifests_for_build
 
             # Get CLI output path from generated files
@@ -433,7 +474,7 @@ def build_command(
                     "\u2705 CLI generated successfully, but manifest update failed"
                 )
             else:
-                manifest_file = "package.json" if language == "nodejs" else "Cargo.toml"
+                manifest_file = "Cargo.toml" if language == "rust" else "package.json"
                 typer.echo(f"\u2705 Updated {manifest_file} with CLI configuration")
 
             # Display any warnings from the manifest update
@@ -441,6 +482,10 @@ def build_command(
             for warning in warnings:
                 typer.echo(f"\u26a0\ufe0f  {warning}", err=True)
 
+            # Emit cli.js next to cli.ts, with package.json in place
+            if language == "typescript":
+                _compile_typescript(manifest_output_dir)
+
     logger.info("Build operation completed successfully")
     typer.echo("\U0001f389 Build completed successfully!")
 
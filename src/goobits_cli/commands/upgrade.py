@@ -44,7 +44,11 @@ def upgrade_command(
 
     try:
         result = run_cached(
-            ["pipx", "--version"], capture_output=True, text=True, check=True
+            ["pipx", "--version"],
+            capture_output=True,
+            text=True,
+            check=True,
+            persist=True,
         )
 
         typer.echo(f"Using pipx version: {result.stdout.strip()}")
@@ -63,6 +63,7 @@ from .schemas import (
     OptionSchema,
     PythonConfigSchema,
     RichConfigSchema,
+    ServerModeSchema,
     ShellIntegrationSchema,
     ValidationSchema,
 )
@@ -103,6 +104,7 @@ __all__ = [
     "ValidationSchema",
     "MessagesSchema",
     "InteractiveModeSchema",
+    "ServerModeSchema",
     "FeaturesSchema",
     # Logging
     "setup_logging",
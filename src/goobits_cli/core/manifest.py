@@ -47,6 +47,7 @@ class ManifestUpdater:
         cli_name: str,
         cli_file: str,
         dependencies: Optional[Dict[str, str]] = None,
+        typescript: bool = False,
     ):
         """
         Atomically update package.json with CLI configuration and dependencies.
@@ -56,6 +57,7 @@ class ManifestUpdater:
             cli_name: Name of the CLI command
             cli_file: Path to the generated CLI file
             dependencies: Optional additional dependencies to merge
+            typescript: Also add the build script and TypeScript toolchain
         """
         try:
             # Create backup
@@ -72,6 +74,8 @@ class ManifestUpdater:
             warnings = self._merge_nodejs_config(
                 package_data, cli_name, cli_file, dependencies
             )
+            if typescript:
+                self._merge_typescript_config(package_data)
 
             # Atomic write
             self._atomic_write_json(package_json_path, package_data)
@@ -202,6 +206,20 @@ class ManifestUpdater:
 
         return warnings
 
+    def _merge_typescript_config(self, package_data: Dict[str, Any]) -> None:
+        """
+        Add the incremental tsc build to package.json without overwriting user data.
+
+        The build script compiles cli.ts and the user's hooks in place with the
+        generated tsconfig.json, producing the cli.js that bin points at.
+        """
+        scripts = package_data.setdefault("scripts", {})
+        scripts.setdefault("build", "tsc -p tsconfig.json")
+
+        dev_dependencies = package_data.setdefault("devDependencies", {})
+        for dep, version in {"typescript": "^5.0.0", "@types/node": "^18.0.0"}.items():
+            dev_dependencies.setdefault(dep, version)
+
     def extract_nodejs_import_dependencies(
         self, cli_source_path: Path
     ) -> Dict[str, str]:
@@ -210,7 +228,10 @@ class ManifestUpdater:
             return {}
 
         content = cli_source_path.read_text(encoding="utf-8")
-        imports = re.findall(r"from\s+['\"]([^'\"]+)['\"]", content)
+        # Static imports plus lazily loaded modules (import('x') / lazyRequire('x'))
+        imports = re.findall(
+            r"(?:from\s+|import\(\s*|lazyRequire\(\s*)['\"]([^'\"]+)['\"]", content
+        )
 
         stdlib_modules = {
             "assert",
@@ -377,19 +398,26 @@ def update_manifests_for_build(
     all_warnings = []
 
     try:
-        if language == "nodejs":
+        if language in ("nodejs", "typescript"):
             package_json_path = output_dir / "package.json"
+            generated_cli_path = output_dir / cli_path
+            if language == "typescript" and cli_path.suffix == ".ts":
+                # bin points at the JavaScript tsc emits next to cli.ts
+                cli_path = cli_path.with_suffix(".js")
             cli_file = cli_path.as_posix()
 
             # Extract additional dependencies from config if present
             extra_deps = dict(extras_config.get("npm", {}))
-            generated_cli_path = output_dir / cli_path
             extra_deps.update(
                 updater.extract_nodejs_import_dependencies(generated_cli_path)
             )
 
             result = updater.update_package_json(
-                package_json_path, cli_name, cli_file, extra_deps
+                package_json_path,
+                cli_name,
+                cli_file,
+                extra_deps,
+                typescript=language == "typescript",
             )
 
             if result.is_err():
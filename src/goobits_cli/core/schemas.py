@@ -4,7 +4,7 @@ This module defines all schema classes used for validating YAML configuration
 files. Supports multi-language CLI generation: Python, Node.js, TypeScript, and Rust.
 """
 
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -106,6 +106,7 @@ class CLISchema(BaseModel):
     icon: Optional[str] = None
     header_sections: Optional[List[HeaderSectionSchema]] = None
     footer_note: Optional[str] = None
+    colors: Optional[bool] = True
     options: Optional[List[OptionSchema]] = Field(default_factory=list)
     commands: Dict[str, CommandSchema]
     command_groups: Optional[List[CommandGroupSchema]] = None
@@ -272,12 +273,50 @@ class InteractiveModeSchema(BaseModel):
     max_history: int = 1000  # Maximum commands to remember
 
 
+class ServerModeSchema(BaseModel):
+    """Schema for warm-process server mode (Python only).
+
+    The first invocation starts a background server that keeps the CLI and
+    its hooks imported; later invocations are forwarded to it over a per-user
+    Unix socket by a small client stub.
+    """
+
+    enabled: bool = False  # Opt-in: forward invocations to a warm server
+    idle_timeout: int = Field(default=300, ge=1)  # Seconds before an idle server exits
+
+
 class FeaturesSchema(BaseModel):
     """Schema for optional CLI features."""
 
     interactive_mode: Optional[InteractiveModeSchema] = Field(
         default_factory=InteractiveModeSchema
     )
+    server_mode: Optional[ServerModeSchema] = Field(default_factory=ServerModeSchema)
+
+
+class PerformanceSchema(BaseModel):
+    """Schema for release build tuning of generated CLIs (Rust only).
+
+    ``goal`` picks a Cargo release profile and dependency feature set:
+    ``size`` for the smallest binary, ``startup`` for the lowest start
+    latency, ``throughput`` for the fastest hot paths. The remaining fields
+    override individual profile settings.
+    """
+
+    goal: Optional[Literal["size", "startup", "throughput"]] = None
+    opt_level: Optional[Union[Literal["s", "z"], int]] = None  # 0-3, "s" or "z"
+    lto: Optional[Union[bool, Literal["thin", "fat", "off"]]] = None
+    codegen_units: Optional[int] = Field(default=None, ge=1)
+    panic: Optional[Literal["unwind", "abort"]] = None
+    strip: Optional[Union[bool, Literal["symbols", "debuginfo"]]] = None
+
+    @field_validator("opt_level")
+    @classmethod
+    def validate_opt_level(cls, v):
+        """Cargo accepts opt-level 0-3 besides "s" and "z"."""
+        if isinstance(v, int) and not 0 <= v <= 3:
+            raise ValueError("opt_level must be 0-3, 's' or 'z'")
+        return v
 
 
 class GoobitsConfigSchema(BaseModel):
@@ -338,6 +377,9 @@ class GoobitsConfigSchema(BaseModel):
     # Optional feature configuration
     features: Optional[FeaturesSchema] = Field(default_factory=FeaturesSchema)
 
+    # Release build tuning
+    performance: Optional[PerformanceSchema] = Field(default_factory=PerformanceSchema)
+
     # CLI configuration is required for generation.
     cli: CLISchema
 
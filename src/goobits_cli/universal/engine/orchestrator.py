@@ -86,7 +86,7 @@ class Orchestrator:
             config_path: Path to goobits.yaml
             language: Target language (python, nodejs, typescript, rust)
             output_dir: Directory for generated files
-            consolidate: Whether to consolidate into single file (Python only)
+            consolidate: Whether to bundle the Python modules into a zipapp (Python only)
             dry_run: If True, don't write files
             with_integrations: If True, apply completion/interactive/plugin integrations
 
@@ -140,6 +140,20 @@ class Orchestrator:
         except Exception as e:
             raise RenderError(f"Rendering failed: {e}") from e
 
+        if consolidate and language == "python" and not dry_run:
+            try:
+                # Stage 4.5: Bundle the Python modules into <cli>.pyz. The hooks
+                # stub is still written so users have a file to implement.
+                rendered_files = {
+                    **renderer.consolidate_files(
+                        stages.with_existing_hooks(rendered_files, output_dir),
+                        output_dir,
+                    ),
+                    **stages.hooks_files(rendered_files),
+                }
+            except Exception as e:
+                raise GeneratorError(f"Failed to consolidate files: {e}") from e
+
         try:
             # Stage 5: Write files
             return stages.write_files(rendered_files, output_dir, dry_run)
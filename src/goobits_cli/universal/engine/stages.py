@@ -193,15 +193,110 @@ def render_with_templates(
             )
             rendered_files[output_path] = rendered_content
 
+    rendered_files.update(render_completion_scripts(ir, language))
+
     return rendered_files
 
 
+# Completion script names by shell, following the usual completion directories
+_COMPLETION_SCRIPTS = {
+    "bash": "completions/{cli}-completion.bash",
+    "zsh": "completions/_{cli}",
+    "fish": "completions/{cli}.fish",
+}
+
+
+def render_completion_scripts(ir: Dict[str, Any], language: str) -> Dict[str, str]:
+    """
+    Render the shell scripts completing the CLI through the completion server.
+
+    Each script sends the CLI's command tree with every request, so the
+    server completes its subcommands and options along with files, history
+    and the rest. Server and fallback run ``python3 -m`` goobits-cli, which
+    only Python CLIs can expect next to them; the other languages keep their
+    native completion (commander, clap) alone.
+
+    Args:
+        ir: Intermediate representation dictionary
+        language: Target language
+
+    Returns:
+        Dictionary mapping script paths to their content; empty if completion
+        is disabled or the CLI is not written in Python
+    """
+    from ..integrations.completion.daemon import command_tree, completion_shim
+
+    cli = ir.get("cli") or {}
+    completion = cli.get("completion") or {}
+    cli_name = (ir.get("project") or {}).get("command_name") or (
+        cli.get("root_command") or {}
+    ).get("name")
+    if language != "python" or not completion.get("enabled") or not cli_name:
+        return {}
+
+    tree = command_tree(cli)
+    return {
+        _COMPLETION_SCRIPTS[shell].format(cli=cli_name): completion_shim(
+            shell, cli_name, language, python="python3", tree=tree
+        )
+        for shell in completion.get("shells", [])
+        if shell in _COMPLETION_SCRIPTS
+    }
+
+
 def _is_hooks_file(path: Path) -> bool:
     """Check if a file is a hooks file that should be preserved."""
     name = path.name.lower()
     return "hooks" in name and name.endswith(".py")
 
 
+def hooks_files(files: Dict[str, str]) -> Dict[str, str]:
+    """
+    Select the hooks files from a set of rendered files.
+
+    Args:
+        files: Dictionary mapping file paths to content
+
+    Returns:
+        Dictionary with only the hooks files
+    """
+    return {
+        file_path: content
+        for file_path, content in files.items()
+        if _is_hooks_file(Path(file_path))
+    }
+
+
+def with_existing_hooks(
+    files: Dict[str, str], output_dir: Optional[Path] = None
+) -> Dict[str, str]:
+    """
+    Replace generated hooks files with the ones already on disk.
+
+    write_files never overwrites existing hooks; steps that package the
+    rendered files must bundle the user's implementations the same way.
+
+    Args:
+        files: Dictionary mapping file paths to content
+        output_dir: Base directory (paths may be absolute)
+
+    Returns:
+        Dictionary with existing hooks files' content substituted
+    """
+    result = dict(files)
+
+    for file_path in files:
+        path = Path(file_path)
+
+        if output_dir and not path.is_absolute():
+            path = output_dir / path
+
+        if _is_hooks_file(path) and path.exists():
+            result[file_path] = path.read_text(encoding="utf-8")
+
+    return result
+
+
 def write_artifacts(
     artifacts: List[Artifact],
     output_dir: Path,
@@ -402,6 +497,7 @@ __all__ = [
     "build_frozen_ir",
     "render",
     "render_with_templates",
+    "render_completion_scripts",
     "write_artifacts",
     "write_files",
     "pipeline",
@@ -9,6 +9,7 @@ that work across all supported languages (Python, Node.js, TypeScript, Rust).
 """
 
 from .providers import (
+    CommandTreeProvider,
     ConfigKeyProvider,
     EnvironmentVariableProvider,
     FilePathCompletionProvider,
@@ -26,6 +27,7 @@ __all__ = [
     "DynamicCompletionRegistry",
     "CompletionProvider",
     "CompletionContext",
+    "CommandTreeProvider",
     "FilePathCompletionProvider",
     "EnvironmentVariableProvider",
     "ConfigKeyProvider",
@@ -0,0 +1,593 @@
+"""
+Completion server for shell TAB completion.
+
+Starting Python and importing the completion engine costs hundreds of
+milliseconds per TAB, and every process starts with cold caches. A per-user
+server keeps the smart completion engine, its caches, indexes and history
+warm, and answers over a Unix socket. Shells reach it through small shims
+that pipe one request line to the socket with ``socat``, or with a
+site-less Python client when socat is missing, and fall back to completing
+in-process (starting a server for the next TAB) when no server answers.
+Generated CLIs ship a shim per shell that sends the CLI's command tree with
+each request, so its own subcommands and options are completed too.
+
+The protocol is one tab-separated request line per connection:
+
+- ``complete<TAB>language<TAB>cwd<TAB>word<TAB>line[<TAB>tree]``: completions,
+  one per line; tree is the CLI's command tree as JSON (see command_tree())
+- ``record<TAB>command``: record a command in the history store
+- ``ping``: the server's process id
+- ``stop``: shut the server down
+
+The server exits once no request arrived for ``idle_timeout`` seconds.
+Environment variable completions reflect the server's environment, which is
+the environment of the shell that started it.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .providers import setup_default_providers
+from .smart_completion import SmartCompletionEngine, get_smart_completion_registry
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no Unix sockets either
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds without requests after which the server exits
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+# Seconds a client waits for the server, and the server for a request line
+CLIENT_TIMEOUT = 2.0
+REQUEST_TIMEOUT = 5.0
+
+SHELLS = ("bash", "zsh", "fish")
+
+_MODULE = "goobits_cli.universal.integrations.completion.daemon"
+
+# Client used by the shims when socat is missing; it must not contain quotes
+# or backslashes so every shell can take it in single quotes unchanged
+_SHIM_CLIENT = """import socket, sys
+client = socket.socket(socket.AF_UNIX)
+client.settimeout(5)
+client.connect(sys.argv[1])
+client.sendall(sys.stdin.buffer.read())
+while True:
+    data = client.recv(65536)
+    if not data:
+        break
+    sys.stdout.buffer.write(data)
+"""
+
+_BASH_SHIM = """\
+# {cli} completion served by the goobits completion server
+_goobits_{function}_request() {{
+    if command -v socat >/dev/null 2>&1; then
+        socat -t5 - "UNIX-CONNECT:$1"
+    else
+        {python} -S -E -c {client} "$1"
+    fi
+}}
+
+_goobits_{function}_complete() {{
+    local word="${{COMP_WORDS[COMP_CWORD]}}" socket={socket} tree={tree} reply completion
+    if [ -z "$socket" ]; then
+        socket="${{XDG_RUNTIME_DIR:+$XDG_RUNTIME_DIR/goobits}}"
+        socket="${{socket:-${{TMPDIR:-/tmp}}/goobits-$UID}}/completion.sock"
+    fi
+    [ -S "$socket" ] && [ -O "$socket" ] && reply=$(
+        printf 'complete\\t%s\\t%s\\t%s\\t%s\\t%s\\n' {language} "$PWD" "$word" "$COMP_LINE" "$tree" |
+            _goobits_{function}_request "$socket" 2>/dev/null
+    ) || reply=$({python} -m {module} complete --socket "$socket" --language {language} --tree "$tree" -- "$word" "$COMP_LINE" 2>/dev/null)
+    COMPREPLY=()
+    while IFS= read -r completion; do
+        [ -n "$completion" ] && COMPREPLY+=("$completion")
+    done <<< "$reply"
+}}
+
+complete -o default -F _goobits_{function}_complete {cli}
+"""
+
+_ZSH_SHIM = """\
+# {cli} completion served by the goobits completion server (needs compinit)
+_goobits_{function}_request() {{
+    if (( $+commands[socat] )); then
+        socat -t5 - "UNIX-CONNECT:$1"
+    else
+        {python} -S -E -c {client} "$1"
+    fi
+}}
+
+_goobits_{function}_complete() {{
+    local word="${{words[CURRENT]}}" socket={socket} tree={tree} reply
+    if [[ -z "$socket" ]]; then
+        socket="${{XDG_RUNTIME_DIR:+$XDG_RUNTIME_DIR/goobits}}"
+        socket="${{socket:-${{TMPDIR:-/tmp}}/goobits-$UID}}/completion.sock"
+    fi
+    [[ -S "$socket" && -O "$socket" ]] && reply=$(
+        printf 'complete\\t%s\\t%s\\t%s\\t%s\\t%s\\n' {language} "$PWD" "$word" "$BUFFER" "$tree" |
+            _goobits_{function}_request "$socket" 2>/dev/null
+    ) || reply=$({python} -m {module} complete --socket "$socket" --language {language} --tree "$tree" -- "$word" "$BUFFER" 2>/dev/null)
+    compadd -- ${{(f)reply}}
+}}
+
+compdef _goobits_{function}_complete {cli}
+"""
+
+_FISH_SHIM = """\
+# {cli} completion served by the goobits completion server
+function __goobits_{function}_complete
+    set -l word (commandline -ct)
+    set -l line (commandline -cp)
+    set -l socket {socket}
+    set -l tree {tree}
+    if test -z "$socket"
+        if test -n "$XDG_RUNTIME_DIR"
+            set socket "$XDG_RUNTIME_DIR/goobits/completion.sock"
+        else
+            set -l tmp /tmp
+            test -n "$TMPDIR"; and set tmp "$TMPDIR"
+            set socket "$tmp/goobits-"(id -u)"/completion.sock"
+        end
+    end
+    if test -S "$socket"; and test -O "$socket"
+        set -l request (printf 'complete\\t%s\\t%s\\t%s\\t%s\\t%s' {language} $PWD "$word" "$line" "$tree")
+        if command -q socat
+            printf '%s\\n' $request | socat -t5 - "UNIX-CONNECT:$socket" 2>/dev/null
+        else
+            printf '%s\\n' $request | {python} -S -E -c {client} "$socket" 2>/dev/null
+        end
+        and return
+    end
+    {python} -m {module} complete --socket "$socket" --language {language} --tree "$tree" -- "$word" "$line" 2>/dev/null
+end
+
+complete -c {cli} -f -a '(__goobits_{function}_complete)'
+"""
+
+_SHIMS = {"bash": _BASH_SHIM, "zsh": _ZSH_SHIM, "fish": _FISH_SHIM}
+
+
+def is_supported() -> bool:
+    """Return True if the platform has Unix sockets and file locks."""
+    return hasattr(socket, "AF_UNIX") and fcntl is not None
+
+
+def default_socket_path() -> Path:
+    """Return the per-user server socket."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "goobits" / "completion.sock"
+    return Path(tempfile.gettempdir()) / f"goobits-{os.getuid()}" / "completion.sock"
+
+
+def _prepare_directory(path: Path) -> None:
+    """Create the socket's directory, private to the user."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    stat = path.parent.stat()
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise PermissionError(f"{path.parent} must be private to the current user")
+
+
+def format_request(*fields: str) -> bytes:
+    """Encode one request line; tabs and newlines within fields become spaces."""
+    clean = (field.replace("\t", " ").replace("\n", " ") for field in fields)
+    return ("\t".join(clean) + "\n").encode("utf-8")
+
+
+def send_request(
+    request: bytes, path: Optional[Path] = None, timeout: float = CLIENT_TIMEOUT
+) -> Optional[str]:
+    """
+    Send one request to the server.
+
+    Args:
+        request: Encoded request line
+        path: Server socket (default: the per-user socket)
+        timeout: Seconds to wait for the server
+
+    Returns:
+        The server's response, or None if no server of this user answered
+    """
+    if not is_supported():
+        return None
+    path = Path(path) if path else default_socket_path()
+    try:
+        if path.stat().st_uid != os.getuid():
+            return None
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(path))
+            client.sendall(request)
+            chunks = []
+            while True:
+                data = client.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+    except OSError:
+        return None
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+def command_tree(cli: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the command tree a generated CLI's shims send with each request.
+
+    Args:
+        cli: CLI schema of the intermediate representation
+
+    Returns:
+        The root command's ``options`` and ``commands``, each command a
+        tree of its own; empty entries are left out
+    """
+
+    def node(command: Dict[str, Any], options: List[str]) -> Dict[str, Any]:
+        for option in command.get("options") or []:
+            if option.get("name"):
+                options.append(f"--{option['name']}")
+            if option.get("short"):
+                options.append(f"-{option['short']}")
+        commands = {
+            subcommand["name"]: node(subcommand, ["--help"])
+            for subcommand in command.get("subcommands") or []
+            if subcommand.get("name")
+        }
+        tree: Dict[str, Any] = {"options": options}
+        if commands:
+            tree["commands"] = commands
+        return tree
+
+    return node(cli.get("root_command") or {}, ["--help", "--version"])
+
+
+@lru_cache(maxsize=32)
+def parse_command_tree(text: str) -> Dict[str, Any]:
+    """Parse a command tree sent by a shim; empty or malformed trees give {}."""
+    try:
+        tree = json.loads(text) if text else {}
+    except ValueError:
+        return {}
+    return tree if isinstance(tree, dict) else {}
+
+
+def default_engine() -> SmartCompletionEngine:
+    """Return the global smart engine, with the default providers registered."""
+    engine = get_smart_completion_registry()
+    if not engine.get_providers():
+        for provider in setup_default_providers():
+            engine.register_provider(provider)
+    return engine
+
+
+class CompletionServer:
+    """
+    Unix socket server answering completion requests from a warm engine.
+
+    Features:
+    - One request per connection, answered concurrently on one event loop
+    - One server per socket, guarded by a lock file; stale sockets are replaced
+    - Exits after idle_timeout seconds without requests, or on ``stop``
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        engine: Optional[SmartCompletionEngine] = None,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            path: Socket to listen on (default: the per-user socket)
+            idle_timeout: Seconds without requests after which to exit
+            engine: Completion engine (default: default_engine())
+        """
+        self.path = Path(path) if path else default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.engine = engine or default_engine()
+        self._last_request = 0.0
+        self._stopped: Optional[asyncio.Event] = None
+
+    def _lock(self) -> Optional[int]:
+        """Take the server lock, returning its descriptor, or None if held."""
+        descriptor = os.open(
+            str(self.path.with_name(self.path.name + ".lock")),
+            os.O_RDWR | os.O_CREAT,
+            0o600,
+        )
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(descriptor)
+            return None
+        return descriptor
+
+    async def serve(self) -> bool:
+        """
+        Serve requests until idle or stopped.
+
+        Returns:
+            False if another server already serves the socket
+        """
+        _prepare_directory(self.path)
+        lock = self._lock()
+        if lock is None:
+            return False
+
+        try:
+            # Holding the lock, any existing socket belongs to a dead server
+            if self.path.exists() or self.path.is_symlink():
+                self.path.unlink()
+            loop = asyncio.get_running_loop()
+            self._stopped = asyncio.Event()
+            self._last_request = loop.time()
+            server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+            os.chmod(self.path, 0o600)
+            try:
+                while not self._stopped.is_set():
+                    remaining = self._last_request + self.idle_timeout - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                server.close()
+                await server.wait_closed()
+                self.path.unlink(missing_ok=True)
+        finally:
+            os.close(lock)
+        return True
+
+    def stop(self) -> None:
+        """Make serve() return."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the request of one connection."""
+        loop = asyncio.get_running_loop()
+        self._last_request = loop.time()
+        try:
+            line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            response = await self._respond(line.decode("utf-8", errors="replace"))
+            writer.write(response.encode("utf-8"))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Completion request failed: {e}")
+        except Exception as e:
+            logger.error(f"Error answering completion request: {e}")
+        finally:
+            writer.close()
+            self._last_request = loop.time()
+
+    async def _respond(self, line: str) -> str:
+        """Return the response to one request line."""
+        command, _, arguments = line.rstrip("\r\n").partition("\t")
+
+        if command == "complete":
+            fields = arguments.split("\t", 4)
+            if len(fields) not in (4, 5):
+                return ""
+            language, cwd, word, full_command = fields[:4]
+            completions = await self.engine.get_smart_completions(
+                word,
+                full_command,
+                language or "python",
+                cwd=Path(cwd) if cwd else None,
+                command_tree=parse_command_tree(fields[4] if len(fields) == 5 else ""),
+            )
+            return "".join(f"{c}\n" for c in completions if "\n" not in c)
+
+        if command == "record":
+            self.engine.record_command(arguments)
+        elif command == "ping":
+            return f"{os.getpid()}\n"
+        elif command == "stop":
+            self.stop()
+        return ""
+
+
+def spawn_server(
+    path: Optional[Path] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+) -> None:
+    """Start a detached server process; it exits at once if one already runs."""
+    path = Path(path) if path else default_socket_path()
+    try:
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                _MODULE,
+                "serve",
+                "--socket",
+                str(path),
+                "--idle-timeout",
+                str(idle_timeout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        logger.debug(f"Could not start completion server: {e}")
+
+
+def complete(
+    word: str,
+    full_command: str,
+    language: str = "python",
+    cwd: Optional[Path] = None,
+    path: Optional[Path] = None,
+    spawn: bool = True,
+    tree: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """
+    Complete through the server, or in-process if no server answers.
+
+    Args:
+        word: Partial word being completed
+        full_command: Full command line so far
+        language: Target language
+        cwd: Directory to complete relative to (default: the current one)
+        path: Server socket (default: the per-user socket)
+        spawn: Start a server for later requests when none answered
+        tree: Command tree of the CLI being completed (see command_tree())
+
+    Returns:
+        Completion suggestions
+    """
+    cwd = Path(cwd) if cwd else Path.cwd()
+    request = format_request(
+        "complete",
+        language,
+        str(cwd),
+        word,
+        full_command,
+        json.dumps(tree, separators=(",", ":")) if tree else "",
+    )
+    response = send_request(request, path)
+    if response is not None:
+        return response.splitlines()
+
+    if spawn and is_supported():
+        spawn_server(path)
+    return asyncio.run(
+        default_engine().get_smart_completions(
+            word, full_command, language, cwd=cwd, command_tree=tree
+        )
+    )
+
+
+def record(command: str, path: Optional[Path] = None) -> None:
+    """Record a command through the server, or in-process if none answers."""
+    if send_request(format_request("record", command), path) is None:
+        default_engine().record_command(command)
+
+
+def completion_shim(
+    shell: str,
+    cli_name: str,
+    language: str = "python",
+    path: Optional[Path] = None,
+    python: Optional[str] = None,
+    tree: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Generate a shell completion script that asks the completion server.
+
+    Args:
+        shell: bash, zsh or fish
+        cli_name: Command to complete
+        language: Target language passed to the engine
+        path: Server socket (default: the per-user socket, found when the
+            script runs)
+        python: Interpreter for the fallback (default: the current one)
+        tree: Command tree of the CLI, sent with each request so its
+            subcommands and options are completed (see command_tree())
+
+    Returns:
+        Script to source from the shell's startup file
+
+    Raises:
+        ValueError: If the shell is not supported
+    """
+    if shell not in _SHIMS:
+        raise ValueError(f"Unsupported shell {shell!r}, expected one of {SHELLS}")
+
+    function = "".join(c if c.isalnum() else "_" for c in cli_name)
+    return _SHIMS[shell].format(
+        cli=shlex.quote(cli_name),
+        function=function,
+        language=shlex.quote(language),
+        socket=shlex.quote(str(path) if path else ""),
+        tree=shlex.quote(json.dumps(tree, separators=(",", ":")) if tree else ""),
+        python=shlex.quote(python or sys.executable),
+        client=f"'{_SHIM_CLIENT}'",
+        module=_MODULE,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the server, a client request or the shim generator."""
+    parser = argparse.ArgumentParser(
+        prog=f"python -m {_MODULE}", description="Goobits completion server"
+    )
+    parser.add_argument("--socket", type=Path, help="Server socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the server in the foreground")
+    serve.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT)
+
+    complete_parser = commands.add_parser("complete", help="Print completions")
+    complete_parser.add_argument("--language", default="python")
+    complete_parser.add_argument("--no-spawn", action="store_true")
+    complete_parser.add_argument("--tree", type=parse_command_tree, default={})
+    complete_parser.add_argument("word")
+    complete_parser.add_argument("line")
+
+    record_parser = commands.add_parser("record", help="Record a used command")
+    record_parser.add_argument("line")
+
+    stop = commands.add_parser("stop", help="Stop the running server")
+
+    shim = commands.add_parser("shim", help="Print a shell completion script")
+    shim.add_argument("shell", choices=SHELLS)
+    shim.add_argument("cli_name")
+    shim.add_argument("--language", default="python")
+    shim.add_argument("--tree", type=parse_command_tree, default={})
+
+    # Subcommands take --socket too, so shims can put it anywhere
+    for subparser in (serve, complete_parser, record_parser, stop, shim):
+        subparser.add_argument("--socket", type=Path, default=argparse.SUPPRESS)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = CompletionServer(args.socket, args.idle_timeout)
+        return 0 if asyncio.run(server.serve()) else 1
+    if args.command == "complete":
+        for completion in complete(
+            args.word,
+            args.line,
+            args.language,
+            path=args.socket,
+            spawn=not args.no_spawn,
+            tree=args.tree,
+        ):
+            print(completion)
+    elif args.command == "record":
+        record(args.line, args.socket)
+    elif args.command == "stop":
+        send_request(format_request("stop"), args.socket)
+    else:
+        print(
+            completion_shim(
+                args.shell, args.cli_name, args.language, args.socket, tree=args.tree
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""
+Fuzzy matching for completion candidates.
+
+Scores a query as an in-order subsequence of each candidate, rewarding matches
+at word boundaries, camelCase humps, path separators and runs of consecutive
+characters. A character bitset index rejects candidates that lack any query
+character without looking at them, and only the most promising survivors are
+scored before a heap picks the top k.
+"""
+
+import heapq
+import operator
+import re
+from itertools import repeat
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Scoring, modelled on fzf: every matched character earns SCORE_MATCH plus the
+# bonus of its position, and gaps between matched characters cost points
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = 8
+BONUS_PATH = 9
+BONUS_CAMEL = 7
+BONUS_CONSECUTIVE = 4
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+# Characters after which a new word starts
+_DELIMITERS = frozenset(" \t-_.:,=@+")
+_PATH_SEPARATORS = frozenset("/\\")
+
+# First characters of words, and of camelCase humps
+_WORD_START = re.compile(r"(?:^|[\s\-_.:,=@+/\\])([^\s\-_.:,=@+/\\])")
+_CAMEL_HUMP = re.compile(r"[a-z]([A-Z])")
+
+# Most candidates scored per search; survivors beyond this are not ranked
+MAX_SCORED = 500
+
+_NONZERO = re.compile(b"[^\x00]")
+
+
+def _bonus(text: str, position: int) -> int:
+    """Return the bonus for matching the character at position."""
+    if position == 0:
+        return BONUS_BOUNDARY
+
+    previous, current = text[position - 1], text[position]
+    if previous in _PATH_SEPARATORS:
+        return BONUS_PATH
+    if previous in _DELIMITERS:
+        return BONUS_BOUNDARY
+    if previous.islower() and current.isupper():
+        return BONUS_CAMEL
+    if current.isdigit() and not previous.isdigit():
+        return BONUS_CAMEL
+    return 0
+
+
+def _score(query: str, text: str, lowered: str) -> Optional[int]:
+    """
+    Score a lowercase query against text.
+
+    Finds the leftmost occurrence of the query as a subsequence, then walks
+    back from its end to the shortest match ending there, and scores that.
+
+    Returns:
+        The score, or None if the query is not a subsequence of text
+    """
+    position = -1
+    for char in query:
+        position = lowered.find(char, position + 1)
+        if position < 0:
+            return None
+
+    positions = [position]
+    for char in reversed(query[:-1]):
+        position = lowered.rfind(char, 0, position)
+        positions.append(position)
+    positions.reverse()
+
+    score = 0
+    previous = -2
+    chunk_bonus = 0
+    for index, position in enumerate(positions):
+        bonus = _bonus(text, position)
+        if position == previous + 1:
+            # Consecutive characters keep the bonus of the run's first one
+            if bonus >= BONUS_BOUNDARY and bonus > chunk_bonus:
+                chunk_bonus = bonus
+            bonus = max(bonus, chunk_bonus, BONUS_CONSECUTIVE)
+        else:
+            if index:
+                gap = position - previous - 1
+                score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (gap - 1)
+            chunk_bonus = bonus
+        if index == 0:
+            bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+        score += SCORE_MATCH + bonus
+        previous = position
+    return score
+
+
+def fuzzy_score(query: str, candidate: str) -> Optional[int]:
+    """
+    Score query against candidate, case-insensitively.
+
+    Args:
+        query: Text typed so far
+        candidate: Completion candidate
+
+    Returns:
+        Higher for better matches, or None if the query's characters do not
+        appear in order in the candidate
+    """
+    if not query:
+        return 0
+    return _score(query.lower(), candidate, candidate.lower())
+
+
+def best_score(query: str) -> int:
+    """Return the score of a query matching a candidate equal to itself."""
+    return fuzzy_score(query, query) or 0
+
+
+class FuzzyIndex:
+    """
+    Candidates indexed for fuzzy search.
+
+    Every character has a mask with one byte per candidate, set when the
+    candidate contains it, and one set when it starts a word there. ANDing the
+    masks of the query's characters as integers finds the candidates that can
+    match at all; those where the query's characters start words are scored
+    first, newest first within a tier, and at most max_scored candidates are
+    scored per search.
+    """
+
+    def __init__(self, candidates: Sequence[str] = (), max_scored: int = MAX_SCORED):
+        """
+        Initialize the index.
+
+        Args:
+            candidates: Initial candidates; duplicates are indexed once
+            max_scored: Most candidates scored per search
+        """
+        self.max_scored = max_scored
+        self._lock = Lock()
+        self._candidates: List[str] = []
+        self._lowered: List[str] = []
+        self._positions: Dict[str, int] = {}
+        # Character -> one byte per candidate position
+        self._contains: Dict[str, bytearray] = {}
+        self._starts_word: Dict[str, bytearray] = {}
+        self.extend(candidates)
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def __contains__(self, candidate: str) -> bool:
+        return candidate in self._positions
+
+    @staticmethod
+    def _append_masks(
+        masks: Dict[str, bytearray], texts: List[str], offset: int
+    ) -> None:
+        """Append the mask bytes of texts, the first at position offset."""
+        for char in set("".join(texts)):
+            mask = masks.get(char)
+            if mask is None:
+                mask = masks[char] = bytearray()
+            mask.extend(bytes(offset - len(mask)))
+            mask.extend(map(operator.contains, texts, repeat(char)))
+
+    def extend(self, candidates: Sequence[str]) -> None:
+        """Add candidates that are not indexed yet."""
+        with self._lock:
+            new = [c for c in dict.fromkeys(candidates) if c not in self._positions]
+            if not new:
+                return
+            offset = len(self._candidates)
+            lowered = [candidate.lower() for candidate in new]
+            self._positions.update(zip(new, range(offset, offset + len(new))))
+            self._candidates.extend(new)
+            self._lowered.extend(lowered)
+            self._append_masks(self._contains, lowered, offset)
+            word_starts = [
+                "".join(_WORD_START.findall(low) + _CAMEL_HUMP.findall(c)).lower()
+                if c != low
+                else "".join(_WORD_START.findall(low))
+                for c, low in zip(new, lowered)
+            ]
+            self._append_masks(self._starts_word, word_starts, offset)
+
+    @staticmethod
+    def _matching(masks: Dict[str, bytearray], chars: str) -> int:
+        """AND the masks of chars into one integer."""
+        bits = -1
+        for char in set(chars):
+            mask = masks.get(char)
+            if mask is None:
+                return 0
+            bits &= int.from_bytes(mask, "little")
+        return bits if bits > 0 else 0
+
+    @staticmethod
+    def _positions_of(bits: int) -> Iterator[int]:
+        """Yield the candidate positions set in a combined mask, highest first."""
+        size = (bits.bit_length() + 7) >> 3
+        data = bits.to_bytes(size, "big")
+        for match in _NONZERO.finditer(data):
+            yield size - 1 - match.start()
+
+    def search(
+        self, query: str, k: int, skip_prefix_matches: bool = False
+    ) -> List[Tuple[int, str]]:
+        """
+        Return the k best matches for query.
+
+        Args:
+            query: Text typed so far
+            k: Number of matches to return
+            skip_prefix_matches: Leave out candidates starting with the query
+
+        Returns:
+            (score, candidate) pairs, best first; ties go to shorter candidates
+        """
+        query = query.lower()
+        if not query or k <= 0:
+            return []
+
+        with self._lock:
+            candidates, lowered = self._candidates, self._lowered
+            matching = self._matching(self._contains, query)
+            # Most promising first: every query character starts a word, then
+            # the first one does, then the rest
+            all_start = matching & self._matching(self._starts_word, query)
+            first_starts = matching & self._matching(self._starts_word, query[0])
+            tiers = (
+                all_start,
+                first_starts & ~all_start,
+                matching & ~(first_starts | all_start),
+            )
+
+            scored = []
+            budget = self.max_scored
+            for tier in tiers:
+                for position in self._positions_of(tier):
+                    text = lowered[position]
+                    if skip_prefix_matches and text.startswith(query):
+                        continue
+                    score = _score(query, candidates[position], text)
+                    if score is not None:
+                        scored.append((score, -len(text), position))
+                    budget -= 1
+                    if not budget:
+                        break
+                if not budget:
+                    break
+
+            best = heapq.nlargest(k, scored)
+            return [(score, candidates[position]) for score, _, position in best]
+
+
+def merge_matches(results: Sequence[List[Tuple[int, str]]], k: int) -> List[str]:
+    """
+    Merge the matches of several searches into the k best unique candidates.
+
+    Args:
+        results: Lists of (score, candidate) pairs
+        k: Number of candidates to return
+
+    Returns:
+        Candidates by descending score
+    """
+    best: Dict[str, int] = {}
+    for matches in results:
+        for score, candidate in matches:
+            if score > best.get(candidate, score - 1):
+                best[candidate] = score
+    ranked = heapq.nlargest(k, best.items(), key=lambda item: (item[1], -len(item[0])))
+    return [candidate for candidate, _ in ranked]
+
+
+# Shared index of the history list last seen
+_history_index: Optional[Tuple[int, Optional[str], Optional[str], FuzzyIndex]] = None
+_history_lock = Lock()
+
+
+def history_fuzzy_index(history: Sequence[str]) -> FuzzyIndex:
+    """
+    Return a shared fuzzy index of the unique commands in history.
+
+    The index is extended with only the entries appended since the previous
+    call, and rebuilt when the history was replaced or trimmed.
+
+    Args:
+        history: Commands, oldest first
+
+    Returns:
+        Index over the history's unique commands
+    """
+    global _history_index
+
+    with _history_lock:
+        synced, first, last, index = _history_index or (0, None, None, None)
+        appended = (
+            index is not None
+            and len(history) >= synced
+            and (synced == 0 or (history[0] == first and history[synced - 1] == last))
+        )
+        if not appended:
+            index, synced = FuzzyIndex(), 0
+
+        index.extend(history[synced:])
+        _history_index = (
+            len(history),
+            history[0] if history else None,
+            history[-1] if history else None,
+            index,
+        )
+        return index
@@ -0,0 +1,274 @@
+"""
+Persistent, frecency-ranked command history for completion.
+
+Commands are kept in an append-only log with one line per use. Each line
+holds mergeable counters (last use, use count and frecency), so loading the
+log, reading what other processes appended since, and compacting it all fold
+lines the same way.
+
+Frecency decays by half every ``half_life`` seconds. Rather than decaying
+every entry as time passes, a use at time t adds 2 ** (t / half_life) to the
+entry, which keeps the ranking of all entries correct without ever
+rewriting them. Scores are stored as log2 of that sum.
+"""
+
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .prefix_index import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+# A week-old command counts half as much as one used now
+DEFAULT_HALF_LIFE = 7 * 24 * 3600.0
+
+# Commands kept when the log is compacted
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Log lines allowed beyond one per command before the log is compacted
+_COMPACT_SLACK = 1_000
+
+# Results kept per cached prefix, and prefixes cached
+_TOP_CACHE_SIZE = 16
+_MAX_CACHED_PREFIXES = 4_096
+
+# Tabs and newlines in commands would break the log's line format
+_FIELD_BREAKS = str.maketrans("\t\r\n", "   ")
+
+
+def default_history_path() -> Path:
+    """Return the per-user completion history log."""
+    base = os.environ.get("XDG_STATE_HOME") or str(Path.home() / ".local" / "state")
+    return Path(base) / "goobits" / "completion_history"
+
+
+def _log2_add(a: float, b: float) -> float:
+    """Return log2(2 ** a + 2 ** b) without overflow."""
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log2(1.0 + 2.0 ** (low - high))
+
+
+@dataclass
+class HistoryEntry:
+    """Usage counters of one command."""
+
+    count: int
+    last_used: float
+    # log2 of the sum of 2 ** (use time / half life) over all uses
+    frecency: float
+
+    def merge(self, other: "HistoryEntry") -> None:
+        """Fold in the counters of another log line for the same command."""
+        self.count += other.count
+        self.last_used = max(self.last_used, other.last_used)
+        self.frecency = _log2_add(self.frecency, other.frecency)
+
+
+class HistoryStore:
+    """
+    Append-only command history ranked by frecency.
+
+    Features:
+    - One appended line per recorded command; no rewrites until compaction
+    - Picks up commands recorded by other processes by reading the log's tail
+    - Top N commands with a prefix via a sorted prefix index, with the
+      results of recently asked prefixes kept up to date as commands are used
+    - Compaction to one line per command, dropping the least frecent
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        half_life: float = DEFAULT_HALF_LIFE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Initialize the store. The log is read on first use.
+
+        Args:
+            path: Log file (default: ``$XDG_STATE_HOME/goobits/completion_history``)
+            half_life: Seconds after which a use counts half as much
+            max_entries: Commands kept when the log is compacted
+        """
+        self.path = Path(path) if path else default_history_path()
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._entries: Dict[str, HistoryEntry] = {}
+        self._index = PrefixIndex()
+        # Prefix -> best commands by frecency, best first
+        self._top: Dict[str, List[str]] = {}
+        # Identity and read position of the log, and its line count
+        self._file_id: Optional[int] = None
+        self._offset = 0
+        self._lines = 0
+
+    def _read_log(self) -> None:
+        """Fold in lines appended to the log since the last read. Requires the lock."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            stat = None
+
+        file_id = stat.st_ino if stat else None
+        if file_id != self._file_id or (stat and stat.st_size < self._offset):
+            # First read, or the log was compacted or removed meanwhile
+            self._entries.clear()
+            self._index = PrefixIndex()
+            self._top.clear()
+            self._file_id, self._offset, self._lines = file_id, 0, 0
+        if stat is None or stat.st_size == self._offset:
+            return
+
+        try:
+            with open(self.path, "rb") as log:
+                log.seek(self._offset)
+                data = log.read()
+        except OSError as e:
+            logger.debug(f"Could not read completion history: {e}")
+            return
+
+        # Leave a partially written last line for the next read
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        updated = {}
+        for line in data[:end].decode("utf-8", errors="replace").splitlines():
+            self._lines += 1
+            fields = line.split("\t", 3)
+            try:
+                command = fields[3]
+                entry = HistoryEntry(int(fields[1]), float(fields[0]), float(fields[2]))
+            except (IndexError, ValueError):
+                continue
+            existing = self._entries.get(command)
+            if existing is None:
+                self._entries[command] = entry
+            else:
+                existing.merge(entry)
+            updated[command] = self._entries[command].frecency
+
+        if len(updated) > _TOP_CACHE_SIZE:
+            self._top.clear()
+            self._index.update(updated.items())
+        else:
+            for command, frecency in updated.items():
+                self._index.add(command, frecency)
+                self._refresh_top(command)
+
+    def _refresh_top(self, command: str) -> None:
+        """Update cached prefix results after command's score rose. Requires the lock."""
+        if not self._top:
+            return
+        score = self._entries[command].frecency
+        for length in range(len(command) + 1):
+            best = self._top.get(command[:length])
+            if best is None:
+                continue
+            if command not in best:
+                if len(best) == _TOP_CACHE_SIZE and (
+                    self._entries[best[-1]].frecency >= score
+                ):
+                    continue
+                best.append(command)
+            best.sort(key=lambda c: (-self._entries[c].frecency, c))
+            del best[_TOP_CACHE_SIZE:]
+
+    def record(self, command: str, timestamp: Optional[float] = None) -> None:
+        """
+        Record one use of a command.
+
+        Args:
+            command: Command line as typed
+            timestamp: Time of use (default: now)
+        """
+        command = command.strip().translate(_FIELD_BREAKS)
+        if not command:
+            return
+        used = time.time() if timestamp is None else timestamp
+        line = f"{used:.3f}\t1\t{used / self.half_life!r}\t{command}\n"
+
+        with self._lock:
+            self._read_log()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as log:
+                    log.write(line.encode("utf-8"))
+            except OSError as e:
+                logger.debug(f"Could not write completion history: {e}")
+                return
+            # Reading back our own line also folds in concurrent appends
+            self._read_log()
+
+            if self._lines > len(self._entries) + _COMPACT_SLACK:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log with one line per kept command. Requires the lock."""
+        kept = sorted(
+            self._entries.items(), key=lambda item: item[1].frecency, reverse=True
+        )[: self.max_entries]
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temporary, "w", encoding="utf-8") as log:
+                for command, entry in kept:
+                    log.write(
+                        f"{entry.last_used:.3f}\t{entry.count}\t"
+                        f"{entry.frecency!r}\t{command}\n"
+                    )
+            os.replace(temporary, self.path)
+            stat = self.path.stat()
+        except OSError as e:
+            logger.debug(f"Could not compact completion history: {e}")
+            return
+
+        self._file_id, self._offset, self._lines = stat.st_ino, stat.st_size, len(kept)
+        if len(kept) < len(self._entries):
+            self._entries = dict(kept)
+            self._index = PrefixIndex()
+            self._index.update((command, entry.frecency) for command, entry in kept)
+            self._top.clear()
+
+    def top(self, prefix: str, n: int) -> List[str]:
+        """
+        Return the n most frecent commands starting with prefix.
+
+        Args:
+            prefix: Text the commands must start with
+            n: Number of commands to return
+
+        Returns:
+            Commands, most frecent first
+        """
+        with self._lock:
+            self._read_log()
+            if n > _TOP_CACHE_SIZE:
+                return self._index.top(prefix, n)
+
+            best = self._top.get(prefix)
+            if best is None:
+                if len(self._top) >= _MAX_CACHED_PREFIXES:
+                    self._top.clear()
+                best = self._top[prefix] = self._index.top(prefix, _TOP_CACHE_SIZE)
+            return best[:n]
+
+    def get(self, command: str) -> Optional[HistoryEntry]:
+        """Return the counters of a command, or None if it was never recorded."""
+        with self._lock:
+            self._read_log()
+            return self._entries.get(command)
+
+    def frecency(self, command: str) -> Optional[float]:
+        """Return a command's frecency score, or None if it was never recorded."""
+        entry = self.get(command)
+        return entry.frecency if entry else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._read_log()
+            return len(self._entries)
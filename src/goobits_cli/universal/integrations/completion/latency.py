@@ -0,0 +1,139 @@
+"""
+Latency histograms for completion providers.
+
+Durations are counted in logarithmic buckets, eight per doubling from one
+microsecond, so recording is O(1) in fixed memory and percentiles stay
+within about 9% of the exact value however many samples were recorded.
+"""
+
+import math
+from threading import Lock
+from typing import Dict
+
+# Durations up to this are counted in the first bucket
+_RESOLUTION = 1e-6
+
+# Buckets per doubling of duration; each spans a factor of 2 ** (1 / 8)
+_BUCKETS_PER_DOUBLING = 8
+
+# Durations beyond 2 ** 32 microseconds (over an hour) share the last bucket
+_BUCKET_COUNT = 32 * _BUCKETS_PER_DOUBLING + 1
+
+
+def _bucket(seconds: float) -> int:
+    """Return the bucket counting a duration."""
+    if seconds <= _RESOLUTION:
+        return 0
+    bucket = math.ceil(math.log2(seconds / _RESOLUTION) * _BUCKETS_PER_DOUBLING)
+    return min(bucket, _BUCKET_COUNT - 1)
+
+
+def _upper_bound(bucket: int) -> float:
+    """Return the longest duration a bucket counts."""
+    if bucket == _BUCKET_COUNT - 1:
+        return math.inf
+    return _RESOLUTION * 2.0 ** (bucket / _BUCKETS_PER_DOUBLING)
+
+
+class LatencyHistogram:
+    """
+    Distribution of durations with approximate percentiles.
+
+    Features:
+    - Constant-time recording into fixed logarithmic buckets
+    - Percentiles reported as the upper bound of their bucket, capped at the
+      longest duration seen
+    """
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self._counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Count one duration."""
+        self._counts[_bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Return the duration below which percent of the samples fall.
+
+        Args:
+            percent: Percentile between 0 and 100
+
+        Returns:
+            Duration in seconds, or 0.0 if nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(_upper_bound(bucket), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Return the sample count, mean, p50, p95, p99 and maximum in ms."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class ProviderLatencyStats:
+    """
+    Latencies and failures of one completion provider.
+
+    A call ends in one of four ways: it returns (its latency is recorded),
+    raises (recorded and counted as an error), is cancelled at its deadline
+    (a timeout) or is cancelled because other providers already answered
+    enough (a cancellation).
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self._lock = Lock()
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.timeouts = 0
+        self.cancellations = 0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        """Record a finished call."""
+        with self._lock:
+            self.latency.record(seconds)
+            if failed:
+                self.errors += 1
+
+    def record_timeout(self) -> None:
+        """Count a call cancelled at its deadline."""
+        with self._lock:
+            self.timeouts += 1
+
+    def record_cancellation(self) -> None:
+        """Count a call cancelled after enough results arrived elsewhere."""
+        with self._lock:
+            self.cancellations += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Return finished calls, latency percentiles in ms and failure counts."""
+        with self._lock:
+            summary = self.latency.summary()
+            return {
+                "calls": summary.pop("count"),
+                **summary,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "cancellations": self.cancellations,
+            }
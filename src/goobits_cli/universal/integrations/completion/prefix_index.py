@@ -0,0 +1,184 @@
+"""
+Prefix index for completion candidates.
+
+Keeps candidates in a sorted array so every candidate sharing a prefix is one
+bisect away, with a score per candidate for top-k queries. The history and
+config key providers share it instead of scanning their sources per request.
+"""
+
+import bisect
+import heapq
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Sorts after any character, so [prefix, prefix + _MAX_CHAR) spans a prefix
+_MAX_CHAR = "\U0010ffff"
+
+# Above this many new keys, one sort is cheaper than repeated insertion
+_BULK_INSERT = 64
+
+
+class PrefixIndex:
+    """
+    Sorted, incrementally maintained set of candidates with scores.
+
+    Features:
+    - Prefix lookup in O(log n + matches) via bisect
+    - Top-k by score within a prefix
+    - Optional case folding (the latest original spelling is returned)
+    - Thread-safe updates and queries
+    """
+
+    def __init__(self, items: Iterable[str] = (), fold_case: bool = False):
+        """
+        Initialize the index.
+
+        Args:
+            items: Initial candidates, all with score 0
+            fold_case: Match prefixes case-insensitively
+        """
+        self.fold_case = fold_case
+        self._lock = Lock()
+        # Folded keys in sorted order with their scores at the same positions,
+        # and folded key -> (original, score)
+        self._keys: List[str] = []
+        self._scores: List[float] = []
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self.update((item, 0.0) for item in items)
+
+    def _fold(self, text: str) -> str:
+        return text.lower() if self.fold_case else text
+
+    def add(self, item: str, score: float = 0.0) -> None:
+        """Add a candidate, or replace the score of an existing one."""
+        self.update([(item, score)])
+
+    def update(self, items: Iterable[Tuple[str, float]]) -> None:
+        """Add or rescore many candidates at once."""
+        with self._lock:
+            changed = {}
+            for item, score in items:
+                key = self._fold(item)
+                changed.setdefault(key, key in self._entries)
+                self._entries[key] = (item, score)
+
+            if len(changed) > _BULK_INSERT:
+                self._keys = sorted(self._entries)
+                self._scores = [self._entries[key][1] for key in self._keys]
+                return
+
+            for key, existed in changed.items():
+                position = bisect.bisect_left(self._keys, key)
+                if existed:
+                    self._scores[position] = self._entries[key][1]
+                else:
+                    self._keys.insert(position, key)
+                    self._scores.insert(position, self._entries[key][1])
+
+    def discard(self, item: str) -> None:
+        """Remove a candidate if present."""
+        key = self._fold(item)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                position = bisect.bisect_left(self._keys, key)
+                del self._keys[position]
+                del self._scores[position]
+
+    def score(self, item: str) -> Optional[float]:
+        """Return the score of a candidate, or None if it is not indexed."""
+        entry = self._entries.get(self._fold(item))
+        return entry[1] if entry else None
+
+    def __contains__(self, item: str) -> bool:
+        return self._fold(item) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        """Return the slice of _keys starting with prefix. Requires the lock."""
+        prefix = self._fold(prefix)
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + _MAX_CHAR, lo)
+        return lo, hi
+
+    def keys_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Return candidates starting with prefix in sorted order.
+
+        Args:
+            prefix: Text the candidates must start with
+            limit: Return at most this many
+
+        Returns:
+            Matching candidates
+        """
+        with self._lock:
+            lo, hi = self._range(prefix)
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            return [self._entries[key][0] for key in self._keys[lo:hi]]
+
+    def top(self, prefix: str, k: int) -> List[str]:
+        """
+        Return the k highest-scoring candidates starting with prefix.
+
+        Args:
+            prefix: Text the candidates must start with
+            k: Number of candidates to return
+
+        Returns:
+            Candidates by descending score, ties in sorted order
+        """
+        with self._lock:
+            lo, hi = self._range(prefix)
+            best = heapq.nlargest(k, range(lo, hi), key=self._scores.__getitem__)
+            return [self._entries[self._keys[position]][0] for position in best]
+
+
+# Shared recency indexes of the history list last seen, by case folding
+_history_indexes: Dict[bool, Tuple[int, Optional[str], Optional[str], PrefixIndex]] = {}
+_history_lock = Lock()
+
+
+def history_index(history: Sequence[str], fold_case: bool = False) -> PrefixIndex:
+    """
+    Return a shared index of history scored by recency.
+
+    A command's score is the position of its latest occurrence, so top()
+    returns the most recently used matches first. The index is extended with
+    only the entries appended since the previous call, and rebuilt when the
+    history was replaced or trimmed.
+
+    Args:
+        history: Commands, oldest first
+        fold_case: Match prefixes case-insensitively
+
+    Returns:
+        Index over the history's unique commands
+    """
+    with _history_lock:
+        synced, first, last, index = _history_indexes.get(
+            fold_case, (0, None, None, None)
+        )
+        appended = (
+            index is not None
+            and len(history) >= synced
+            and (synced == 0 or (history[0] == first and history[synced - 1] == last))
+        )
+        if not appended:
+            index, synced = PrefixIndex(fold_case=fold_case), 0
+
+        if len(history) > synced:
+            index.update(
+                (command, position)
+                for position, command in enumerate(history[synced:], synced)
+            )
+
+        _history_indexes[fold_case] = (
+            len(history),
+            history[0] if history else None,
+            history[-1] if history else None,
+            index,
+        )
+        return index
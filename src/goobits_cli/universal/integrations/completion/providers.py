@@ -2,20 +2,236 @@
 
 Context-aware completion providers for Goobits CLI Framework.
 
-Provides intelligent completion for files, environment variables,
+Provides intelligent completion for the CLI's own subcommands and options,
 
-configuration keys, and command history.
+files, environment variables, configuration keys, and command history.
 
 """
 
+import bisect
 import logging
+import os
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
 
-from .registry import CompletionContext, CompletionProvider
+from .prefix_index import PrefixIndex, history_index
+from .registry import CompletionContext, CompletionProvider, _get_blocking_executor
 
 logger = logging.getLogger(__name__)
 
+# A listing is only cached once its directory has been unchanged this long
+
+# (nanoseconds), since file systems with coarse mtimes can hide later changes
+
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _entry_name(entry: os.DirEntry) -> str:
+    """Return an entry's name, with a trailing slash for directories."""
+
+    # DirEntry reuses the type the OS returned with the name, so this
+
+    # normally needs no stat call
+
+    try:
+        is_dir = entry.is_dir()
+
+    except OSError:
+        is_dir = False
+
+    return entry.name + "/" if is_dir else entry.name
+
+
+class DirectoryListingCache:
+    """
+
+    Directory listings for file path completion, keyed by directory mtime.
+
+    Features:
+
+    - os.scandir listings without a stat call per entry
+
+    - Prefix lookups by bisect over cached, sorted listings
+
+    - Early return once enough matches are found, with the rest of the
+
+      listing read in the background for the next request unless the
+
+      directory changed too recently to be cached
+
+    - A bounded number of listings, least recently used dropped first
+
+    """
+
+    def __init__(self, max_directories: int = 16):
+        """Initialize with the number of directory listings to keep."""
+
+        self.max_directories = max_directories
+
+        self._listings: OrderedDict[str, Tuple[int, List[str]]] = OrderedDict()
+
+        self._lock = Lock()
+
+    def _cached(self, key: str, mtime_ns: int) -> Optional[List[str]]:
+        """Return the cached listing of a directory if it is still current."""
+
+        with self._lock:
+            cached = self._listings.get(key)
+
+            if cached is None or cached[0] != mtime_ns:
+                return None
+
+            self._listings.move_to_end(key)
+
+            return cached[1]
+
+    def _store(self, key: str, mtime_ns: int, names: List[str]) -> None:
+        """Sort a complete listing and cache it unless it may be racy."""
+
+        names.sort()
+
+        if time.time_ns() - mtime_ns < _RACY_WINDOW_NS:
+            return
+
+        with self._lock:
+            self._listings[key] = (mtime_ns, names)
+
+            self._listings.move_to_end(key)
+
+            while len(self._listings) > self.max_directories:
+                self._listings.popitem(last=False)
+
+    def _finish(
+        self, key: str, mtime_ns: int, names: List[str], scanner: Iterator
+    ) -> None:
+        """Read the rest of a listing that was returned from early."""
+
+        try:
+            with scanner:
+                names.extend(_entry_name(entry) for entry in scanner)
+
+        except OSError as e:
+            logger.debug(f"Could not finish listing {key}: {e}")
+
+            return
+
+        self._store(key, mtime_ns, names)
+
+    def matches(
+        self,
+        directory: Path,
+        prefix: str,
+        limit: int,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> List[str]:
+        """
+
+        Return up to limit entries of a directory starting with prefix.
+
+        Hidden entries only match prefixes that start with a dot. Without a
+
+        current cached listing, the directory is scanned until limit matches
+
+        are found; the scan then continues in the background.
+
+        Args:
+
+            directory: Directory to list
+
+            prefix: Start of the entry names to return
+
+            limit: Maximum number of entries to return
+
+            accept: Further filter on entry names
+
+        Returns:
+
+            Matching names, directories with a trailing slash, in no
+
+            particular order
+
+        Raises:
+
+            OSError: If the directory cannot be read
+
+        """
+
+        show_hidden = prefix.startswith(".")
+
+        def wanted(name: str) -> bool:
+            return (
+                name.startswith(prefix)
+                and (show_hidden or not name.startswith("."))
+                and (accept is None or accept(name))
+            )
+
+        key = os.fspath(directory)
+
+        mtime_ns = os.stat(key).st_mtime_ns
+
+        names = self._cached(key, mtime_ns)
+
+        found: List[str] = []
+
+        if names is not None:
+            for position in range(bisect.bisect_left(names, prefix), len(names)):
+                name = names[position]
+
+                if not name.startswith(prefix) or len(found) >= limit:
+                    break
+
+                if wanted(name):
+                    found.append(name)
+
+            return found
+
+        scanner = os.scandir(key)
+
+        names = []
+
+        try:
+            for entry in scanner:
+                name = _entry_name(entry)
+
+                names.append(name)
+
+                if wanted(name):
+                    found.append(name)
+
+                    if len(found) >= limit:
+                        # The rest is only worth reading if it can be cached
+
+                        if time.time_ns() - mtime_ns >= _RACY_WINDOW_NS:
+                            _get_blocking_executor().submit(
+                                self._finish, key, mtime_ns, names, scanner
+                            )
+
+                            scanner = None
+
+                        return found
+
+        finally:
+            if scanner is not None:
+                scanner.close()
+
+        self._store(key, mtime_ns, names)
+
+        return found
+
+
+# Listings shared by the providers of all registries
+
+_directory_listings = DirectoryListingCache()
+
+
+def get_directory_listing_cache() -> DirectoryListingCache:
+    """Get the shared directory listing cache."""
+
+    return _directory_listings
+
 
 class FilePathCompletionProvider(CompletionProvider):
     """
@@ -34,11 +250,19 @@ class FilePathCompletionProvider(CompletionProvider):
 
     """
 
-    def __init__(self, priority: int = 80):
+    # Directory listings can stall on slow or network file systems
+
+    blocking = True
+
+    def __init__(self, priority: int = 80, max_completions: int = 100):
         """Initialize with high priority for file completions."""
 
         super().__init__(priority)
 
+        # Directory scans stop once this many matches are found
+
+        self.max_completions = max_completions
+
         # File type filters based on context
         self.file_filters = {
             "config": [".yaml", ".yml", ".json", ".toml", ".ini"],
@@ -163,51 +387,28 @@ class FilePathCompletionProvider(CompletionProvider):
 
                 prefix = ""
 
-            if not search_dir.exists():
-                return []
-
-            # Get completions from directory
-
-            completions = []
-
             try:
-                for item in search_dir.iterdir():
-                    name = item.name
-
-                    # Skip hidden files unless explicitly requested
-
-                    if name.startswith(".") and not file_part.startswith("."):
-                        continue
-
-                    # Filter by partial match
-
-                    if not name.startswith(file_part):
-                        continue
-
-                    # Build completion string
-
-                    completion = prefix + name
-
-                    # Add trailing slash for directories
-
-                    if item.is_dir():
-                        completion += "/"
-
-                    completions.append(completion)
-
-                # Apply context-specific filtering
-
-                filtered = self._apply_context_filtering(context, completions)
-
-                # Sort: directories first, then files
-
-                return sorted(filtered, key=self._sort_path_completions)
+                names = _directory_listings.matches(
+                    search_dir,
+                    file_part,
+                    self.max_completions,
+                    self._context_filter(context),
+                )
+
+            except (FileNotFoundError, NotADirectoryError):
+                return []
 
             except PermissionError:
                 logger.debug(f"Permission denied accessing {search_dir}")
 
                 return []
 
+            # Sort: directories first, then files
+
+            return sorted(
+                (prefix + name for name in names), key=self._sort_path_completions
+            )
+
         except Exception as e:
             logger.error(f"Error in file path completion: {e}")
 
@@ -216,34 +417,18 @@ class FilePathCompletionProvider(CompletionProvider):
     async def _complete_directory(self, directory: Path) -> List[str]:
         """Complete contents of a directory."""
 
-        completions = []
-
         try:
-            for item in directory.iterdir():
-                name = item.name
-
-                # Skip hidden files by default
-
-                if name.startswith("."):
-                    continue
-
-                if item.is_dir():
-                    completions.append(name + "/")
+            names = _directory_listings.matches(directory, "", self.max_completions)
 
-                else:
-                    completions.append(name)
-
-            return sorted(completions, key=self._sort_path_completions)
-
-        except (PermissionError, OSError):
+        except OSError:
             return []
 
-    def _apply_context_filtering(
-        self, context: CompletionContext, completions: List[str]
-    ) -> List[str]:
-        """Apply context-specific file filtering."""
+        return sorted(names, key=self._sort_path_completions)
 
-        # If no context hints, return all completions
+    def _context_filter(
+        self, context: CompletionContext
+    ) -> Optional[Callable[[str], bool]]:
+        """Return a filter for the file types the context expects, if any."""
 
         command = context.current_command.lower()
 
@@ -262,29 +447,57 @@ class FilePathCompletionProvider(CompletionProvider):
         if "data" in args_text or command in ["load", "import", "export"]:
             expected_types.update(self.file_filters["data"])
 
-        # If no specific type expected, return all
+        # If no specific type expected, accept all
 
         if not expected_types:
-            return completions
+            return None
 
-        # Filter files by expected types (keep all directories)
+        suffixes = tuple(ext.lower() for ext in expected_types)
 
-        filtered = []
+        # Keep all directories, and files with an expected extension
 
-        for completion in completions:
-            if completion.endswith("/"):  # Directory
-                filtered.append(completion)
+        return lambda name: name.endswith("/") or name.lower().endswith(suffixes)
 
-            else:
-                # Check if file extension matches expected types
 
-                for ext in expected_types:
-                    if completion.lower().endswith(ext.lower()):
-                        filtered.append(completion)
+class CommandTreeProvider(CompletionProvider):
+    """
+
+    Subcommand and option completion from the command tree of the CLI.
+
+    Shells send the tree of the generated CLI with each request; the
+
+    registry's command analyzer finds the subcommands and options of the
+
+    command being typed, and this provider offers those matching the word.
+
+    """
 
-                        break
+    # Answers follow the tree sent with the request, which the cache does not track
 
-        return filtered
+    cacheable = False
+
+    def __init__(self, priority: int = 90):
+        """Initialize with the highest priority; these are the CLI's own words."""
+
+        super().__init__(priority)
+
+    def can_provide(self, context: CompletionContext) -> bool:
+        """Check if the command being typed has subcommands or options."""
+
+        return bool(context.available_commands or context.available_options)
+
+    async def provide_completions(self, context: CompletionContext) -> List[str]:
+        """Provide the matching subcommands, or options for words starting with -."""
+
+        word = context.current_word
+
+        candidates = (
+            context.available_options
+            if word.startswith("-")
+            else context.available_commands
+        )
+
+        return sorted(name for name in candidates if name.startswith(word))
 
 
 class EnvironmentVariableProvider(CompletionProvider):
@@ -302,6 +515,10 @@ class EnvironmentVariableProvider(CompletionProvider):
 
     """
 
+    # Answers follow the environment, which the cache does not track
+
+    cacheable = False
+
     def __init__(self, priority: int = 70):
         """Initialize with medium-high priority."""
 
@@ -432,6 +649,10 @@ class ConfigKeyProvider(CompletionProvider):
 
     """
 
+    # Answers follow config file contents, which the cache does not track
+
+    cacheable = False
+
     def __init__(self, priority: int = 60):
         """Initialize with medium priority."""
 
@@ -456,6 +677,14 @@ class ConfigKeyProvider(CompletionProvider):
             "deploy",
         }
 
+        self._common_index = PrefixIndex(self.common_keys)
+
+        # Index of the last config's top-level keys, rebuilt when they change
+
+        self._config_keys: Tuple[Any, ...] = ()
+
+        self._config_index = PrefixIndex()
+
     def can_provide(self, context: CompletionContext) -> bool:
         """Check if we should provide config key completions."""
 
@@ -492,9 +721,9 @@ class ConfigKeyProvider(CompletionProvider):
 
             # Add common configuration keys
 
-            for key in self.common_keys:
-                if key.startswith(current_word.lower()):
-                    completions.append(key)
+            completions.extend(
+                self._common_index.keys_with_prefix(current_word.lower())
+            )
 
             # Remove duplicates and sort
 
@@ -507,24 +736,41 @@ class ConfigKeyProvider(CompletionProvider):
 
             return []
 
-    def _get_config_keys(self, config: Dict[str, Any], prefix: str = "") -> List[str]:
+    def _get_config_keys(
+        self, config: Mapping[str, Any], prefix: str = ""
+    ) -> List[str]:
         """Extract keys from configuration dictionary."""
 
         keys = []
 
-        for key, value in config.items():
-            if not prefix or key.startswith(prefix):
-                keys.append(key)
+        for key in self._index_config(config).keys_with_prefix(prefix):
+            keys.append(key)
+
+            # For nested dictionaries, add dot-notation keys
 
-                # For nested dictionaries, add dot-notation keys
+            value = config[key]
 
-                if isinstance(value, dict) and prefix:
-                    nested_keys = self._get_nested_keys(value, f"{key}.")
+            if isinstance(value, dict) and prefix:
+                nested_keys = self._get_nested_keys(value, f"{key}.")
 
-                    keys.extend(nested_keys)
+                keys.extend(nested_keys)
 
         return keys
 
+    def _index_config(self, config: Mapping[str, Any]) -> PrefixIndex:
+        """Get the prefix index of the config's top-level keys."""
+
+        config_keys = tuple(config)
+
+        if config_keys != self._config_keys:
+            self._config_index = PrefixIndex(
+                key for key in config_keys if isinstance(key, str)
+            )
+
+            self._config_keys = config_keys
+
+        return self._config_index
+
     def _get_nested_keys(self, config: Dict[str, Any], prefix: str) -> List[str]:
         """Get nested configuration keys with dot notation."""
 
@@ -558,6 +804,10 @@ class HistoryProvider(CompletionProvider):
 
     """
 
+    # History grows with every command
+
+    cacheable = False
+
     def __init__(self, priority: int = 40):
         """Initialize with lower priority (used as fallback)."""
 
@@ -570,32 +820,34 @@ class HistoryProvider(CompletionProvider):
 
         # Always provide history as a fallback
 
-        return bool(context.history)
+        return bool(context.history) or bool(context.history_store)
 
     async def provide_completions(self, context: CompletionContext) -> List[str]:
         """Provide command history completions."""
 
         try:
-            if not context.history:
-                return []
-
             current_word = context.current_word
 
-            completions = []
+            # Most frecent (or, without a store, most recent) matching
+
+            # commands first, one extra in case the word itself is among them
 
-            # Filter history for matching commands
+            if context.history_store:
+                matches = context.history_store.top(
+                    current_word, self.max_suggestions + 1
+                )
 
-            for cmd in reversed(context.history):  # Most recent first
-                if cmd.startswith(current_word) and cmd != current_word:
-                    if cmd not in completions:  # Avoid duplicates
-                        completions.append(cmd)
+            elif context.history:
+                matches = history_index(context.history).top(
+                    current_word, self.max_suggestions + 1
+                )
 
-                    # Limit number of suggestions
+            else:
+                return []
 
-                    if len(completions) >= self.max_suggestions:
-                        break
+            completions = [cmd for cmd in matches if cmd != current_word]
 
-            return completions
+            return completions[: self.max_suggestions]
 
         except Exception as e:
             logger.error(f"Error in history completion: {e}")
@@ -610,6 +862,7 @@ def setup_default_providers() -> List[CompletionProvider]:
     """Setup and return default completion providers."""
 
     providers = [
+        CommandTreeProvider(priority=90),
         FilePathCompletionProvider(priority=80),
         EnvironmentVariableProvider(priority=70),
         ConfigKeyProvider(priority=60),
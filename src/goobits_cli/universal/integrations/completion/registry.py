@@ -8,15 +8,279 @@ command context, and available options across all supported languages.
 
 """
 
+import asyncio
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Set
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from .history_store import HistoryStore
+from .latency import ProviderLatencyStats
 
 logger = logging.getLogger(__name__)
 
+# Worker threads for providers that block (file system listings, for example)
+
+_blocking_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_blocking_executor() -> ThreadPoolExecutor:
+    """Get the shared executor for blocking providers, creating it on first use."""
+
+    global _blocking_executor
+
+    if _blocking_executor is None:
+        _blocking_executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="goobits-completion"
+        )
+
+    return _blocking_executor
+
+
+def _run_blocking_provider(
+    provider: "CompletionProvider", context: "CompletionContext"
+) -> List[str]:
+    """Run a blocking provider to completion on the calling worker thread."""
+
+    return asyncio.run(provider.provide_completions(context))
+
+
+class _LazyMapping(Mapping):
+    """Read-only mapping whose contents are loaded on first access."""
+
+    def __init__(self, loader: Callable[[], Mapping]):
+        self._loader = loader
+
+        self._data: Optional[Mapping] = None
+
+    def _load(self) -> Mapping:
+        if self._data is None:
+            self._data = self._loader()
+
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        state = "unloaded" if self._data is None else repr(dict(self._data))
+
+        return f"<lazy mapping {state}>"
+
+
+class CompletionContextCache:
+    """
+
+    State reused across completion requests to keep context building cheap.
+
+    Features:
+
+    - Environment snapshot copied again only when the environment changed
+
+    - Config files parsed once per path and modification time
+
+    The returned mappings are shared between requests and must not be modified.
+
+    """
+
+    # Parsed config files kept, oldest dropped first
+
+    max_configs = 64
+
+    def __init__(self):
+        """Initialize an empty cache."""
+
+        self._lock = Lock()
+
+        self._env_source: Optional[Dict[Any, Any]] = None
+
+        self._env: Dict[str, str] = {}
+
+        self._configs: Dict[Path, Tuple[Tuple[int, int], Optional[Dict[str, Any]]]] = {}
+
+    def environment(self) -> Dict[str, str]:
+        """Return a snapshot of os.environ, refreshed when it changed."""
+
+        # os.environ keeps its raw (encoded) variables in _data; comparing that
+
+        # dict is far cheaper than decoding every variable into a new copy
+
+        raw = getattr(os.environ, "_data", None)
+
+        with self._lock:
+            if raw is None or raw != self._env_source:
+                self._env = dict(os.environ)
+
+                self._env_source = dict(raw) if raw is not None else None
+
+            return self._env
+
+    def config(self, paths: List[Path]) -> Dict[str, Any]:
+        """
+
+        Return the parsed content of the first readable config file.
+
+        Args:
+
+            paths: Candidate files in order of preference
+
+        Returns:
+
+            Parsed configuration, or an empty dict if no file could be loaded
+
+        """
+
+        for path in paths:
+            try:
+                stat = path.stat()
+
+            except OSError:
+                continue
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+
+            with self._lock:
+                cached = self._configs.get(path)
+
+            if cached is not None and cached[0] == signature:
+                config = cached[1]
+
+            else:
+                config = self._parse_config(path)
+
+                with self._lock:
+                    self._configs.pop(path, None)
+
+                    self._configs[path] = (signature, config)
+
+                    while len(self._configs) > self.max_configs:
+                        del self._configs[next(iter(self._configs))]
+
+            # Unparseable files are remembered as None and skipped
+
+            if config is not None:
+                return config
+
+        return {}
+
+    def _parse_config(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Parse a YAML config file, returning None if it cannot be read."""
+
+        try:
+            import yaml
+
+            with open(path) as f:
+                config = yaml.safe_load(f) or {}
+
+        except Exception:
+            return None
+
+        return config if isinstance(config, dict) else {}
+
+
+class CompletionCache:
+    """
+
+    LRU cache with a TTL for provider results.
+
+    Keys are built by the registry and include the working directory and the
+
+    modification time of the directory being completed, so entries never
+
+    outlive a ``cd`` or a change to the listed directory.
+
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60.0):
+        """Initialize the cache with its size bound and entry lifetime (seconds)."""
+
+        self.max_size = max_size
+
+        self.ttl = ttl
+
+        self._lock = Lock()
+
+        # Least recently used first: key -> (stored at, completions)
+
+        self._entries: OrderedDict = OrderedDict()
+
+        self._hits = 0
+
+        self._misses = 0
+
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        """Return the live entry for key, or None."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+
+                self._hits += 1
+
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self._misses += 1
+
+            return None
+
+    def put(self, key: Hashable, completions: List[str]) -> None:
+        """Store completions as the most recently used entry."""
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+            self._entries[key] = (time.monotonic(), list(completions))
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counts."""
+
+        with self._lock:
+            lookups = self._hits + self._misses
+
+            return {
+                "cache_size": len(self._entries),
+                "cache_max_size": self.max_size,
+                "cache_ttl": self.ttl,
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_hit_rate": self._hits / lookups if lookups else 0.0,
+                "cache_evictions": self._evictions,
+            }
+
 
 @dataclass
 class CompletionContext:
@@ -38,20 +302,28 @@ class CompletionContext:
 
     cwd: Path = field(default_factory=lambda: Path.cwd())
 
-    # Environment variables
+    # Environment variables (registry contexts load them on first access)
 
-    env: Dict[str, str] = field(default_factory=dict)
+    env: Mapping = field(default_factory=dict)
 
     # Command history
 
     history: List[str] = field(default_factory=list)
 
+    # Persistent frecency-ranked history, when the registry has one
+
+    history_store: Optional[HistoryStore] = None
+
     # Available commands and options
 
     available_commands: Set[str] = field(default_factory=set)
 
     available_options: Set[str] = field(default_factory=set)
 
+    # Commands and options of the CLI being completed, when the shell sent them
+
+    command_tree: Mapping = field(default_factory=dict)
+
     # Context-specific metadata
 
     metadata: Dict[str, Any] = field(default_factory=dict)
@@ -60,13 +332,37 @@ class CompletionContext:
 
     language: str = "python"
 
-    # Configuration context
+    # Configuration context (registry contexts load it on first access)
 
-    config: Dict[str, Any] = field(default_factory=dict)
+    config: Mapping = field(default_factory=dict)
 
 
 class CompletionProvider(ABC):
-    """Abstract base class for completion providers."""
+    """
+
+    Abstract base class for completion providers.
+
+    Providers whose provide_completions does blocking I/O set ``blocking`` so
+
+    the registry runs them on a worker thread, where a late one can be
+
+    abandoned without stalling the others. ``timeout`` caps a provider's
+
+    share of the registry's time budget.
+
+    Results are cached per provider for the same input, working directory
+
+    and directory contents. Providers whose answers depend on anything else
+
+    (history, environment, config files) set ``cacheable`` to False.
+
+    """
+
+    blocking: bool = False
+
+    timeout: Optional[float] = None
+
+    cacheable: bool = True
 
     def __init__(self, priority: int = 50):
         """Initialize provider with priority (higher = more important)."""
@@ -127,19 +423,49 @@ class DynamicCompletionRegistry:
 
     """
 
-    def __init__(self):
-        """Initialize the completion registry."""
+    def __init__(self, history_store: Optional[HistoryStore] = None):
+        """
+
+        Initialize the completion registry.
+
+        Args:
+
+            history_store: Persistent history offered to providers via contexts
+
+        """
+
+        self.history_store = history_store
 
         self._providers: List[CompletionProvider] = []
 
         self._context_analyzers: Dict[str, Callable] = {}
 
-        self._completion_cache: Dict[str, List[str]] = {}
-
         self._cache_max_size = 1000
 
+        self._completion_cache = CompletionCache(max_size=self._cache_max_size)
+
         self._enabled = True
 
+        # Providers run concurrently; those still running after the budget
+
+        # (seconds) are cancelled and their results left out
+
+        self._time_budget = 0.05
+
+        # Stop waiting for lower-priority providers once the finished
+
+        # higher-priority ones have produced this many completions
+
+        self._enough_results = 20
+
+        # Environment and config file state shared by the contexts built here
+
+        self._context_cache = CompletionContextCache()
+
+        # Latency histograms and timeout counts by provider class name
+
+        self._provider_stats: Dict[str, ProviderLatencyStats] = {}
+
         # Language-specific completion strategies
 
         self._language_strategies = {
@@ -167,6 +493,8 @@ class DynamicCompletionRegistry:
 
             self._providers.sort(key=self._get_provider_priority, reverse=True)
 
+            self._completion_cache.clear()
+
             logger.debug(
                 f"Registered completion provider: {provider.__class__.__name__}"
             )
@@ -177,6 +505,8 @@ class DynamicCompletionRegistry:
         if provider in self._providers:
             self._providers.remove(provider)
 
+            self._completion_cache.clear()
+
             logger.debug(
                 f"Unregistered completion provider: {provider.__class__.__name__}"
             )
@@ -189,7 +519,12 @@ class DynamicCompletionRegistry:
         logger.debug(f"Registered context analyzer: {name}")
 
     async def get_completions(
-        self, current_word: str, full_command: str, language: str = "python"
+        self,
+        current_word: str,
+        full_command: str,
+        language: str = "python",
+        cwd: Optional[Path] = None,
+        command_tree: Optional[Mapping] = None,
     ) -> List[str]:
         """
 
@@ -203,6 +538,10 @@ class DynamicCompletionRegistry:
 
             language: Target language (python, nodejs, typescript, rust)
 
+            cwd: Directory to complete relative to (default: the current one)
+
+            command_tree: Commands and options of the CLI being completed
+
         Returns:
 
             List of completion suggestions
@@ -212,33 +551,16 @@ class DynamicCompletionRegistry:
         if not self._enabled:
             return []
 
-        # Check cache first
-
-        cache_key = f"{language}:{current_word}:{full_command}"
-
-        if cache_key in self._completion_cache:
-            return self._completion_cache[cache_key]
-
         try:
             # Build context
 
-            context = await self._build_context(current_word, full_command, language)
+            context = await self._build_context(
+                current_word, full_command, language, cwd, command_tree
+            )
 
             # Get completions from all applicable providers
 
-            all_completions = []
-
-            for provider in self._providers:
-                if provider.is_enabled() and provider.can_provide(context):
-                    try:
-                        completions = await provider.provide_completions(context)
-
-                        all_completions.extend(completions)
-
-                    except Exception as e:
-                        logger.warning(
-                            f"Provider {provider.__class__.__name__} failed: {e}"
-                        )
+            all_completions = await self._collect_completions(context)
 
             # Apply language-specific filtering and ranking
 
@@ -260,10 +582,6 @@ class DynamicCompletionRegistry:
 
                     seen.add(completion)
 
-            # Cache results
-
-            self._cache_completion(cache_key, unique_completions)
-
             return unique_completions
 
         except Exception as e:
@@ -271,8 +589,251 @@ class DynamicCompletionRegistry:
 
             return []
 
+    async def _collect_completions(self, context: CompletionContext) -> List[str]:
+        """
+
+        Run the applicable providers concurrently within the time budget.
+
+        Each provider has a deadline of the overall budget, or its own
+
+        ``timeout`` if shorter; providers still running at their deadline are
+
+        cancelled. Waiting also stops early once every provider down to some
+
+        priority has finished and together they produced ``_enough_results``.
+
+        Cacheable providers are answered from the cache when possible.
+
+        Returns:
+
+            Completions merged in provider priority order
+
+        """
+
+        providers = [
+            provider
+            for provider in self._providers
+            if provider.is_enabled() and provider.can_provide(context)
+        ]
+
+        if not providers:
+            return []
+
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+
+        budget_end = start + self._time_budget
+
+        # Results by provider index (providers are sorted by priority)
+
+        results: List[Optional[List[str]]] = [None] * len(providers)
+
+        tasks: Dict[asyncio.Future, int] = {}
+
+        deadlines: Dict[asyncio.Future, float] = {}
+
+        scope = self._completion_scope(context)
+
+        for index, provider in enumerate(providers):
+            cache_key = None
+
+            if provider.cacheable:
+                cache_key = (provider, context.language, tuple(context.args)) + scope
+
+                results[index] = self._completion_cache.get(cache_key)
+
+                if results[index] is not None:
+                    continue
+
+            task = asyncio.ensure_future(
+                self._call_provider(provider, context, cache_key)
+            )
+
+            tasks[task] = index
+
+            deadlines[task] = (
+                budget_end
+                if provider.timeout is None
+                else min(budget_end, start + provider.timeout)
+            )
+
+        pending = set(tasks)
+
+        finished = 0
+
+        abandoned = []
+
+        while pending:
+            wait = max(0.0, min(deadlines[task] for task in pending) - loop.time())
+
+            done, pending = await asyncio.wait(
+                pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                index = tasks[task]
+
+                try:
+                    results[index] = task.result()
+
+                except Exception as e:
+                    logger.warning(
+                        f"Provider {providers[index].__class__.__name__} failed: {e}"
+                    )
+
+                    results[index] = []
+
+            # Cancel providers that are past their deadline
+
+            now = loop.time()
+
+            for task in [task for task in pending if deadlines[task] <= now]:
+                task.cancel()
+
+                self._stats_for(providers[tasks[task]]).record_timeout()
+
+                pending.discard(task)
+
+                abandoned.append(task)
+
+                results[tasks[task]] = []
+
+                logger.debug(
+                    f"Provider {providers[tasks[task]].__class__.__name__} "
+                    "missed the completion deadline"
+                )
+
+            # Early exit once the highest-priority providers answered enough
+
+            while finished < len(results) and results[finished] is not None:
+                finished += 1
+
+            if sum(len(result) for result in results[:finished]) >= (
+                self._enough_results
+            ):
+                break
+
+        for task in pending:
+            task.cancel()
+
+            self._stats_for(providers[tasks[task]]).record_cancellation()
+
+            abandoned.append(task)
+
+        # Let cancelled providers unwind; blocking ones are left to their thread
+
+        await asyncio.gather(*abandoned, return_exceptions=True)
+
+        merged = []
+
+        for result in results:
+            merged.extend(result or [])
+
+        return merged
+
+    def _completion_scope(self, context: CompletionContext) -> Tuple[Any, ...]:
+        """
+
+        Describe what file completions for the context depend on.
+
+        Returns:
+
+            The current word, the working directory, the directory the word
+
+            points into and that directory's modification time
+
+        """
+
+        directory = os.path.join(
+            str(context.cwd), os.path.dirname(os.path.expanduser(context.current_word))
+        )
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+
+        except OSError:
+            mtime = None
+
+        return (context.current_word, str(context.cwd), directory, mtime)
+
+    async def _call_provider(
+        self,
+        provider: CompletionProvider,
+        context: CompletionContext,
+        cache_key: Optional[Hashable] = None,
+    ) -> List[str]:
+        """
+
+        Call a provider, on a worker thread if it blocks, and cache its result.
+
+        The latency of calls that return or raise is recorded; cancelled calls
+
+        are counted by the caller.
+
+        """
+
+        stats = self._stats_for(provider)
+
+        start = time.perf_counter()
+
+        try:
+            if not provider.blocking:
+                completions = await provider.provide_completions(context)
+
+                if cache_key is not None:
+                    self._completion_cache.put(cache_key, completions)
+
+            else:
+                future = _get_blocking_executor().submit(
+                    _run_blocking_provider, provider, context
+                )
+
+                if cache_key is not None:
+                    # Cached even when it arrives after the deadline, for the
+
+                    # next request
+
+                    future.add_done_callback(
+                        lambda done: self._cache_provider_result(cache_key, done)
+                    )
+
+                completions = await asyncio.wrap_future(future)
+
+        except Exception:
+            stats.record(time.perf_counter() - start, failed=True)
+
+            raise
+
+        stats.record(time.perf_counter() - start)
+
+        return completions
+
+    def _stats_for(self, provider: CompletionProvider) -> ProviderLatencyStats:
+        """Get the latency statistics of a provider's class, creating them."""
+
+        name = provider.__class__.__name__
+
+        stats = self._provider_stats.get(name)
+
+        if stats is None:
+            stats = self._provider_stats.setdefault(name, ProviderLatencyStats())
+
+        return stats
+
+    def _cache_provider_result(self, cache_key: Hashable, future: Future) -> None:
+        """Cache the result of a finished blocking provider call."""
+
+        if not future.cancelled() and future.exception() is None:
+            self._completion_cache.put(cache_key, future.result())
+
     async def _build_context(
-        self, current_word: str, full_command: str, language: str
+        self,
+        current_word: str,
+        full_command: str,
+        language: str,
+        cwd: Optional[Path] = None,
+        command_tree: Optional[Mapping] = None,
     ) -> CompletionContext:
         """Build completion context from current input."""
 
@@ -282,19 +843,19 @@ class DynamicCompletionRegistry:
 
         current_command = args[0] if args else ""
 
-        # Get environment context
-
-        env = dict(os.environ)
+        # Build base context; the environment is only read if a provider
 
-        # Build base context
+        # needs it
 
         context = CompletionContext(
             current_command=current_command,
             current_word=current_word,
             args=args,
-            cwd=Path.cwd(),
-            env=env,
+            cwd=cwd or Path.cwd(),
+            env=_LazyMapping(self._context_cache.environment),
             language=language,
+            history_store=self.history_store,
+            command_tree=command_tree or {},
         )
 
         # Apply context analyzers
@@ -312,13 +873,26 @@ class DynamicCompletionRegistry:
         """Setup built-in context analyzers."""
 
         def command_analyzer(context: CompletionContext) -> None:
-            """Analyze command structure and options."""
+            """Offer the subcommands and options of the command being typed."""
+
+            node = context.command_tree
+
+            if not node:
+                return
+
+            # Follow the typed subcommands, leaving out the word being completed
+
+            words = context.args[1:]
 
-            # Extract available commands from help or config
+            if context.current_word and words and words[-1] == context.current_word:
+                words = words[:-1]
 
-            # This would be populated from the CLI configuration
+            for word in words:
+                node = node.get("commands", {}).get(word, node)
 
-            pass
+            context.available_commands.update(node.get("commands", ()))
+
+            context.available_options.update(node.get("options", ()))
 
         def file_analyzer(context: CompletionContext) -> None:
             """Analyze file system context."""
@@ -332,7 +906,7 @@ class DynamicCompletionRegistry:
         def config_analyzer(context: CompletionContext) -> None:
             """Analyze configuration context."""
 
-            # Load configuration if available
+            # Load configuration if available, once a provider asks for it
 
             config_files = [
                 context.cwd / "goobits.yaml",
@@ -340,18 +914,9 @@ class DynamicCompletionRegistry:
                 Path.home() / ".goobits" / "config.yaml",
             ]
 
-            for config_file in config_files:
-                if config_file.exists():
-                    try:
-                        import yaml
-
-                        with open(config_file) as f:
-                            context.config = yaml.safe_load(f) or {}
-
-                        break
-
-                    except Exception:
-                        pass
+            context.config = _LazyMapping(
+                lambda: self._context_cache.config(config_files)
+            )
 
         self.register_context_analyzer("command", command_analyzer)
 
@@ -463,21 +1028,6 @@ class DynamicCompletionRegistry:
 
         return completions
 
-    def _cache_completion(self, key: str, completions: List[str]) -> None:
-        """Cache completion results with size management."""
-
-        if len(self._completion_cache) >= self._cache_max_size:
-            # Remove oldest entries (simple FIFO)
-
-            oldest_keys = list(self._completion_cache.keys())[
-                : self._cache_max_size // 2
-            ]
-
-            for old_key in oldest_keys:
-                del self._completion_cache[old_key]
-
-        self._completion_cache[key] = completions
-
     def clear_cache(self) -> None:
         """Clear the completion cache."""
 
@@ -504,15 +1054,28 @@ class DynamicCompletionRegistry:
         return self._providers.copy()
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Get registry statistics."""
+        """
+
+        Get registry statistics.
+
+        ``provider_latency`` maps each provider class that was called to its
+
+        finished calls, latency mean and p50/p95/p99/max in milliseconds, and
+
+        its error, timeout and cancellation counts.
+
+        """
 
         return {
             "providers_count": len(self._providers),
             "enabled_providers": len([p for p in self._providers if p.is_enabled()]),
-            "cache_size": len(self._completion_cache),
-            "cache_max_size": self._cache_max_size,
+            **self._completion_cache.get_statistics(),
             "analyzers_count": len(self._context_analyzers),
             "enabled": self._enabled,
+            "provider_latency": {
+                name: stats.summary()
+                for name, stats in list(self._provider_stats.items())
+            },
         }
 
 
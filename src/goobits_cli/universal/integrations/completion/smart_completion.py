@@ -9,15 +9,81 @@ Extends the existing completion system with intelligent features:
 """
 
 import logging
+import os
 import time
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Dict, List
-
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from .fuzzy import (
+    FuzzyIndex,
+    best_score,
+    fuzzy_score,
+    history_fuzzy_index,
+    merge_matches,
+)
+from .history_store import HistoryStore
+from .prefix_index import history_index
+from .providers import _RACY_WINDOW_NS, get_directory_listing_cache
 from .registry import CompletionContext, CompletionProvider, DynamicCompletionRegistry
 
 logger = logging.getLogger(__name__)
 
+# Terms offered by fuzzy matching for every language, and per language
+COMMON_TERMS = ("build", "test", "install", "config", "help", "version")
+LANGUAGE_TERMS = {
+    "python": ("pytest", "pip", "poetry", "black", "mypy"),
+    "nodejs": ("npm", "yarn", "node", "tsc", "webpack"),
+    "rust": ("cargo", "rustc", "clippy", "fmt", "doc"),
+}
+
+# Fuzzy indexes of directories, keyed by path and kept while the directory's
+# mtime is unchanged; providers build them on worker threads
+_MAX_DIRECTORY_INDEXES = 8
+_directory_indexes: "OrderedDict[str, Tuple[int, FuzzyIndex]]" = OrderedDict()
+_directory_lock = Lock()
+
+# Entries of a directory indexed for fuzzy matching; larger directories are
+# sampled, since scanning and indexing them all would not fit the budget
+MAX_DIRECTORY_ENTRIES = 2_000
+
+
+@lru_cache(maxsize=None)
+def _term_index(language: str) -> FuzzyIndex:
+    """Return the fuzzy index of the common and language-specific terms."""
+    return FuzzyIndex(COMMON_TERMS + LANGUAGE_TERMS.get(language, ()))
+
+
+def _directory_index(path: Path) -> Optional[FuzzyIndex]:
+    """Return a fuzzy index of a directory's first visible entries, or None."""
+    key = os.fspath(path)
+    try:
+        mtime_ns = os.stat(key).st_mtime_ns
+        with _directory_lock:
+            cached = _directory_indexes.get(key)
+            if cached is not None and cached[0] == mtime_ns:
+                _directory_indexes.move_to_end(key)
+                return cached[1]
+
+        # A bounded scan; the listing cache reads the rest in the background
+        names = get_directory_listing_cache().matches(path, "", MAX_DIRECTORY_ENTRIES)
+    except OSError:
+        return None
+
+    index = FuzzyIndex(names)
+    # Entries added within the mtime granularity would be missed for good
+    if time.time_ns() - mtime_ns >= _RACY_WINDOW_NS:
+        with _directory_lock:
+            _directory_indexes[key] = (mtime_ns, index)
+            _directory_indexes.move_to_end(key)
+            if len(_directory_indexes) > _MAX_DIRECTORY_INDEXES:
+                _directory_indexes.popitem(last=False)
+    return index
+
 
 @dataclass
 class SmartCompletionContext:
@@ -33,6 +99,9 @@ class SmartCompletionContext:
     command_frequency: Dict[str, int] = field(default_factory=dict)
     recent_commands: List[str] = field(default_factory=list)
 
+    # Persistent history, ranked by frecency, when the engine has one
+    history_store: Optional[HistoryStore] = None
+
     # Performance tracking
     start_time: float = field(default_factory=time.time)
 
@@ -45,9 +114,14 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
     while adding intelligent completion capabilities.
     """
 
-    def __init__(self):
-        """Initialize smart completion engine."""
-        super().__init__()
+    def __init__(self, history_store: Optional[HistoryStore] = None):
+        """
+        Initialize smart completion engine.
+
+        Args:
+            history_store: Persistent history used for ranking and suggestions
+        """
+        super().__init__(history_store)
 
         # Smart completion features
         self._fuzzy_enabled = True
@@ -76,6 +150,8 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
         language: str = "python",
         enable_fuzzy: bool = True,
         enable_smart_history: bool = True,
+        cwd: Optional[Path] = None,
+        command_tree: Optional[Mapping] = None,
     ) -> List[str]:
         """
         Get smart completions with enhanced features.
@@ -86,6 +162,8 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
             language: Target language
             enable_fuzzy: Enable fuzzy matching
             enable_smart_history: Enable smart history features
+            cwd: Directory to complete relative to (default: the current one)
+            command_tree: Commands and options of the CLI being completed
 
         Returns:
             List of smart completion suggestions
@@ -98,14 +176,10 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
                 self._register_smart_providers()
                 self._smart_providers_registered = True
 
-            # Fast path: Check cache first with smart key
-            smart_cache_key = f"smart:{language}:{current_word}:{full_command}:{enable_fuzzy}:{enable_smart_history}"
-            if smart_cache_key in self._completion_cache:
-                return self._completion_cache[smart_cache_key]
-
-            # Get base completions from parent registry
+            # Get base completions from parent registry (provider results
+            # are cached there; the cheap smart steps below are not)
             base_completions = await super().get_completions(
-                current_word, full_command, language
+                current_word, full_command, language, cwd, command_tree
             )
 
             # Quick exit if no base results and no smart features to apply
@@ -130,8 +204,8 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
                     base_completions.extend(fuzzy_matches)
 
                 if enable_smart_history and self._smart_history_enabled:
-                    # Fast history ranking without complex analysis
-                    base_completions = self._apply_fast_history_ranking(
+                    # One frecency lookup per completion
+                    base_completions = self._apply_smart_history_ranking(
                         base_completions, smart_context
                     )
 
@@ -145,15 +219,14 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
                     if len(unique_completions) >= 15:  # Limit early for performance
                         break
 
-            # Cache results
-            self._completion_cache[smart_cache_key] = unique_completions
-
             return unique_completions
 
         except Exception as e:
             logger.error(f"Error in smart completions: {e}")
             # Fast fallback
-            return await super().get_completions(current_word, full_command, language)
+            return await super().get_completions(
+                current_word, full_command, language, cwd, command_tree
+            )
 
     async def _build_smart_context(
         self, current_word: str, full_command: str, language: str, start_time: float
@@ -191,44 +264,17 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
     ) -> SmartCompletionContext:
         """Build lightweight smart context for performance."""
         # Fast context with minimal processing
-        return SmartCompletionContext()
+        return SmartCompletionContext(history_store=self.history_store)
 
     def _get_fast_fuzzy_matches(self, current_word: str, language: str) -> List[str]:
-        """Get fuzzy matches with performance optimization."""
+        """Get fuzzy matches among the common and language-specific terms."""
         if len(current_word) < 2:
             return []
 
-        # Pre-built candidate sets for performance
-        candidates = {"build", "test", "install", "help", "version"}
-
-        # Language-specific fast candidates
-        if language == "python":
-            candidates.update(["pytest", "pip"])
-        elif language == "nodejs":
-            candidates.update(["npm", "node"])
-        elif language == "rust":
-            candidates.update(["cargo", "clippy"])
-
-        # Fast substring matching only
-        matches = []
-        current_lower = current_word.lower()
-        for candidate in candidates:
-            if current_lower in candidate.lower() and not candidate.startswith(
-                current_lower
-            ):
-                matches.append(candidate)
-                if len(matches) >= 3:  # Limit for performance
-                    break
-
-        return matches
-
-    def _apply_fast_history_ranking(
-        self, completions: List[str], context: SmartCompletionContext
-    ) -> List[str]:
-        """Apply fast history ranking without complex analysis."""
-        # Simple: just return completions as-is for performance
-        # In a real implementation, we'd do minimal frequency checking
-        return completions
+        matches = _term_index(language).search(
+            current_word, 3, skip_prefix_matches=True
+        )
+        return [candidate for _, candidate in matches]
 
     def _get_fuzzy_matches(
         self, current_word: str, completions: List[str], context: SmartCompletionContext
@@ -260,26 +306,25 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
         if not query or not candidate:
             return 0.0
 
-        # Simple substring-based scoring
-        if query in candidate:
-            return 0.8
-
-        # Character overlap scoring
-        query_chars = set(query)
-        candidate_chars = set(candidate)
-        overlap = len(query_chars & candidate_chars)
-        union = len(query_chars | candidate_chars)
-
-        if union == 0:
+        # Relative to the query matching itself, the best possible alignment
+        score = fuzzy_score(query, candidate)
+        if score is None:
             return 0.0
-
-        return overlap / union
+        return min(1.0, score / best_score(query))
 
     def _apply_smart_history_ranking(
         self, completions: List[str], context: SmartCompletionContext
     ) -> List[str]:
         """Apply smart history-based ranking to completions."""
 
+        if context.history_store is not None:
+            # Commands used before first, most frecent first; the rest keep
+            # their order
+            scores = {c: context.history_store.frecency(c) for c in completions}
+            used = [c for c in completions if scores[c] is not None]
+            used.sort(key=scores.__getitem__, reverse=True)
+            return used + [c for c in completions if scores[c] is None]
+
         # Separate into history-based and other completions
         history_completions = []
         other_completions = []
@@ -306,10 +351,21 @@ class SmartCompletionEngine(DynamicCompletionRegistry):
         # Return history-based completions first, then others
         return ranked_history + other_completions
 
+    def record_command(self, command: str) -> None:
+        """Record a command in the history store, if the engine has one."""
+        if self.history_store is not None:
+            self.history_store.record(command)
+
 
 class HistoryCompletionProvider(CompletionProvider):
     """Enhanced history completion with frequency and recency ranking."""
 
+    # History grows with every command
+    cacheable = False
+
+    # Commands further back than this get no recency bonus
+    RECENCY_WINDOW = 100
+
     def __init__(self, priority: int = 85):
         """Initialize with high priority for smart history."""
         super().__init__(priority)
@@ -317,11 +373,17 @@ class HistoryCompletionProvider(CompletionProvider):
 
     def can_provide(self, context: CompletionContext) -> bool:
         """Provide history completions when available."""
-        return bool(context.history) and len(context.current_word) >= 1
+        has_history = bool(context.history) or bool(context.history_store)
+        return has_history and len(context.current_word) >= 1
 
     async def provide_completions(self, context: CompletionContext) -> List[str]:
         """Provide enhanced history completions."""
         try:
+            if context.history_store:
+                # Ranked by frecency already
+                return context.history_store.top(
+                    context.current_word, self.max_suggestions
+                )
             if not context.history:
                 return []
 
@@ -330,8 +392,10 @@ class HistoryCompletionProvider(CompletionProvider):
             # Analyze command patterns
             command_scores = defaultdict(float)
 
-            # Score commands based on frequency and recency
-            for i, cmd in enumerate(reversed(context.history)):
+            # Score commands based on frequency and recency; the bonus drops
+            # by 0.1 per step back, so only the last RECENCY_WINDOW commands earn any
+            recent = context.history[-self.RECENCY_WINDOW :]
+            for i, cmd in enumerate(reversed(recent)):
                 if cmd.lower().startswith(current_word):
                     # Recency bonus (more recent = higher score)
                     recency_bonus = max(0, 10 - i * 0.1)
@@ -341,8 +405,20 @@ class HistoryCompletionProvider(CompletionProvider):
             scored_commands = sorted(
                 command_scores.items(), key=lambda x: x[1], reverse=True
             )
+            suggestions = [cmd for cmd, _ in scored_commands[: self.max_suggestions]]
 
-            return [cmd for cmd, _ in scored_commands[: self.max_suggestions]]
+            # Fill up with older matches, most recently used first
+            if len(suggestions) < self.max_suggestions:
+                older = history_index(context.history, fold_case=True).top(
+                    current_word, self.max_suggestions + len(suggestions)
+                )
+                for cmd in older:
+                    if cmd not in command_scores:
+                        suggestions.append(cmd)
+                        if len(suggestions) >= self.max_suggestions:
+                            break
+
+            return suggestions
 
         except Exception as e:
             logger.error(f"Error in enhanced history completion: {e}")
@@ -350,7 +426,17 @@ class HistoryCompletionProvider(CompletionProvider):
 
 
 class FuzzyMatchProvider(CompletionProvider):
-    """Fuzzy matching completion provider."""
+    """
+    Fuzzy matching over commands, options, files in the working directory,
+    history and common terms.
+    """
+
+    # History grows with every command
+    cacheable = False
+
+    # Directory scans and index builds run on a worker thread, where a late
+    # call can be abandoned at its deadline
+    blocking = True
 
     def __init__(self, priority: int = 75):
         """Initialize with high priority for fuzzy matching."""
@@ -365,55 +451,34 @@ class FuzzyMatchProvider(CompletionProvider):
     async def provide_completions(self, context: CompletionContext) -> List[str]:
         """Provide fuzzy matching completions."""
         try:
-            current_word = context.current_word.lower()
-
-            # Build candidate list from available commands and common terms
-            candidates = set()
-            candidates.update(context.available_commands)
-            candidates.update(["build", "test", "install", "config", "help", "version"])
-
-            # Add language-specific commands
-            if context.language == "python":
-                candidates.update(["pytest", "pip", "poetry", "black", "mypy"])
-            elif context.language == "nodejs":
-                candidates.update(["npm", "yarn", "node", "tsc", "webpack"])
-            elif context.language == "rust":
-                candidates.update(["cargo", "rustc", "clippy", "fmt", "doc"])
-
-            # Find fuzzy matches
-            matches = []
-            for candidate in candidates:
-                if candidate.lower().startswith(current_word):
-                    continue  # Skip exact prefix matches (handled elsewhere)
-
-                if current_word in candidate.lower():
-                    matches.append((candidate, 0.8))  # Substring match
-                elif self._has_character_overlap(current_word, candidate.lower()):
-                    matches.append((candidate, 0.6))  # Character overlap
-
-            # Sort by score and return top matches
-            matches.sort(key=lambda x: x[1], reverse=True)
-            return [match[0] for match in matches[: self.max_suggestions]]
+            indexes = [_term_index(context.language)]
+            known = context.available_commands | context.available_options
+            if known:
+                indexes.append(FuzzyIndex(sorted(known)))
+            if context.history:
+                indexes.append(history_fuzzy_index(context.history))
+            listing = _directory_index(context.cwd)
+            if listing is not None:
+                indexes.append(listing)
+
+            # Exact prefix matches are handled elsewhere
+            results = [
+                index.search(
+                    context.current_word,
+                    self.max_suggestions,
+                    skip_prefix_matches=True,
+                )
+                for index in indexes
+            ]
+            return merge_matches(results, self.max_suggestions)
 
         except Exception as e:
             logger.error(f"Error in fuzzy matching: {e}")
             return []
 
-    def _has_character_overlap(self, query: str, candidate: str) -> bool:
-        """Check if query and candidate have significant character overlap."""
-        if len(query) < 2 or len(candidate) < 2:
-            return False
-
-        query_chars = set(query)
-        candidate_chars = set(candidate)
-        overlap = len(query_chars & candidate_chars)
-
-        # Require at least 60% character overlap
-        return overlap >= max(2, len(query_chars) * 0.6)
-
 
 # Global smart registry instance
-_smart_registry = SmartCompletionEngine()
+_smart_registry = SmartCompletionEngine(history_store=HistoryStore())
 
 
 def get_smart_completion_registry() -> SmartCompletionEngine:
@@ -93,6 +93,7 @@ class IRBuilder:
             },
             "dependencies": self._extract_dependencies(config),
             "features": _safe_to_dict(_safe_get_attr(config, "features", {})),
+            "performance": _safe_to_dict(_safe_get_attr(config, "performance", {})),
             # Add feature requirements for conditional template generation
             "feature_requirements": feature_requirements,
             "metadata": {
@@ -161,6 +161,8 @@ class FeatureAnalyzer:
                     return True
                 if arg_dict.get("multiple", False):
                     return True
+                if arg_dict.get("nargs") in ("*", "+"):
+                    return True
 
             for opt in options:
                 opt_dict = _safe_to_dict(opt)
@@ -228,7 +230,9 @@ class FeatureAnalyzer:
                 # Format options often indicate table output
                 if "format" in opt_name and opt_dict.get("choices", []):
                     choices = [str(c).lower() for c in opt_dict.get("choices", [])]
-                    if any(fmt in choices for fmt in ["table", "csv", "json"]):
+                    if any(
+                        fmt in choices for fmt in ["table", "csv", "json", "ndjson"]
+                    ):
                         return True
 
         return False
@@ -5,11 +5,12 @@ Provides performance monitoring and subprocess caching.
 """
 
 from .monitor import MemoryTracker, PerformanceMonitor, StartupBenchmark
-from .subprocess_cache import run_cached
+from .subprocess_cache import run_cached, run_many
 
 __all__ = [
     "PerformanceMonitor",
     "StartupBenchmark",
     "MemoryTracker",
     "run_cached",
+    "run_many",
 ]
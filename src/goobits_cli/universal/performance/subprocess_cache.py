@@ -4,23 +4,101 @@ Session-based subprocess caching for Goobits CLI Framework
 Provides intelligent caching of subprocess results to avoid expensive repeated calls
 during a single CLI build session. Offers 30-50% performance improvement for
 builds with multiple package manager checks and system operations.
+
+Results of read-only probes (``pipx --version``, toolchain checks) can also be
+persisted in a SQLite store under the user cache dir, so their TTLs outlive the
+process that ran them.
+
+Callers may also declare files a result depends on (lockfiles, manifests, the
+interpreter's site-packages). Such entries are checked against the stat
+signatures of those paths on every hit, which makes long TTLs safe.
+
+Independent probes (toolchain versions, package listings) can be launched
+together with ``run_many``, which bounds concurrency and keeps result order.
 """
 
 import hashlib
 import json
+import locale
 import logging
 import os
 import shlex
+import sqlite3
 import subprocess
 import sys
+import sysconfig
 import time
-from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from threading import Lock
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Probes run_many keeps in flight at once unless told otherwise
+DEFAULT_PROBE_CONCURRENCY = 8
+
+# A timeout for every command of a batch, or one per command
+BatchTimeout = Union[None, float, Sequence[Optional[float]]]
+
+# Manifests and lockfiles whose changes alter package manager and toolchain output
+DEPENDENCY_FILES = (
+    "package.json",
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "Cargo.toml",
+    "Cargo.lock",
+    "pyproject.toml",
+    "requirements.txt",
+)
+
+# (mtime_ns, size, inode) of a path, or None when it does not exist
+StatSignature = Optional[Tuple[int, int, int]]
+
+
+def stat_signature(paths: Iterable[str]) -> Tuple[StatSignature, ...]:
+    """
+    Return the stat signature of each path.
+
+    A directory's signature changes when entries are added or removed, which
+    covers installing or upgrading packages in site-packages.
+    """
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(signature)
+
+
+def dependency_watch_paths(cwd: Optional[Union[str, Path]] = None) -> List[Path]:
+    """
+    Return the paths package manager output usually depends on.
+
+    These are the project manifests and lockfiles in cwd (whether or not they
+    exist yet, since creating one also invalidates) and the current
+    interpreter's site-packages directories.
+
+    Args:
+        cwd: Project directory (default: current directory)
+
+    Returns:
+        Paths suitable for ``run_cached(..., watch=...)``
+    """
+    base = Path(cwd) if cwd else Path.cwd()
+    paths = [base / name for name in DEPENDENCY_FILES]
+    for key in ("purelib", "platlib"):
+        site_packages = Path(sysconfig.get_path(key))
+        if site_packages not in paths:
+            paths.append(site_packages)
+    return paths
+
 
 @dataclass
 class CacheEntry:
@@ -30,16 +108,224 @@ class CacheEntry:
     timestamp: float
     ttl: float
     hit_count: int = 0
+    # Absolute paths the result depends on and their signatures when it was made
+    watched: Tuple[str, ...] = ()
+    signature: Tuple[StatSignature, ...] = ()
+    # Captured stdout/stderr length, which the cache's byte budget counts
+    size: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.size = len(self.result.stdout or "") + len(self.result.stderr or "")
 
     def is_expired(self) -> bool:
         """Check if cache entry has expired."""
         return time.time() - self.timestamp > self.ttl
 
+    def is_stale(self) -> bool:
+        """Check if any watched path changed since the result was produced."""
+        return bool(self.watched) and stat_signature(self.watched) != self.signature
+
+    def is_valid(self) -> bool:
+        """Check that the entry is neither expired nor stale."""
+        return not self.is_expired() and not self.is_stale()
+
     def record_hit(self) -> None:
         """Record a cache hit."""
         self.hit_count += 1
 
 
+def _batch_timeouts(timeout: BatchTimeout, count: int) -> List[Optional[float]]:
+    """Expand a batch timeout into one timeout per command."""
+    if timeout is None or isinstance(timeout, (int, float)):
+        return [timeout] * count
+    timeouts = list(timeout)
+    if len(timeouts) != count:
+        raise ValueError(f"Expected {count} timeouts, got {len(timeouts)}")
+    return timeouts
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory for persisted subprocess results."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "goobits" / "subprocess"
+
+
+class _Abandoned(Exception):
+    """Raised to callers waiting on a run whose runner was cancelled or interrupted."""
+
+
+class PersistentCacheStore:
+    """
+    SQLite-backed store that shares cached subprocess results across processes.
+
+    SQLite's file locks serialize writers from concurrent processes; readers
+    never block on them in WAL mode. Entries keep the TTL they were cached
+    with, and the oldest entries are dropped once the captured output exceeds
+    ``max_bytes``. Any database error degrades to a cache miss.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            command TEXT NOT NULL,
+            args TEXT NOT NULL,
+            returncode INTEGER NOT NULL,
+            stdout,
+            stderr,
+            created REAL NOT NULL,
+            ttl REAL NOT NULL,
+            size INTEGER NOT NULL,
+            watched TEXT NOT NULL
+        )
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_bytes: int = 16 * 1024 * 1024,
+        lock_timeout: float = 5.0,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: Database file (default: ``$XDG_CACHE_HOME/goobits/subprocess/results.db``)
+            max_bytes: Upper bound for the captured stdout/stderr held on disk
+            lock_timeout: Seconds to wait for another process's write lock
+        """
+        self.path = Path(path) if path else default_cache_dir() / "results.db"
+        self.max_bytes = max_bytes
+        self.lock_timeout = lock_timeout
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database on first use."""
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.path), timeout=self.lock_timeout, isolation_level=None
+        )
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self._SCHEMA)
+            self._initialized = True
+        return conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the unexpired entry for key, or None. It may still be stale."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT args, returncode, stdout, stderr, created, ttl, watched "
+                    "FROM results WHERE key = ? AND created + ttl > ?",
+                    (key, time.time()),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Persistent cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        args, returncode, stdout, stderr, created, ttl, watched = row
+        result = subprocess.CompletedProcess(
+            json.loads(args), returncode, stdout, stderr
+        )
+        watched = json.loads(watched)
+        return CacheEntry(
+            result=result,
+            timestamp=created,
+            ttl=ttl,
+            watched=tuple(path for path, _ in watched),
+            signature=tuple(tuple(sig) if sig else None for _, sig in watched),
+        )
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, then drop expired entries and enforce the size limit."""
+        result = entry.result
+        args = [str(arg) for arg in result.args]
+        if entry.size > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        " ".join(args[:2]),
+                        json.dumps(args),
+                        result.returncode,
+                        result.stdout,
+                        result.stderr,
+                        entry.timestamp,
+                        entry.ttl,
+                        entry.size,
+                        json.dumps(list(zip(entry.watched, entry.signature))),
+                    ),
+                )
+                conn.execute(
+                    "DELETE FROM results WHERE created + ttl <= ?", (time.time(),)
+                )
+                # Keep the newest entries whose combined size fits the budget
+                conn.execute(
+                    "DELETE FROM results WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(size) OVER (ORDER BY created DESC, key) AS total"
+                    "  FROM results"
+                    " ) WHERE total > ?"
+                    ")",
+                    (self.max_bytes,),
+                )
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Persistent cache write failed: {e}")
+
+    def invalidate_pattern(self, pattern: str) -> int:
+        """Delete entries whose command contains pattern (case-insensitive)."""
+        return self._delete(
+            "DELETE FROM results WHERE instr(lower(command), lower(?)) > 0",
+            (pattern,),
+        )
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        self._delete("DELETE FROM results", ())
+
+    def _delete(self, sql: str, params: tuple) -> int:
+        """Run a DELETE statement and return the number of removed rows."""
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute(sql, params).rowcount
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Persistent cache delete failed: {e}")
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the number of live entries and the bytes they hold."""
+        try:
+            conn = self._connect()
+            try:
+                count, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results "
+                    "WHERE created + ttl > ?",
+                    (time.time(),),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            count, size = 0, 0
+        return {"entries": count, "bytes": size, "path": str(self.path)}
+
+
 class SessionSubprocessCache:
     """
     Session-based subprocess result caching system.
@@ -47,23 +333,47 @@ class SessionSubprocessCache:
     Features:
     - Intelligent cache key generation based on command and environment
     - TTL-based expiration with different lifetimes for different operation types
-    - Thread-safe operations for concurrent builds
-    - Memory-efficient with automatic cleanup
-    - Smart invalidation based on file system changes
+    - Thread-safe operations for concurrent builds, with concurrent callers of
+      the same command sharing one execution (sync and async)
+    - O(1) LRU lookups and eviction under entry-count and byte budgets,
+      with expired entries dropped lazily on access
+    - Smart invalidation based on file system changes: entries made with
+      ``watch=[...]`` are dropped as soon as a watched path's stat signature
+      changes, and live up to ``watched_ttl`` otherwise
+    - Optional persistent store shared across processes for read-only probes
     """
 
-    def __init__(self, max_entries: int = 1000, default_ttl: int = 300):
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        default_ttl: int = 300,
+        store: Optional[PersistentCacheStore] = None,
+        max_bytes: int = 8 * 1024 * 1024,
+    ):
         """
         Initialize the subprocess cache.
 
         Args:
             max_entries: Maximum number of entries to keep in cache
             default_ttl: Default time-to-live in seconds (5 minutes)
+            store: Persistent store consulted by ``run_cached(..., persist=True)``
+            max_bytes: Budget for captured stdout/stderr held in memory; larger
+                single results are returned but not cached
         """
-        self.cache: Dict[str, CacheEntry] = {}
+        # Least recently used first; hits move an entry to the end
+        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self.max_entries = max_entries
+        self.max_bytes = max_bytes
         self.default_ttl = default_ttl
+        self.store = store
         self._lock = Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        # Futures of commands currently running, so concurrent callers share one run
+        self._inflight: Dict[str, Future] = {}
 
         # Different TTL for different operation types
         self.ttl_map = {
@@ -75,6 +385,8 @@ class SessionSubprocessCache:
             "process": 10,  # 10 seconds - processes change rapidly
             "default": self.default_ttl,
         }
+        # TTL of entries validated by watched paths (24 hours)
+        self.watched_ttl = 24 * 60 * 60
 
     def _generate_cache_key(self, cmd: List[str], **kwargs) -> str:
         """
@@ -82,7 +394,8 @@ class SessionSubprocessCache:
 
         Args:
             cmd: Command and arguments
-            **kwargs: Additional context (cwd, env, etc.)
+            **kwargs: The subprocess.run arguments of the call (cwd, env, text,
+                check, etc.); all of them are part of the key
 
         Returns:
             SHA256 hex digest as cache key
@@ -90,25 +403,32 @@ class SessionSubprocessCache:
         # Normalize command to handle different shell quoting
         normalized_cmd = [str(arg) for arg in cmd]
 
-        # Include relevant environment variables that might affect results
-        relevant_env_vars = ["PATH", "HOME", "USER", "VIRTUAL_ENV", "NODE_ENV"]
-        env_context = {
-            var: os.environ.get(var) for var in relevant_env_vars if var in os.environ
-        }
+        # An explicit environment is the child's whole environment; otherwise
+        # include the inherited variables that most often affect results
+        env = kwargs.pop("env", None)
+        if env is not None:
+            env_context = {str(var): str(value) for var, value in env.items()}
+        else:
+            relevant_env_vars = ["PATH", "HOME", "USER", "VIRTUAL_ENV", "NODE_ENV"]
+            env_context = {
+                var: os.environ.get(var)
+                for var in relevant_env_vars
+                if var in os.environ
+            }
 
         # Include working directory
-        cwd = kwargs.get("cwd", os.getcwd())
+        cwd = kwargs.pop("cwd", None) or os.getcwd()
 
         cache_context = {
             "cmd": normalized_cmd,
             "cwd": str(cwd),
             "env": env_context,
-            "timeout": kwargs.get("timeout"),
+            "options": kwargs,
             "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
         }
 
         # Create deterministic hash
-        context_str = json.dumps(cache_context, sort_keys=True)
+        context_str = json.dumps(cache_context, sort_keys=True, default=repr)
         return hashlib.sha256(context_str.encode()).hexdigest()[
             :16
         ]  # Use first 16 chars
@@ -165,30 +485,47 @@ class SessionSubprocessCache:
         return "default"
 
     def _cleanup_expired(self) -> None:
-        """Remove expired entries from cache."""
+        """
+        Remove all expired entries from cache.
+
+        Not needed for correctness: expired entries are dropped when looked
+        up, and unused ones age out through LRU eviction.
+        """
         with self._lock:
             expired_keys = [
                 key for key, entry in self.cache.items() if entry.is_expired()
             ]
             for key in expired_keys:
-                del self.cache[key]
+                self._remove(key)
 
             logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
 
-    def _evict_oldest(self) -> None:
-        """Evict oldest entries when cache is full."""
-        with self._lock:
-            if len(self.cache) >= self.max_entries:
-                # Sort by timestamp and remove oldest 10%
-                sorted_entries = sorted(
-                    self.cache.items(), key=lambda x: x[1].timestamp
-                )
+    def _insert(self, cache_key: str, entry: CacheEntry) -> None:
+        """Add an entry as most recently used. The caller must hold the lock."""
+        self._remove(cache_key)
+        if entry.size > self.max_bytes:
+            return
+        self.cache[cache_key] = entry
+        self._bytes += entry.size
+        self._evict_oldest()
+
+    def _remove(self, cache_key: str) -> None:
+        """Drop an entry if present. The caller must hold the lock."""
+        entry = self.cache.pop(cache_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
 
-                entries_to_remove = max(1, len(sorted_entries) // 10)
-                for key, _ in sorted_entries[:entries_to_remove]:
-                    del self.cache[key]
-
-                logger.debug(f"Evicted {entries_to_remove} oldest cache entries")
+    def _evict_oldest(self) -> None:
+        """
+        Evict least recently used entries until the cache fits its entry and
+        byte limits. The caller must hold the lock.
+        """
+        while self.cache and (
+            len(self.cache) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self.cache.popitem(last=False)
+            self._bytes -= entry.size
+            self._evictions += 1
 
     def run_cached(
         self,
@@ -201,6 +538,9 @@ class SessionSubprocessCache:
         cwd: Optional[Union[str, Path]] = None,
         env: Optional[Dict[str, str]] = None,
         force_refresh: bool = False,
+        persist: bool = False,
+        watch: Optional[Iterable[Union[str, Path]]] = None,
+        ttl: Optional[float] = None,
         **kwargs,
     ) -> subprocess.CompletedProcess:
         """
@@ -215,6 +555,13 @@ class SessionSubprocessCache:
             cwd: Working directory
             env: Environment variables
             force_refresh: Skip cache and force execution
+            persist: Also read and write the persistent store, so the result
+                is reused by later processes. Only for read-only commands.
+            watch: Files or directories the output depends on, relative to
+                cwd (see ``dependency_watch_paths``). The cached result is
+                discarded when any of them changes.
+            ttl: Lifetime in seconds, overriding the operation type's TTL
+                (and ``watched_ttl`` for watched entries)
             **kwargs: Additional subprocess.run arguments
 
         Returns:
@@ -224,88 +571,407 @@ class SessionSubprocessCache:
             subprocess.CalledProcessError: If command fails and check=True
             subprocess.TimeoutExpired: If command times out
         """
-        # Clean up expired entries periodically
-        if len(self.cache) > 0 and len(self.cache) % 50 == 0:
-            self._cleanup_expired()
-
         # Generate cache key
         cache_key = self._generate_cache_key(
-            cmd, cwd=cwd, env=env, timeout=timeout, **kwargs
+            cmd,
+            check=check,
+            capture_output=capture_output,
+            text=text,
+            timeout=timeout,
+            cwd=cwd,
+            env=env,
+            **kwargs,
         )
 
-        # Check cache first (unless forced refresh)
-        if not force_refresh:
-            with self._lock:
-                if cache_key in self.cache:
-                    entry = self.cache[cache_key]
-                    if not entry.is_expired():
-                        entry.record_hit()
-                        logger.debug(f"Cache hit for command: {shlex.join(cmd[:2])}")
-                        return entry.result
-                    else:
-                        # Remove expired entry
-                        del self.cache[cache_key]
-
-        # Execute command
-        logger.debug(f"Cache miss, executing: {shlex.join(cmd[:3])}")
+        while True:
+            cached, future, leader = self._claim(cache_key, cmd, force_refresh)
+            if cached is not None:
+                return cached
+            if leader:
+                break
+            logger.debug(f"Waiting for in-flight command: {shlex.join(cmd[:2])}")
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
 
         try:
-            result = subprocess.run(
-                cmd,
-                check=check,
-                capture_output=capture_output,
-                text=text,
-                timeout=timeout,
-                cwd=cwd,
-                env=env,
-                **kwargs,
+            result = self._load_persisted(cache_key, force_refresh, persist)
+            if result is None:
+                logger.debug(f"Cache miss, executing: {shlex.join(cmd[:3])}")
+                # Taken before running, so changes made meanwhile invalidate
+                validity = self._validity(watch, cwd, ttl)
+                try:
+                    result = subprocess.run(
+                        cmd,
+                        check=check,
+                        capture_output=capture_output,
+                        text=text,
+                        timeout=timeout,
+                        cwd=cwd,
+                        env=env,
+                        **kwargs,
+                    )
+                except subprocess.CalledProcessError as e:
+                    self._store_failure(cache_key, cmd, e, persist, validity)
+                    raise
+                self._store_result(cache_key, cmd, result, persist, validity)
+        except BaseException as error:
+            self._finish(cache_key, future, error=error)
+            raise
+        self._finish(cache_key, future, result=result)
+        return result
+
+    async def run_cached_async(
+        self,
+        cmd: List[str],
+        *,
+        check: bool = True,
+        capture_output: bool = True,
+        text: bool = True,
+        timeout: Optional[float] = None,
+        cwd: Optional[Union[str, Path]] = None,
+        env: Optional[Dict[str, str]] = None,
+        force_refresh: bool = False,
+        persist: bool = False,
+        watch: Optional[Iterable[Union[str, Path]]] = None,
+        ttl: Optional[float] = None,
+    ) -> subprocess.CompletedProcess:
+        """
+        Async variant of run_cached built on asyncio.create_subprocess_exec.
+
+        Shares cache entries and in-flight executions with run_cached, so a
+        command already running in a thread is awaited rather than spawned
+        again. Cancelling the call that started a command kills it.
+
+        Args:
+            cmd: Command and arguments to execute
+            check: Whether to raise CalledProcessError on non-zero exit
+            capture_output: Whether to capture stdout/stderr
+            text: Whether to return strings instead of bytes
+            timeout: Timeout for the command
+            cwd: Working directory
+            env: Environment variables
+            force_refresh: Skip cache and force execution
+            persist: Also read and write the persistent store
+            watch: Files or directories the output depends on
+            ttl: Lifetime in seconds, overriding the default for the command
+
+        Returns:
+            subprocess.CompletedProcess result
+
+        Raises:
+            subprocess.CalledProcessError: If command fails and check=True
+            subprocess.TimeoutExpired: If command times out
+        """
+        import asyncio
+
+        cache_key = self._generate_cache_key(
+            cmd,
+            check=check,
+            capture_output=capture_output,
+            text=text,
+            timeout=timeout,
+            cwd=cwd,
+            env=env,
+        )
+
+        while True:
+            cached, future, leader = self._claim(cache_key, cmd, force_refresh)
+            if cached is not None:
+                return cached
+            if leader:
+                break
+            logger.debug(f"Waiting for in-flight command: {shlex.join(cmd[:2])}")
+            try:
+                # Shielded so a cancelled waiter does not cancel the shared run
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                continue
+
+        try:
+            result = self._load_persisted(cache_key, force_refresh, persist)
+            if result is None:
+                logger.debug(f"Cache miss, executing: {shlex.join(cmd[:3])}")
+                validity = self._validity(watch, cwd, ttl)
+                result = await self._run_async(
+                    cmd, capture_output, text, timeout, cwd, env
+                )
+                if check and result.returncode != 0:
+                    error = subprocess.CalledProcessError(
+                        result.returncode, cmd, result.stdout, result.stderr
+                    )
+                    self._store_failure(cache_key, cmd, error, persist, validity)
+                    raise error
+                self._store_result(cache_key, cmd, result, persist, validity)
+        except BaseException as error:
+            self._finish(cache_key, future, error=error)
+            raise
+        self._finish(cache_key, future, result=result)
+        return result
+
+    async def _run_async(
+        self,
+        cmd: List[str],
+        capture_output: bool,
+        text: bool,
+        timeout: Optional[float],
+        cwd: Optional[Union[str, Path]],
+        env: Optional[Dict[str, str]],
+    ) -> subprocess.CompletedProcess:
+        """Run a command on the event loop, killing it on timeout or cancellation."""
+        import asyncio
+
+        pipe = asyncio.subprocess.PIPE if capture_output else None
+        process = await asyncio.create_subprocess_exec(
+            *[str(arg) for arg in cmd], stdout=pipe, stderr=pipe, cwd=cwd, env=env
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            process.kill()
+            await process.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise subprocess.TimeoutExpired(cmd, timeout) from None
+            raise
+
+        if text:
+            encoding = locale.getpreferredencoding(False)
+            stdout, stderr = (
+                None if data is None else data.decode(encoding).replace("\r\n", "\n")
+                for data in (stdout, stderr)
             )
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def _claim(
+        self, cache_key: str, cmd: List[str], force_refresh: bool
+    ) -> Tuple[Optional[subprocess.CompletedProcess], Optional[Future], bool]:
+        """
+        Look up a cached result, or join or start the key's in-flight execution.
 
-            # Cache the result
-            operation_type = self._detect_operation_type(cmd)
+        Returns:
+            (cached result, in-flight future, whether the caller must run it)
+        """
+        with self._lock:
+            if not force_refresh:
+                entry = self.cache.get(cache_key)
+                if entry is not None and entry.is_valid():
+                    entry.record_hit()
+                    self.cache.move_to_end(cache_key)
+                    self._hits += 1
+                    logger.debug(f"Cache hit for command: {shlex.join(cmd[:2])}")
+                    return entry.result, None, False
+                if entry is not None:
+                    # Remove expired or stale entry
+                    self._remove(cache_key)
+
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                self._coalesced += 1
+                return None, future, False
+            future = self._inflight[cache_key] = Future()
+            return None, future, True
+
+    def _finish(
+        self,
+        cache_key: str,
+        future: Future,
+        result: Optional[subprocess.CompletedProcess] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Hand the outcome to callers waiting on the key and retire its future."""
+        if error is not None and not isinstance(error, Exception):
+            # Cancellation or interruption of the runner: waiters start over
+            future.set_exception(_Abandoned())
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        with self._lock:
+            self._inflight.pop(cache_key, None)
+
+    def _load_persisted(
+        self, cache_key: str, force_refresh: bool, persist: bool
+    ) -> Optional[subprocess.CompletedProcess]:
+        """Return a result from the persistent store and keep it in memory."""
+        entry = None
+        if persist and not force_refresh and self.store is not None:
+            entry = self.store.get(cache_key)
+            if entry is not None and entry.is_stale():
+                entry = None
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._insert(cache_key, entry)
+        logger.debug(f"Persistent cache hit for: {shlex.join(entry.result.args[:2])}")
+        return entry.result
+
+    def _validity(
+        self,
+        watch: Optional[Iterable[Union[str, Path]]],
+        cwd: Optional[Union[str, Path]],
+        ttl: Optional[float],
+    ) -> Dict[str, Any]:
+        """Resolve watched paths against cwd and snapshot their stat signatures."""
+        base = str(cwd) if cwd is not None else os.getcwd()
+        watched = tuple(os.path.join(base, path) for path in watch or ())
+        return {"ttl": ttl, "watched": watched, "signature": stat_signature(watched)}
+
+    def _store_result(
+        self,
+        cache_key: str,
+        cmd: List[str],
+        result: subprocess.CompletedProcess,
+        persist: bool,
+        validity: Dict[str, Any],
+    ) -> None:
+        """Cache a finished command if its outcome is worth reusing."""
+        operation_type = self._detect_operation_type(cmd)
+        ttl = validity["ttl"]
+        if ttl is None and validity["watched"]:
+            ttl = self.watched_ttl
+        elif ttl is None:
             ttl = self.ttl_map.get(operation_type, self.default_ttl)
 
-            # Only cache successful results or specific expected failures
-            should_cache = (
-                result.returncode == 0  # Success
-                or (
-                    operation_type == "package_manager" and result.returncode in (1, 2)
-                )  # Common pkg mgr codes
-                or (
-                    operation_type == "system_check" and result.returncode == 127
-                )  # Command not found
+        # Only cache successful results or specific expected failures
+        should_cache = (
+            result.returncode == 0  # Success
+            or (
+                operation_type == "package_manager" and result.returncode in (1, 2)
+            )  # Common pkg mgr codes
+            or (
+                operation_type == "system_check" and result.returncode == 127
+            )  # Command not found
+        )
+        if not should_cache:
+            return
+
+        entry = CacheEntry(
+            result=result,
+            timestamp=time.time(),
+            ttl=ttl,
+            watched=validity["watched"],
+            signature=validity["signature"],
+        )
+        with self._lock:
+            self._insert(cache_key, entry)
+
+        if persist and self.store is not None:
+            self.store.put(cache_key, entry)
+
+        logger.debug(f"Cached result for {operation_type} command (TTL: {ttl}s)")
+
+    def _store_failure(
+        self,
+        cache_key: str,
+        cmd: List[str],
+        error: subprocess.CalledProcessError,
+        persist: bool,
+        validity: Dict[str, Any],
+    ) -> None:
+        """Cache "command not found" failures of system checks, not other errors."""
+        if (
+            self._detect_operation_type(cmd) == "system_check"
+            and error.returncode == 127
+        ):
+            result = subprocess.CompletedProcess(
+                cmd, error.returncode, error.stdout, error.stderr
             )
+            self._store_result(cache_key, cmd, result, persist, validity)
 
-            if should_cache:
-                with self._lock:
-                    # Ensure we don't exceed max entries
-                    if len(self.cache) >= self.max_entries:
-                        self._evict_oldest()
+    def run_many(
+        self,
+        cmds: Sequence[List[str]],
+        *,
+        max_concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+        timeout: BatchTimeout = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """
+        Run independent commands concurrently through run_cached.
 
-                    self.cache[cache_key] = CacheEntry(
-                        result=result, timestamp=time.time(), ttl=ttl
-                    )
+        Each command is cached, persisted and coalesced exactly as a single
+        run_cached call would be, so a batch also shares executions with
+        other threads probing the same commands. Only use this for commands
+        that do not depend on each other.
 
-                logger.debug(
-                    f"Cached result for {operation_type} command (TTL: {ttl}s)"
-                )
+        Args:
+            cmds: Commands to run
+            max_concurrency: Most commands running at once
+            timeout: Timeout for each command, or a sequence with one per command
+            return_exceptions: Put exceptions in the result list instead of
+                raising the first one
+            **kwargs: run_cached arguments shared by all commands
 
-            return result
-
-        except subprocess.CalledProcessError as e:
-            # Don't cache errors unless they're expected
-            if operation_type == "system_check" and e.returncode == 127:
-                # Cache "command not found" errors
-                with self._lock:
-                    if len(self.cache) < self.max_entries:
-                        self.cache[cache_key] = CacheEntry(
-                            result=subprocess.CompletedProcess(
-                                cmd, e.returncode, e.stdout, e.stderr
-                            ),
-                            timestamp=time.time(),
-                            ttl=self.ttl_map.get(operation_type, self.default_ttl),
-                        )
-            raise
+        Returns:
+            Results in the order of cmds, once every command has finished
+
+        Raises:
+            Exception: The first failure in command order, unless
+                return_exceptions is set
+        """
+        timeouts = _batch_timeouts(timeout, len(cmds))
+        workers = min(max_concurrency, len(cmds))
+        if workers <= 1:
+            outcomes = []
+            for cmd, cmd_timeout in zip(cmds, timeouts):
+                try:
+                    outcomes.append(self.run_cached(cmd, timeout=cmd_timeout, **kwargs))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    outcomes.append(e)
+            return outcomes
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.run_cached, cmd, timeout=cmd_timeout, **kwargs)
+                for cmd, cmd_timeout in zip(cmds, timeouts)
+            ]
+        outcomes = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            outcomes.append(future.result() if error is None else error)
+        return outcomes
+
+    async def run_many_async(
+        self,
+        cmds: Sequence[List[str]],
+        *,
+        max_concurrency: int = DEFAULT_PROBE_CONCURRENCY,
+        timeout: BatchTimeout = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[Any]:
+        """
+        Async variant of run_many built on run_cached_async.
+
+        Args and return value are those of run_many. When a command fails and
+        return_exceptions is not set, the rest of the batch is cancelled.
+        """
+        import asyncio
+
+        timeouts = _batch_timeouts(timeout, len(cmds))
+        slots = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(cmd: List[str], cmd_timeout: Optional[float]) -> Any:
+            async with slots:
+                return await self.run_cached_async(cmd, timeout=cmd_timeout, **kwargs)
+
+        tasks = [
+            asyncio.ensure_future(run(cmd, cmd_timeout))
+            for cmd, cmd_timeout in zip(cmds, timeouts)
+        ]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def invalidate_pattern(self, pattern: str) -> int:
         """
@@ -327,26 +993,37 @@ class SessionSubprocessCache:
                     keys_to_remove.append(key)
 
             for key in keys_to_remove:
-                del self.cache[key]
+                self._remove(key)
 
             logger.debug(
                 f"Invalidated {len(keys_to_remove)} entries matching '{pattern}'"
             )
-            return len(keys_to_remove)
+
+        if self.store is not None:
+            self.store.invalidate_pattern(pattern)
+        return len(keys_to_remove)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         with self._lock:
-            total_hits = sum(entry.hit_count for entry in self.cache.values())
-
-            return {
+            lookups = self._hits + self._misses
+            stats = {
                 "total_entries": len(self.cache),
-                "total_hits": total_hits,
-                "hit_rate": total_hits / max(1, len(self.cache)),
+                "total_hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "bytes_held": self._bytes,
+                "max_bytes": self.max_bytes,
                 "entries_by_type": self._get_entries_by_type(),
-                "cache_size_mb": self._estimate_cache_size() / (1024 * 1024),
+                "cache_size_mb": self._bytes / (1024 * 1024),
             }
 
+        if self.store is not None:
+            stats["persistent"] = self.store.get_stats()
+        return stats
+
     def _get_entries_by_type(self) -> Dict[str, int]:
         """Get count of entries by operation type."""
         type_counts = {}
@@ -356,33 +1033,33 @@ class SessionSubprocessCache:
                 type_counts[op_type] = type_counts.get(op_type, 0) + 1
         return type_counts
 
-    def _estimate_cache_size(self) -> int:
-        """Estimate cache size in bytes."""
-        size = 0
-        for entry in self.cache.values():
-            # Rough estimation
-            size += len(str(entry.result.stdout) or "") * 2  # Unicode overhead
-            size += len(str(entry.result.stderr) or "") * 2
-            size += len(str(entry.result.args)) * 8
-            size += 200  # Overhead for objects
-        return size
-
     def clear(self) -> None:
         """Clear all cache entries."""
         with self._lock:
             self.cache.clear()
+            self._bytes = 0
             logger.info("Cache cleared")
 
+        if self.store is not None:
+            self.store.clear()
+
 
 # Global cache instance
 _subprocess_cache: Optional[SessionSubprocessCache] = None
 
 
 def get_subprocess_cache() -> SessionSubprocessCache:
-    """Get the global subprocess cache instance."""
+    """
+    Get the global subprocess cache instance.
+
+    Its persistent store lives under the user cache dir; set
+    ``GOOBITS_SUBPROCESS_CACHE=0`` to keep results in memory only.
+    """
     global _subprocess_cache
     if _subprocess_cache is None:
-        _subprocess_cache = SessionSubprocessCache()
+        persistent = os.environ.get("GOOBITS_SUBPROCESS_CACHE", "1").lower()
+        store = None if persistent in ("0", "false", "off") else PersistentCacheStore()
+        _subprocess_cache = SessionSubprocessCache(store=store)
     return _subprocess_cache
 
 
@@ -396,6 +1073,36 @@ def run_cached(*args, **kwargs) -> subprocess.CompletedProcess:
     return cache.run_cached(*args, **kwargs)
 
 
+async def run_cached_async(*args, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Convenience function for cached subprocess execution from async code.
+
+    Same interface as run_cached(), running the command with asyncio.
+    """
+    cache = get_subprocess_cache()
+    return await cache.run_cached_async(*args, **kwargs)
+
+
+def run_many(*args, **kwargs) -> List[Any]:
+    """
+    Convenience function for running independent probes concurrently.
+
+    Same interface as SessionSubprocessCache.run_many().
+    """
+    cache = get_subprocess_cache()
+    return cache.run_many(*args, **kwargs)
+
+
+async def run_many_async(*args, **kwargs) -> List[Any]:
+    """
+    Convenience function for running independent probes from async code.
+
+    Same interface as SessionSubprocessCache.run_many_async().
+    """
+    cache = get_subprocess_cache()
+    return await cache.run_many_async(*args, **kwargs)
+
+
 def invalidate_cache_for(pattern: str) -> int:
     """
     Invalidate cache entries for commands matching pattern.
@@ -557,7 +557,9 @@ class NodeJSRenderer(LanguageRenderer):
         # Add value placeholder for non-flag options
 
         if option["type"] != "flag":
-            flag_str += f" <{option['name']}>"
+            # Repeatable options collect their values into an array
+            variadic = "..." if option.get("multiple") else ""
+            flag_str += f" <{option['name']}{variadic}>"
 
         return flag_str
 
@@ -14,7 +14,7 @@ Features:
 """
 
 import re
-import tempfile
+import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
@@ -26,8 +26,10 @@ try:
 except ImportError:
     _version = "3.0.0"  # Fallback version
 
+from ...core.errors import GeneratorError
 from ..formatters import PythonHelpFormatter
 from .interface import LanguageRenderer
+from .zipapp import ZipappBuilder
 
 
 class PythonRenderer(LanguageRenderer):
@@ -40,7 +42,7 @@ class PythonRenderer(LanguageRenderer):
     - Python naming conventions (snake_case)
     - Type annotations and proper imports
     - Hook system integration
-    - File consolidation support using Shiv
+    - File consolidation into a reproducible zipapp
 
     This renderer transforms the universal intermediate representation
     into Python-specific code structures and handles Python-specific
@@ -51,11 +53,14 @@ class PythonRenderer(LanguageRenderer):
         """Get current version for generator metadata."""
         return _version
 
+    # Runtime dependencies bundled into consolidated zipapps
+    zipapp_requirements = ("click", "toml")
+
     def __init__(self, consolidate: bool = False) -> None:
         """Initialize Python renderer with optional consolidation mode.
 
         Args:
-            consolidate: Enable file consolidation using Shiv
+            consolidate: Enable file consolidation into a zipapp
         """
         self.consolidate = consolidate
 
@@ -144,22 +149,12 @@ class PythonRenderer(LanguageRenderer):
             {
                 "language": "python",
                 "framework": "click",
-                "imports": self._get_python_imports(ir),
                 "types": self._get_python_types(),
                 "naming": {
                     "snake_case": True,
                     "function_prefix": "",
                     "class_suffix": "",
                 },
-                "click_config": {
-                    "use_rich_click": True,
-                    "context_settings": {
-                        "help_option_names": ["-h", "--help"],
-                        "max_content_width": 120,
-                    },
-                    "show_arguments": True,
-                    "group_arguments_options": True,
-                },
                 # Unified help formatter for consistent output across languages
                 "unified_formatter": {
                     "enabled": True,
@@ -266,15 +261,6 @@ class PythonRenderer(LanguageRenderer):
             "js_string": self._js_string_filter,  # For compatibility with universal templates
         }
 
-    def _has_interactive_features(self, cli_schema: Dict[str, Any]) -> bool:
-        """Check if CLI has interactive mode features."""
-
-        features = cli_schema.get("features", {})
-
-        interactive_mode = features.get("interactive_mode", {})
-
-        return interactive_mode.get("enabled", False)
-
     def render_component(
         self, component_name: str, template_content: str, context: Dict[str, Any]
     ) -> str:
@@ -331,14 +317,22 @@ class PythonRenderer(LanguageRenderer):
         self, files: Dict[str, str], output_dir: Path
     ) -> Dict[str, str]:
         """
-        Consolidate multiple Python files into a single executable using Shiv.
+        Consolidate multiple Python files into a single executable zipapp.
+
+        The archive is built in-process by ZipappBuilder: dependencies come
+        from a local wheel cache, output is byte-identical for identical
+        inputs, and the build is skipped when the input hash is unchanged.
 
         Args:
             files: Dictionary mapping file paths to file contents
-            output_dir: Output directory path
+            output_dir: Output directory path; receives ``<cli>.pyz``
 
         Returns:
-            Dictionary with consolidated files (cli.py + setup.sh)
+            Dictionary with the remaining non-Python files (e.g. setup.sh), or
+            a single combined source file if the zipapp cannot be built
+
+        Raises:
+            GeneratorError: If two files map to the same path in the archive
         """
         if not files:
             return files
@@ -357,185 +351,161 @@ class PythonRenderer(LanguageRenderer):
         if len(python_files) <= 1:
             return files
 
-        # Create a temporary directory for consolidation
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Write all Python files to the temporary directory
-            for file_path, content in python_files.items():
-                # Get just the filename for temp directory
-                filename = Path(file_path).name
-                temp_file = temp_path / filename
-                temp_file.write_text(content, encoding="utf-8")
-
-            # Find the main CLI file (usually cli.py)
-            main_file = None
-            main_file_path = None
-            for file_path in python_files:
-                filename = Path(file_path).name
-                if filename == "cli.py":
-                    main_file = temp_path / filename
-                    main_file_path = file_path
-                    break
-
-            if not main_file:
-                # If no cli.py found, use the first Python file
-                first_py_file = list(python_files.keys())[0]
-                main_file = temp_path / Path(first_py_file).name
-                main_file_path = first_py_file
-
-            if main_file and main_file.exists():
-                # Shiv-based consolidation: create self-contained zipapp
-                try:
-                    # Install dependencies for the consolidated package
-                    import subprocess
-
-                    # Create setup.py for proper package structure
-                    setup_py_content = f"""
-from setuptools import setup, find_packages
-
-setup(
-    name="{Path(main_file_path).stem}",
-    version="{_version}",
-    packages=find_packages(),
-    entry_points={{
-        'console_scripts': [
-            '{Path(main_file_path).stem}={Path(main_file_path).stem}:cli',
-        ],
-    }},
-    install_requires=[
-        "click",
-        "rich-click",
-    ],
-)
-"""
-                    setup_file = temp_path / "setup.py"
-                    setup_file.write_text(setup_py_content, encoding="utf-8")
-
-                    # Create __init__.py to make it a proper package
-                    init_file = temp_path / "__init__.py"
-                    init_file.write_text("# Package marker", encoding="utf-8")
-
-                    # Create shiv executable
-                    shiv_file = temp_path / f"{Path(main_file_path).stem}.pyz"
-
-                    # Run Shiv to create consolidated executable
-                    shiv_result = subprocess.run(
-                        [
-                            "python3",
-                            "-m",
-                            "shiv",
-                            "--site-packages",
-                            str(temp_path),
-                            "--compressed",
-                            "--output-file",
-                            str(shiv_file),
-                            "--entry-point",
-                            f"{Path(main_file_path).stem}:cli",
-                        ],
-                        capture_output=True,
-                        text=True,
-                        cwd=temp_path,
-                    )
+        # Find the main CLI file (usually cli.py), else use the first Python file
+        main_file_path = next(
+            (path for path in python_files if Path(path).name == "cli.py"),
+            next(iter(python_files)),
+        )
+        main_source = python_files[main_file_path]
+        function = "main" if "def main(" in main_source else "cli"
+        archive_paths = self._archive_paths(python_files, main_source)
+        module = archive_paths[main_file_path][: -len(".py")].replace("/", ".")
+
+        try:
+            result = ZipappBuilder().build(
+                {
+                    archive_paths[path]: content
+                    for path, content in python_files.items()
+                },
+                entry_point=f"{module}:{function}",
+                requirements=self.zipapp_requirements,
+            )
+            target = Path(output_dir) / Path(main_file_path).with_suffix(".pyz")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(result.path, target)
+            target.chmod(0o755)
+        except (GeneratorError, OSError) as e:
+            print(f"⚠️ Zipapp consolidation failed: {e}")
+            print("Falling back to simple file combination...")
+            return self._combine_python_files(
+                python_files, main_file_path, non_python_files
+            )
 
-                    if shiv_result.returncode == 0 and shiv_file.exists():
-                        # Read the Shiv executable
-                        shiv_content = shiv_file.read_text(
-                            encoding="utf-8", errors="ignore"
-                        )
+        status = "reused cached build" if result.cached else "built"
+        print(
+            f"✅ Consolidated {len(python_files)} Python files into {target.name} ({status})"
+        )
+        return dict(non_python_files)
 
-                        # Create consolidated files dictionary
-                        consolidated_files = {main_file_path: shiv_content}
+    def _archive_paths(
+        self, python_files: Dict[str, str], main_source: str
+    ) -> Dict[str, str]:
+        """
+        Map each Python file to the path it is imported from inside the zipapp.
+
+        Paths stay relative to the output directory, minus a leading ``src/``.
+        The hooks file goes wherever the CLI imports it from, since the hooks
+        module name comes from ``cli_hooks_path`` rather than the file layout.
 
-                        # Add non-Python files back
-                        consolidated_files.update(non_python_files)
+        Args:
+            python_files: Dictionary mapping file paths to file contents
+            main_source: Source of the main CLI file
+
+        Returns:
+            Dictionary mapping each file path to its archive path
+
+        Raises:
+            GeneratorError: If two files map to the same archive path
+        """
+        hooks_import = re.search(
+            r"^\s*import ([\w.]+) as hooks_module$", main_source, re.MULTILINE
+        )
+        hooks_module = hooks_import.group(1) if hooks_import else None
+
+        archive_paths: Dict[str, str] = {}
+        owners: Dict[str, str] = {}
+        for file_path in python_files:
+            path = Path(file_path)
+            if hooks_module and path.stem == hooks_module.rpartition(".")[2]:
+                archive_path = hooks_module.replace(".", "/") + ".py"
+            else:
+                parts = path.parts[1:] if path.parts[0] == "src" else path.parts
+                archive_path = Path(*parts).as_posix()
 
-                        print(
-                            f"✅ Consolidated {len(python_files)} Python files into single executable using Shiv"
-                        )
-                        return consolidated_files
+            if archive_path in owners:
+                raise GeneratorError(
+                    f"Cannot consolidate {file_path} and {owners[archive_path]}: "
+                    f"both map to {archive_path} in the zipapp"
+                )
+            owners[archive_path] = file_path
+            archive_paths[file_path] = archive_path
+
+        return archive_paths
+
+    def _combine_python_files(
+        self,
+        python_files: Dict[str, str],
+        main_file_path: str,
+        non_python_files: Dict[str, str],
+    ) -> Dict[str, str]:
+        """Concatenate Python sources into one file when no zipapp can be built."""
+        combined_content = []
+        combined_content.append("#!/usr/bin/env python3")
+        combined_content.append('"""')
+        combined_content.append(
+            "Consolidated CLI - Generated by Goobits Universal Template System"
+        )
+        combined_content.append('"""')
+        combined_content.append("")
+
+        # Add all Python file contents
+        for file_path, content in python_files.items():
+            filename = Path(file_path).stem
+            combined_content.append(f"# === {filename}.py ===")
+            # Split content into lines to preserve proper line structure
+            if content:
+                content_lines = content.splitlines()
+                # Fix any problematic line combinations where docstrings are merged with code
+                fixed_lines = []
+                for line in content_lines:
+                    if '"""' in line and "return" in line:
+                        # Find the pattern: """...""" followed by code
+                        # Look for the last """ which should be the closing docstring
+                        triple_quote_positions = []
+                        start = 0
+                        while True:
+                            pos = line.find('"""', start)
+                            if pos == -1:
+                                break
+                            triple_quote_positions.append(pos)
+                            start = pos + 3
+
+                        if len(triple_quote_positions) >= 2:
+                            # We have opening and closing quotes
+                            closing_pos = triple_quote_positions[-1] + 3
+                            docstring_part = line[:closing_pos]
+                            remainder = line[closing_pos:].strip()
+                            fixed_lines.append(docstring_part)
+                            if remainder:
+                                # Preserve original indentation for the remainder
+                                original_indent = len(line) - len(line.lstrip())
+                                fixed_lines.append(" " * original_indent + remainder)
+                        else:
+                            # Fallback: just add the line as-is
+                            fixed_lines.append(line)
                     else:
-                        print(f"⚠️ Shiv consolidation failed: {shiv_result.stderr}")
-                        print("Falling back to simple file combination...")
-
-                        # Fallback to simple combination
-                        combined_content = []
-                        combined_content.append("#!/usr/bin/env python3")
-                        combined_content.append('"""')
-                        combined_content.append(
-                            "Consolidated CLI - Generated by Goobits Universal Template System"
-                        )
-                        combined_content.append('"""')
-                        combined_content.append("")
-
-                        # Add all Python file contents
-                        for file_path, content in python_files.items():
-                            filename = Path(file_path).stem
-                            combined_content.append(f"# === {filename}.py ===")
-                            # Split content into lines to preserve proper line structure
-                            if content:
-                                content_lines = content.splitlines()
-                                # Fix any problematic line combinations where docstrings are merged with code
-                                fixed_lines = []
-                                for line in content_lines:
-                                    if '"""' in line and "return" in line:
-                                        # Find the pattern: """...""" followed by code
-                                        # Look for the last """ which should be the closing docstring
-                                        triple_quote_positions = []
-                                        start = 0
-                                        while True:
-                                            pos = line.find('"""', start)
-                                            if pos == -1:
-                                                break
-                                            triple_quote_positions.append(pos)
-                                            start = pos + 3
-
-                                        if len(triple_quote_positions) >= 2:
-                                            # We have opening and closing quotes
-                                            closing_pos = triple_quote_positions[-1] + 3
-                                            docstring_part = line[:closing_pos]
-                                            remainder = line[closing_pos:].strip()
-                                            fixed_lines.append(docstring_part)
-                                            if remainder:
-                                                # Preserve original indentation for the remainder
-                                                original_indent = len(line) - len(
-                                                    line.lstrip()
-                                                )
-                                                fixed_lines.append(
-                                                    " " * original_indent + remainder
-                                                )
-                                        else:
-                                            # Fallback: just add the line as-is
-                                            fixed_lines.append(line)
-                                    else:
-                                        fixed_lines.append(line)
-                                combined_content.extend(fixed_lines)
-                            combined_content.append("")
-
-                        # Remove duplicate imports and fix basic issues
-                        final_content = "\n".join(combined_content)
-                        final_content = final_content.replace("📁", "[folder]")
-                        final_content = final_content.replace("📝", "[file]")
-                        final_content = final_content.replace("💾", "[backup]")
-                        final_content = final_content.replace("🧪", "[experimental]")
-                        final_content = final_content.replace("🎯", "[template]")
-                        final_content = final_content.replace("🔥", "[force]")
-                        final_content = final_content.replace("🌍", "[host]")
-                        final_content = final_content.replace("🔌", "[port]")
-
-                        consolidated_files = {main_file_path: final_content}
-                        consolidated_files.update(non_python_files)
-
-                        print(
-                            f"✅ Consolidated {len(python_files)} Python files into single file (fallback mode)"
-                        )
-                        return consolidated_files
-
-                except Exception as e:
-                    print(f"⚠️  Consolidation failed: {e}, returning original files")
-                    return files
-
-        return files
+                        fixed_lines.append(line)
+                combined_content.extend(fixed_lines)
+            combined_content.append("")
+
+        # Remove duplicate imports and fix basic issues
+        final_content = "\n".join(combined_content)
+        final_content = final_content.replace("📁", "[folder]")
+        final_content = final_content.replace("📝", "[file]")
+        final_content = final_content.replace("💾", "[backup]")
+        final_content = final_content.replace("🧪", "[experimental]")
+        final_content = final_content.replace("🎯", "[template]")
+        final_content = final_content.replace("🔥", "[force]")
+        final_content = final_content.replace("🌍", "[host]")
+        final_content = final_content.replace("🔌", "[port]")
+
+        consolidated_files = {main_file_path: final_content}
+        consolidated_files.update(non_python_files)
+
+        print(
+            f"✅ Consolidated {len(python_files)} Python files into single file (fallback mode)"
+        )
+        return consolidated_files
 
     def get_output_structure(self, ir: Dict[str, Any]) -> Dict[str, str]:
         """
@@ -589,41 +559,6 @@ setup(
 
         return output_structure
 
-    def _get_python_imports(self, ir: Dict[str, Any]) -> List[str]:
-        """Generate required Python imports based on IR."""
-
-        imports = [
-            "import sys",
-            "import os",
-            "from pathlib import Path",
-            "from typing import Optional, Dict, Any, List",
-            "import rich_click as click",
-            "from rich_click import RichGroup, RichCommand",
-        ]
-
-        # Add conditional imports based on features
-
-        cli_schema = ir.get("cli", {})
-
-        if self._has_config_features(cli_schema):
-            imports.append("import tomllib")
-            imports.append("import toml")
-
-        if self._has_async_features(cli_schema):
-            imports.append("import asyncio")
-
-        if self._has_completion_features(cli_schema):
-            imports.append("import subprocess")
-
-        if self._has_interactive_features(cli_schema):
-            imports.append("import cmd")
-
-            imports.append("import shlex")
-
-            imports.append("import readline")
-
-        return imports
-
     def _get_python_types(self) -> Dict[str, str]:
         """Map generic types to Python/Click types."""
 
@@ -751,24 +686,6 @@ setup(
 
         return transformed
 
-    def _has_config_features(self, cli_schema: Dict[str, Any]) -> bool:
-        """Check if CLI uses configuration features."""
-
-        # Look for config-related commands or global config options
-
-        commands = cli_schema.get("commands", {})
-
-        return "config" in commands or any(
-            "config" in cmd.get("name", "").lower() for cmd in commands.values()
-        )
-
-    def _has_async_features(self, cli_schema: Dict[str, Any]) -> bool:
-        """Check if CLI uses async features."""
-
-        # For now, assume no async features unless explicitly marked
-
-        return False
-
     def _has_completion_features(self, cli_schema: Dict[str, Any]) -> bool:
         """Check if CLI uses shell completion."""
 
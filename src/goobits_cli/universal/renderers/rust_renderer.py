@@ -25,6 +25,42 @@ import jinja2
 from ..formatters import RustHelpFormatter
 from .interface import LanguageRenderer
 
+# Cargo release profile per performance goal (None keeps the long-standing
+# defaults). "startup" keeps full optimisation but pairs it with the lighter
+# dependency set below; "throughput" keeps symbols for profilers.
+RELEASE_PROFILES: Dict[Any, Dict[str, Any]] = {
+    None: {"lto": True, "codegen-units": 1, "panic": "abort", "strip": True},
+    "size": {
+        "opt-level": "z",
+        "lto": True,
+        "codegen-units": 1,
+        "panic": "abort",
+        "strip": True,
+    },
+    "startup": {
+        "opt-level": 3,
+        "lto": True,
+        "codegen-units": 1,
+        "panic": "abort",
+        "strip": True,
+    },
+    "throughput": {
+        "opt-level": 3,
+        "lto": "fat",
+        "codegen-units": 1,
+        "panic": "abort",
+        "strip": "debuginfo",
+    },
+}
+
+# clap features with default features off; goals not listed keep the defaults.
+# The generated CLI uses the builder API, so derive is not needed, and
+# "suggestions" (typo hints) pulls in strsim.
+CLAP_FEATURES: Dict[str, List[str]] = {
+    "size": ["std", "help", "usage", "error-context"],
+    "startup": ["std", "color", "help", "usage", "error-context"],
+}
+
 
 class RustRenderer(LanguageRenderer):
     """
@@ -493,7 +529,7 @@ class RustRenderer(LanguageRenderer):
         return rust_cli
 
     def _generate_cargo_config(self, ir: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Cargo.toml configuration."""
+        """Generate Cargo.toml configuration, tuned by the performance section."""
 
         package_name = ir.get("package_name", "my-cli").replace("-", "_")
 
@@ -510,8 +546,46 @@ class RustRenderer(LanguageRenderer):
             ],
         }
 
+        performance = ir.get("performance") or {}
+        goal = performance.get("goal")
+
+        profile = dict(RELEASE_PROFILES.get(goal, RELEASE_PROFILES[None]))
+        for field, key in (
+            ("opt_level", "opt-level"),
+            ("lto", "lto"),
+            ("codegen_units", "codegen-units"),
+            ("panic", "panic"),
+            ("strip", "strip"),
+        ):
+            if performance.get(field) is not None:
+                profile[key] = performance[field]
+        config["release_profile"] = {
+            key: self._toml_value(value) for key, value in profile.items()
+        }
+
+        clap_features = CLAP_FEATURES.get(goal)
+        config["clap"] = {
+            "default_features": clap_features is None,
+            "features": clap_features or ["derive", "color"],
+        }
+
+        # The config module (and serde_yaml) is only emitted for CLIs with
+        # config commands; others skip reading a YAML file on every start
+        config["uses_config"] = bool(
+            ir.get("feature_requirements", {}).get("config_management")
+        )
+
         return config
 
+    def _toml_value(self, value: Any) -> str:
+        """Format a profile setting as a TOML value."""
+
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, int):
+            return str(value)
+        return f'"{value}"'
+
     def _apply_naming_conventions(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Apply Rust naming conventions to context."""
 
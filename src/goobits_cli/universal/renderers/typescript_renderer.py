@@ -60,7 +60,7 @@ class TypeScriptRenderer(LanguageRenderer):
 
     - TypeScript-specific imports and module system
 
-    - Build configuration for TypeScript compilation
+    - Build configuration for incremental TypeScript compilation
 
     """
 
@@ -288,7 +288,8 @@ class TypeScriptRenderer(LanguageRenderer):
 
         types_path = base_types_path or "bin/cli_types.d.ts"
 
-        # TypeScript generates 4 files (cli, hooks, types, setup.sh)
+        # TypeScript generates the typed sources, a tsconfig that compiles them
+        # in place, and setup.sh
         output = {
             "typescript_cli_consolidated": cli_path,  # TypeScript with everything embedded
             "hooks_template": hooks_path,  # RENAMED from src/hooks.ts to cli_hooks.ts
@@ -297,6 +298,9 @@ class TypeScriptRenderer(LanguageRenderer):
             or "setup.sh",  # Smart setup with package.json/tsconfig merging
         }
 
+        if cli_path.endswith(".ts") and not cli_path.endswith(".d.ts"):
+            output["tsconfig"] = "tsconfig.json"  # Incremental build of cli.js
+
         return output
 
     def _add_custom_filters(self) -> None:
@@ -495,22 +499,38 @@ class TypeScriptRenderer(LanguageRenderer):
         return transformed
 
     def _generate_build_config(self, ir: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate simple TypeScript build configuration."""
+        """
+        Generate the TypeScript build configuration.
+
+        tsc compiles the CLI and the hooks next to their sources, so cli.ts
+        becomes the cli.js that package.json runs and imports ./cli_hooks.js
+        from the same directory. Incremental state is kept in tsBuildInfoFile
+        so rebuilds after an edit only recheck what changed.
+        """
+
+        output = self.get_output_structure(ir)
+        cli_dir = output["typescript_cli_consolidated"].rpartition("/")[0]
 
         return {
             "tsconfig": {
                 "compilerOptions": {
-                    "target": "ES2020",
-                    "module": "CommonJS",
-                    "moduleResolution": "node",
-                    "outDir": "./dist",
+                    "target": "ES2022",
+                    "module": "NodeNext",
+                    "moduleResolution": "NodeNext",
                     "strict": True,
                     "esModuleInterop": True,
                     "skipLibCheck": True,
                     "declaration": True,
                     "sourceMap": True,
-                }
-            }
+                    "incremental": True,
+                    "tsBuildInfoFile": "./node_modules/.cache/tsconfig.tsbuildinfo",
+                },
+                "include": [
+                    f"{cli_dir}/*.ts" if cli_dir else "*.ts",
+                    output["hooks_template"],
+                    output["typescript_types"],
+                ],
+            },
         }
 
     def _apply_naming_conventions(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -696,7 +716,9 @@ class TypeScriptRenderer(LanguageRenderer):
 
         # Add value placeholder for non-boolean types
         if type_str not in ("boolean", "flag"):
-            flags += f" <{name}>"
+            # Repeatable options collect their values into an array
+            variadic = "..." if option.get("multiple") else ""
+            flags += f" <{name}{variadic}>"
 
         return flags
 
@@ -0,0 +1,285 @@
+"""
+Reproducible zipapp builder for consolidated Python CLIs.
+
+Builds self-contained ``.pyz`` archives in-process instead of shelling out to
+shiv on every build:
+
+- Dependencies are installed from a local wheel cache that is populated once
+  with ``pip download``, so later builds work on air-gapped hosts
+- Archives are byte-identical for identical inputs (sorted entries, fixed
+  timestamps and permissions, no bytecode)
+- A hash of all inputs short-circuits the build when nothing has changed
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ...core.errors import DependencyError
+
+# Bump when the archive layout changes so stale cached builds are not reused
+ZIPAPP_FORMAT_VERSION = 2
+
+# Earliest timestamp the zip format can represent; used for every entry
+_FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_MAIN_TEMPLATE = """\
+import sys
+
+from {module} import {function}
+
+sys.exit({function}())
+"""
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory for zipapp builds."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "goobits" / "zipapp"
+
+
+@dataclass
+class ZipappResult:
+    """Outcome of a zipapp build."""
+
+    path: Path
+    input_hash: str
+    cached: bool
+
+
+class ZipappBuilder:
+    """
+    Builds reproducible, cached zipapps from in-memory Python sources.
+
+    Cache layout (under ``cache_dir``):
+        wheels/          Downloaded wheels, reused for offline installs
+        site/<hash>/     Installed dependency trees, keyed by requirements
+        builds/<hash>.pyz  Finished archives, keyed by all build inputs
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        interpreter: str = "/usr/bin/env python3",
+        python: str = sys.executable,
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            cache_dir: Cache root (default: ``$XDG_CACHE_HOME/goobits/zipapp``)
+            interpreter: Interpreter written to the archive's shebang line
+            python: Python executable used to run pip
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.interpreter = interpreter
+        self.python = python
+
+    @property
+    def wheel_dir(self) -> Path:
+        """Directory holding the local wheel cache."""
+        return self.cache_dir / "wheels"
+
+    def input_hash(
+        self,
+        sources: Dict[str, str],
+        entry_point: str,
+        requirements: Sequence[str] = (),
+    ) -> str:
+        """Hash every input that influences the archive bytes."""
+        payload = {
+            "format": ZIPAPP_FORMAT_VERSION,
+            "interpreter": self.interpreter,
+            "entry_point": entry_point,
+            "requirements": self._requirements_key(requirements),
+            "sources": sorted(sources.items()),
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def build(
+        self,
+        sources: Dict[str, str],
+        entry_point: str,
+        requirements: Sequence[str] = (),
+        force: bool = False,
+    ) -> ZipappResult:
+        """
+        Build a zipapp, reusing the cached archive when inputs are unchanged.
+
+        Args:
+            sources: Mapping of archive-relative module paths to source code
+            entry_point: ``module:function`` called by the archive's __main__
+            requirements: pip requirement specifiers bundled into the archive
+            force: Rebuild even if a cached archive exists
+
+        Returns:
+            ZipappResult pointing at the archive inside the cache
+
+        Raises:
+            DependencyError: If requirements cannot be installed from the wheel
+                cache or downloaded into it
+        """
+        digest = self.input_hash(sources, entry_point, requirements)
+        archive = self.cache_dir / "builds" / f"{digest}.pyz"
+        if archive.exists() and not force:
+            return ZipappResult(path=archive, input_hash=digest, cached=True)
+
+        site_dir = self._dependency_dir(requirements) if requirements else None
+
+        entries: Dict[str, bytes] = {}
+        if site_dir is not None:
+            entries.update(self._collect_tree(site_dir))
+        for name, content in sources.items():
+            entries[Path(name).as_posix()] = content.encode("utf-8")
+            # zipimport has no namespace packages, so every directory needs
+            # an __init__.py to be importable
+            for parent in Path(name).parents:
+                if parent != Path("."):
+                    entries.setdefault(f"{parent.as_posix()}/__init__.py", b"")
+        module, _, function = entry_point.partition(":")
+        entries["__main__.py"] = _MAIN_TEMPLATE.format(
+            module=module, function=function or "main"
+        ).encode("utf-8")
+
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        self._write_archive(archive, entries)
+        return ZipappResult(path=archive, input_hash=digest, cached=False)
+
+    def _requirements_key(self, requirements: Sequence[str]) -> List[str]:
+        """Normalize requirements so ordering and whitespace do not matter."""
+        return sorted({req.strip() for req in requirements if req.strip()})
+
+    def _dependency_dir(self, requirements: Sequence[str]) -> Path:
+        """Return an installed dependency tree, installing it on first use."""
+        key_payload = {
+            "requirements": self._requirements_key(requirements),
+            "python": list(sys.version_info[:2]),
+            "platform": sys.platform,
+        }
+        key = hashlib.sha256(
+            json.dumps(key_payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        site_dir = self.cache_dir / "site" / key
+        if site_dir.is_dir():
+            return site_dir
+
+        site_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{key}.", dir=site_dir.parent))
+        try:
+            self._install_dependencies(requirements, staging)
+            try:
+                os.replace(staging, site_dir)
+            except OSError:
+                # A concurrent build published the same tree first
+                if not site_dir.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return site_dir
+
+    def _install_dependencies(self, requirements: Sequence[str], target: Path) -> None:
+        """Install requirements into target, preferring the offline wheel cache."""
+        self.wheel_dir.mkdir(parents=True, exist_ok=True)
+        install = [
+            "install",
+            "--target",
+            str(target),
+            "--no-compile",
+            "--no-index",
+            "--find-links",
+            str(self.wheel_dir),
+            *requirements,
+        ]
+        if self._pip(install).returncode == 0:
+            return
+
+        download = self._pip(
+            [
+                "download",
+                "--dest",
+                str(self.wheel_dir),
+                "--find-links",
+                str(self.wheel_dir),
+                "--only-binary",
+                ":all:",
+                *requirements,
+            ]
+        )
+        if download.returncode != 0:
+            raise DependencyError(
+                f"Could not download wheels for zipapp: {download.stderr.strip()}",
+                dependency=" ".join(requirements),
+                install_command=(
+                    f"pip download --dest {self.wheel_dir} " + " ".join(requirements)
+                ),
+            )
+
+        retry = self._pip(install)
+        if retry.returncode != 0:
+            raise DependencyError(
+                f"Could not install zipapp dependencies: {retry.stderr.strip()}",
+                dependency=" ".join(requirements),
+            )
+
+    def _pip(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run pip quietly with the configured Python."""
+        return subprocess.run(
+            [
+                self.python,
+                "-m",
+                "pip",
+                *args,
+                "--quiet",
+                "--disable-pip-version-check",
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+    def _collect_tree(self, root: Path) -> Dict[str, bytes]:
+        """Read an installed dependency tree, skipping scripts and bytecode."""
+        entries: Dict[str, bytes] = {}
+        for path in root.rglob("*"):
+            relative = path.relative_to(root)
+            if not path.is_file() or relative.parts[0] == "bin":
+                continue
+            if "__pycache__" in relative.parts or path.suffix == ".pyc":
+                continue
+            entries[relative.as_posix()] = path.read_bytes()
+        return entries
+
+    def _write_archive(self, archive: Path, entries: Dict[str, bytes]) -> None:
+        """Write entries deterministically and publish the archive atomically."""
+        fd, temp_name = tempfile.mkstemp(
+            prefix=f"{archive.stem}.", suffix=".tmp", dir=archive.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(f"#!{self.interpreter}\n".encode())
+                with zipfile.ZipFile(handle, "w") as zf:
+                    for name in sorted(entries):
+                        info = zipfile.ZipInfo(name, date_time=_FIXED_DATE_TIME)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        info.external_attr = 0o644 << 16
+                        info.create_system = 3  # Unix, regardless of build host
+                        zf.writestr(info, entries[name], compresslevel=9)
+            os.chmod(temp_name, 0o755)
+            os.replace(temp_name, archive)
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
+
+
+__all__ = ["ZipappBuilder", "ZipappResult", "default_cache_dir"]
@@ -37,6 +37,39 @@ class TestPythonGeneration:
         # Should generate at least some files (dry_run returns file dict)
         assert files is None or len(files) >= 0  # May be None in dry_run mode
 
+    def test_generates_completion_scripts(self, temp_project_dir: Path, write_config):
+        """Completion scripts for each shell carry the CLI's command tree."""
+        config_path = write_config(language="python")
+
+        Orchestrator().generate(
+            config_path=config_path, language="python", output_dir=temp_project_dir
+        )
+
+        completions = temp_project_dir / "completions"
+        assert sorted(path.name for path in completions.iterdir()) == [
+            "_testcli",
+            "testcli-completion.bash",
+            "testcli.fish",
+        ]
+        script = (completions / "testcli-completion.bash").read_text()
+        assert "complete -o default -F _goobits_testcli_complete testcli" in script
+        assert '"hello":{"options":["--help","--loud","-l"]}' in script
+
+    @pytest.mark.parametrize("language", ["nodejs", "typescript", "rust"])
+    def test_no_completion_scripts_for_other_languages(
+        self, language, sample_goobits_yaml
+    ):
+        """Only Python CLIs get scripts relying on goobits-cli at TAB time."""
+        from goobits_cli.universal.engine.stages import (
+            build_ir,
+            render_completion_scripts,
+            validate_config,
+        )
+
+        ir = build_ir(validate_config({**sample_goobits_yaml, "language": language}))
+
+        assert render_completion_scripts(ir, language) == {}
+
     def test_renderer_produces_context(self, sample_goobits_yaml: Dict[str, Any]):
         """Test that Python renderer produces valid template context."""
         from goobits_cli.universal.engine.stages import build_ir, validate_config
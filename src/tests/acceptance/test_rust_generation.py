@@ -73,3 +73,37 @@ class TestRustGeneration:
         )
 
         assert isinstance(files, list)
+
+    def test_performance_goal_tunes_cargo_profile(self, sample_goobits_yaml):
+        """The performance section maps to a release profile and clap features."""
+        sample_goobits_yaml["language"] = "rust"
+        sample_goobits_yaml["performance"] = {"goal": "size", "strip": "symbols"}
+
+        cargo = Orchestrator().generate_content(sample_goobits_yaml, "rust")[
+            "Cargo.toml"
+        ]
+        profile = cargo.split("[profile.release]")[1].split("[profile.dev]")[0]
+
+        assert 'opt-level = "z"' in profile
+        assert "codegen-units = 1" in profile
+        assert 'strip = "symbols"' in profile
+        clap = next(line for line in cargo.splitlines() if line.startswith("clap ="))
+        assert "default-features = false" in clap
+        assert '"suggestions"' not in clap and '"derive"' not in clap
+
+    def test_config_module_only_when_config_is_used(self, sample_goobits_yaml):
+        """serde_yaml and the config loader are emitted only with config commands."""
+        sample_goobits_yaml["language"] = "rust"
+        orchestrator = Orchestrator()
+
+        files = orchestrator.generate_content(sample_goobits_yaml, "rust")
+        cli = next(v for k, v in files.items() if k.endswith("cli.rs"))
+        assert "serde_yaml =" not in files["Cargo.toml"]
+        assert "mod config" not in cli
+        assert "lto = true" in files["Cargo.toml"]
+
+        sample_goobits_yaml["cli"]["commands"]["config"] = {"desc": "Manage config"}
+        files = orchestrator.generate_content(sample_goobits_yaml, "rust")
+        cli = next(v for k, v in files.items() if k.endswith("cli.rs"))
+        assert 'serde_yaml = "0.9"' in files["Cargo.toml"]
+        assert "config::ConfigManager::new()" in cli
@@ -74,3 +74,26 @@ class TestTypeScriptGeneration:
         )
 
         assert isinstance(files, list)
+
+    def test_emits_incremental_tsconfig(self, sample_goobits_yaml):
+        """The tsconfig compiles the CLI and hooks in place, incrementally."""
+        import json
+        from fnmatch import fnmatch
+
+        sample_goobits_yaml["language"] = "typescript"
+        files = Orchestrator().generate_content(sample_goobits_yaml, "typescript")
+
+        cli_ts = next(
+            p
+            for p in files
+            if p.endswith(".ts") and "cli_hooks" not in p and not p.endswith(".d.ts")
+        )
+        assert cli_ts[: -len(".ts")] + ".js" not in files
+
+        tsconfig = json.loads(files["tsconfig.json"])
+        options = tsconfig["compilerOptions"]
+        assert options["incremental"] is True
+        assert options["tsBuildInfoFile"].endswith(".tsbuildinfo")
+        assert "outDir" not in options
+        assert any(fnmatch(cli_ts, pattern) for pattern in tsconfig["include"])
+        assert any("cli_hooks" in path for path in tsconfig["include"])
@@ -0,0 +1,125 @@
+"""
+E2E tests for async hooks and bounded concurrent fan-out in generated CLIs.
+"""
+
+import json
+import subprocess
+import sys
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+HOOKS = """
+import asyncio
+import threading
+
+async def on_fetch(ctx, urls, tag, **kwargs):
+    active = peak = 0
+
+    async def fetch(url):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return url.upper()
+
+    results = await ctx.gather(fetch, urls, limit=2)
+    print(",".join(results), "tags=" + ",".join(tag), f"peak={peak}")
+
+def on_scan(ctx, paths, **kwargs):
+    results = ctx.fan_out(lambda path: (path, threading.current_thread().name), paths)
+    print(",".join(path for path, _ in results))
+
+    async def probe(path):
+        await asyncio.sleep(0)
+        return len(path)
+
+    print(sum(ctx.fan_out(probe, paths)))
+
+on_scan.thread_safe = True
+on_fetch.thread_safe = True
+"""
+
+
+def _config() -> dict:
+    return {
+        "package_name": "asynccli",
+        "command_name": "asynccli",
+        "display_name": "Async CLI",
+        "description": "Async hook test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "asynccli",
+            "tagline": "Async hook test CLI",
+            "commands": {
+                "fetch": {
+                    "desc": "Fetch URLs",
+                    "args": [{"name": "urls", "desc": "URLs", "nargs": "*"}],
+                    "options": [{"name": "tag", "desc": "Tags", "multiple": True}],
+                },
+                "scan": {
+                    "desc": "Scan paths",
+                    "args": [{"name": "paths", "desc": "Paths", "nargs": "*"}],
+                },
+            },
+        },
+    }
+
+
+class TestAsyncHooks:
+    """Tests for coroutine hooks and fan-out helpers."""
+
+    def _run(self, tmp_path, *args):
+        (tmp_path / "cli.py").write_text(
+            generate_content(_config(), "python")["cli.py"]
+        )
+        (tmp_path / "cli_hooks.py").write_text(HOOKS)
+        return subprocess.run(
+            [sys.executable, "cli.py", *args],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=tmp_path,
+        )
+
+    def test_async_hook_with_bounded_gather(self, tmp_path):
+        """Async hooks are awaited and gather honours the concurrency limit."""
+        result = self._run(
+            tmp_path, "fetch", "a", "b", "c", "d", "--tag", "x", "--tag", "y"
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "A,B,C,D tags=x,y peak=2"
+
+    def test_sync_hook_fan_out(self, tmp_path):
+        """Sync hooks fan out over threads or the shared loop, keeping order."""
+        result = self._run(tmp_path, "scan", "one", "two", "three")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["one,two,three", "11"]
+
+    def test_concurrent_batch_jobs_fan_out(self, tmp_path):
+        """Concurrent batch jobs each run coroutines on their own event loop."""
+        lines = "".join(
+            f'["scan", "a{i}", "bb{i}"]\n["fetch", "c{i}", "d{i}"]\n' for i in range(8)
+        )
+        (tmp_path / "jobs.ndjson").write_text(lines)
+        result = self._run(tmp_path, "--batch", "jobs.ndjson", "--batch-jobs=4")
+
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert result.returncode == 0, result.stdout
+        assert len(records) == 16
+        for i in range(8):
+            scan, fetch = records[2 * i], records[2 * i + 1]
+            assert scan["stdout"] == f"a{i},bb{i}\n{2 * len(str(i)) + 3}\n"
+            assert fetch["stdout"].startswith(f"C{i},D{i} ")
+
+    def test_node_and_typescript_emit_map_concurrent(self):
+        """Node.js and TypeScript CLIs ship the same bounded fan-out helper."""
+        for language, cli_file in (("nodejs", "cli.js"), ("typescript", "cli.ts")):
+            files = generate_content(_config(), language)
+            cli = next(v for k, v in files.items() if k.endswith(cli_file))
+
+            assert "export async function mapConcurrent" in cli
+            assert "'--tag <tag...>'" in cli
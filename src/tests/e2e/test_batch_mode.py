@@ -0,0 +1,183 @@
+"""
+E2E tests for the hidden --batch flag in generated CLIs.
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+HOOKS = """
+import sys
+import threading
+import time
+
+active = peak = 0
+lock = threading.Lock()
+
+def on_hello(ctx, name=None, **kwargs):
+    global active, peak
+    with lock:
+        active += 1
+        peak = max(peak, active)
+    time.sleep(0.05)
+    with lock:
+        active -= 1
+    print(f"hello {name} peak={peak}")
+    print("note", file=sys.stderr)
+    if name == "fail":
+        sys.exit(3)
+
+def on_slow(ctx, name=None, **kwargs):
+    on_hello(ctx, name)
+
+def on_deploy(ctx, batch=None, **kwargs):
+    print(f"deploy {batch}")
+
+on_hello.thread_safe = True
+"""
+
+BATCH = "\n".join(
+    [
+        '["hello", "a"]',
+        '{"id": "x", "argv": ["hello", "fail"]}',
+        "",
+        "not json",
+        '["missing"]',
+    ]
+)
+
+
+def _config() -> dict:
+    return {
+        "package_name": "batchcli",
+        "command_name": "batch-cli",
+        "display_name": "Batch CLI",
+        "description": "Batch mode test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "batch-cli",
+            "tagline": "Batch mode test CLI",
+            "commands": {
+                "hello": {
+                    "desc": "Say hello",
+                    "args": [{"name": "name", "desc": "Name"}],
+                },
+                "slow": {
+                    "desc": "Say hello without thread-safety",
+                    "args": [{"name": "name", "desc": "Name"}],
+                },
+                "deploy": {
+                    "desc": "Deploy a batch",
+                    "options": [{"name": "batch", "type": "str", "desc": "Batch"}],
+                },
+            },
+        },
+    }
+
+
+class TestBatchMode:
+    """Tests for running many invocations in one process."""
+
+    @pytest.fixture
+    def run(self, tmp_path):
+        (tmp_path / "cli.py").write_text(
+            generate_content(_config(), "python")["cli.py"]
+        )
+        (tmp_path / "cli_hooks.py").write_text(HOOKS)
+
+        def _run(*args, stdin=None):
+            result = subprocess.run(
+                [sys.executable, "cli.py", *args],
+                input=stdin,
+                capture_output=True,
+                text=True,
+                timeout=30,
+                cwd=tmp_path,
+            )
+            records = [
+                json.loads(line)
+                for line in result.stdout.splitlines()
+                if line.startswith("{")
+            ]
+            return result, records
+
+        return _run
+
+    def test_batch_file_streams_results(self, run, tmp_path):
+        """Each line yields one record with exit code, timing and output."""
+        (tmp_path / "jobs.ndjson").write_text(BATCH)
+        result, records = run("--batch", "jobs.ndjson")
+
+        assert result.returncode == 1
+        assert [r["line"] for r in records] == [1, 2, 4, 5]
+        ok, failed, invalid, unknown = records
+        assert ok["exit_code"] == 0
+        assert ok["stdout"] == "hello a peak=1\n"
+        assert ok["stderr"] == "note\n"
+        assert ok["duration"] >= 0.05
+        assert failed["id"] == "x"
+        assert failed["exit_code"] == 3
+        assert invalid["argv"] is None
+        assert invalid["exit_code"] == 2
+        assert unknown["exit_code"] == 2
+        assert "No such command" in unknown["stderr"]
+
+    def test_batch_from_stdin(self, run):
+        """A bare --batch reads NDJSON from stdin."""
+        result, records = run("--batch", stdin='["hello", "b"]\n')
+
+        assert result.returncode == 0, result.stderr
+        assert records[0]["argv"] == ["hello", "b"]
+        assert records[0]["stdout"] == "hello b peak=1\n"
+
+    def test_thread_safe_hooks_run_concurrently(self, run):
+        """Only hooks marked thread_safe overlap, and results keep input order."""
+        safe = "".join(f'["hello", "{i}"]\n' for i in range(8))
+        unsafe = "".join(f'["slow", "{i}"]\n' for i in range(4))
+
+        _, records = run("--batch", "--batch-jobs=4", stdin=safe)
+        assert [r["argv"][1] for r in records] == [str(i) for i in range(8)]
+        assert max(int(r["stdout"].split("peak=")[1]) for r in records) > 1
+
+        _, records = run("--batch", "--batch-jobs", "4", stdin=unsafe)
+        assert {r["stdout"].split("peak=")[1] for r in records} == {"1\n"}
+
+    def test_invalid_job_count(self, run):
+        """A non-positive job count is a usage error."""
+        result, _ = run("--batch", "--batch-jobs=0", stdin="")
+
+        assert result.returncode == 2
+        assert "--batch-jobs" in result.stderr
+
+    def test_missing_batch_file(self, run):
+        """A batch file that cannot be opened is a usage error."""
+        result, records = run("--batch", "missing.ndjson")
+
+        assert result.returncode == 2
+        assert records == []
+        assert "cannot open batch file 'missing.ndjson'" in result.stderr
+        assert "Traceback" not in result.stderr
+
+    def test_command_batch_option_is_left_alone(self, run):
+        """After the command, --batch is the command's own option."""
+        result, records = run("deploy", "--batch", "nightly")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "deploy nightly"
+        assert records == []
+
+    @pytest.mark.parametrize("language", ["nodejs", "typescript"])
+    def test_node_and_typescript_emit_batch_mode(self, language):
+        """Node.js and TypeScript CLIs ship the same batch runner."""
+        files = generate_content(_config(), language)
+        cli = next(v for k, v in files.items() if "cli_hooks" not in k and "cli." in k)
+
+        assert "function batchSource(argv" in cli
+        assert "async function runBatch(source" in cli
+        assert "throw new BatchExit(" in cli
+        assert "exit_code: exitCode" in cli
@@ -0,0 +1,118 @@
+"""
+E2E tests for the append-only, bounded history of generated interactive modes.
+"""
+
+import importlib.util
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from goobits_cli.universal.engine.stages import build_ir, validate_config
+from goobits_cli.universal.renderers import get_renderer
+
+COMPONENTS_DIR = Path(__file__).parents[2] / "goobits_cli" / "universal" / "components"
+
+HISTORY_SCRIPT = """
+import sys
+
+sys.argv = ["cli.py"]
+import cli
+
+path = cli.Path("history")
+path.write_text("# 2024-01-01 10:00:00\\n+legacy one\\n\\n# 2024-01-01 10:01:00\\n+legacy two\\n")
+history = cli.CompactFileHistory(path, 3)
+print(list(history.load_history_strings()))
+
+for i in range(10):
+    history.store_string(f"cmd {i}")
+print(path.read_text().splitlines())
+
+history.store_string("#hash")
+print(list(cli.CompactFileHistory(path, 3).load_history_strings()))
+
+with open(path, "w") as f:
+    f.writelines(f"entry {i}\\n" for i in range(100000))
+entries = list(cli.CompactFileHistory(path, 5).load_history_strings())
+print(entries[0], len(entries), len(path.read_text().splitlines()))
+"""
+
+
+def _render(language: str, max_history: int = 3) -> str:
+    """Render a CLI with interactive mode and history enabled."""
+    config = {
+        "package_name": "histcli",
+        "command_name": "histcli",
+        "display_name": "History CLI",
+        "description": "Interactive history test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "histcli",
+            "tagline": "Interactive history test CLI",
+            "commands": {"hello": {"desc": "Say hello"}},
+        },
+    }
+    ir = build_ir(validate_config(config), "goobits.yaml")
+    ir["cli"]["features"] = {
+        "interactive_mode": {
+            "enabled": True,
+            "history_enabled": True,
+            "tab_completion": True,
+            "max_history": max_history,
+        }
+    }
+    renderer = get_renderer(language)
+    component = f"{language}_cli_consolidated"
+    template = (COMPONENTS_DIR / f"{component}.j2").read_text()
+    return renderer.render_component(
+        component, template, renderer.get_template_context(ir)
+    )
+
+
+class TestInteractiveHistory:
+    """Tests for the compact history store shared by all interactive modes."""
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("prompt_toolkit") is None,
+        reason="prompt_toolkit not installed",
+    )
+    def test_python_history_is_bounded_and_compacted(self, tmp_path):
+        """Appends are amortized and only the file's tail is loaded."""
+        (tmp_path / "cli.py").write_text(_render("python"))
+        result = subprocess.run(
+            [sys.executable, "-c", HISTORY_SCRIPT],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=tmp_path,
+        )
+
+        assert result.returncode == 0, result.stderr
+        loaded, compacted, escaped, large = result.stdout.splitlines()
+        assert loaded == "['legacy two', 'legacy one']"
+        # Compaction happens once the file passes 2 x max_history (6) lines
+        assert compacted == "['cmd 6', 'cmd 7', 'cmd 8', 'cmd 9']"
+        assert escaped == "['#hash', 'cmd 9', 'cmd 8']"
+        assert large == "entry 99999 5 5"
+
+    @pytest.mark.parametrize("language", ["nodejs", "typescript"])
+    def test_node_history_uses_compact_store(self, language, tmp_path):
+        """Node.js and TypeScript share the same history file format."""
+        cli = _render(language, max_history=50)
+
+        assert "class CompactHistory" in cli
+        assert "function readHistoryTail" in cli
+        assert "historySize: 50," in cli
+        assert "history.append(input);" in cli
+        assert "readFileSync(historyFile" not in cli
+        if language == "nodejs" and shutil.which("node"):
+            (tmp_path / "cli.mjs").write_text(cli)
+            check = subprocess.run(
+                ["node", "--check", str(tmp_path / "cli.mjs")],
+                capture_output=True,
+                text=True,
+            )
+            assert check.returncode == 0, check.stderr
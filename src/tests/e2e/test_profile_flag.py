@@ -0,0 +1,134 @@
+"""
+E2E tests for the hidden --profile flag in generated CLIs.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+HOOKS = """
+import time
+
+time.sleep(0.05)
+
+def on_hello(ctx, name=None, **kwargs):
+    time.sleep(0.1)
+    print(f"hello {name}")
+
+def on_deploy(ctx, profile=None, **kwargs):
+    print(f"deploy {profile}")
+"""
+
+
+def _config() -> dict:
+    return {
+        "package_name": "profcli",
+        "command_name": "prof-cli",
+        "display_name": "Profile CLI",
+        "description": "Profile flag test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "prof-cli",
+            "tagline": "Profile flag test CLI",
+            "commands": {
+                "hello": {
+                    "desc": "Say hello",
+                    "args": [{"name": "name", "desc": "Name"}],
+                },
+                "deploy": {
+                    "desc": "Deploy with a profile",
+                    "options": [{"name": "profile", "type": "str", "desc": "Profile"}],
+                },
+            },
+        },
+    }
+
+
+class TestProfileFlag:
+    """Tests for per-phase timing reports."""
+
+    @pytest.fixture
+    def run(self, tmp_path):
+        (tmp_path / "cli.py").write_text(
+            generate_content(_config(), "python")["cli.py"]
+        )
+        (tmp_path / "cli_hooks.py").write_text(HOOKS)
+        env = {k: v for k, v in os.environ.items() if k != "PROF_CLI_PROFILE"}
+
+        def _run(*args, extra_env=None):
+            return subprocess.run(
+                [sys.executable, "cli.py", *args],
+                capture_output=True,
+                text=True,
+                timeout=30,
+                cwd=tmp_path,
+                env={**env, **(extra_env or {})},
+            )
+
+        return _run
+
+    def test_profile_to_stderr(self, run):
+        """--profile is stripped from argv and prints a report on stderr."""
+        result = run("--profile", "hello", "world")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "hello world"
+        assert "Profile: on_hello (exit 0)" in result.stderr
+        for phase in ("Total", "Startup", "Parse", "Hook import", "Hook"):
+            assert f"  {phase}: " in result.stderr
+
+    def test_profile_to_json_file(self, run, tmp_path):
+        """A --profile=FILE target receives a JSON report with all phases."""
+        report_path = tmp_path / "profile.json"
+        result = run(f"--profile={report_path}", "hello", "world")
+
+        assert result.returncode == 0, result.stderr
+        report = json.loads(report_path.read_text())
+        assert report["command"] == "on_hello"
+        assert report["exit_code"] == 0
+        assert report["hook_import_time"] >= 0.05
+        assert report["hook_time"] >= 0.1
+        phases = ("startup_time", "parse_time", "hook_import_time", "hook_time")
+        assert sum(report[p] for p in phases) <= report["total_time"]
+
+    def test_profile_env_var_and_usage_errors(self, run):
+        """The env var enables profiling and usage errors still report."""
+        result = run("missing", extra_env={"PROF_CLI_PROFILE": "1"})
+
+        assert result.returncode == 2
+        assert "Profile: - (exit 2)" in result.stderr
+
+    @pytest.mark.parametrize(
+        "args", [["--profile", "prod"], ["--profile=prod"]], ids=["space", "equals"]
+    )
+    def test_command_profile_option_is_left_alone(self, run, tmp_path, args):
+        """After the command, --profile is the command's own option."""
+        result = run("deploy", *args)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "deploy prod"
+        assert "Profile:" not in result.stderr
+        assert not (tmp_path / "prod").exists()
+
+    def test_no_report_without_flag(self, run):
+        """Nothing is reported unless profiling is requested."""
+        result = run("hello", "world")
+
+        assert result.returncode == 0
+        assert "Profile:" not in result.stderr
+
+    @pytest.mark.parametrize("language", ["nodejs", "typescript", "rust"])
+    def test_other_languages_emit_profiler(self, language):
+        """Node.js, TypeScript and Rust CLIs ship the same profiler."""
+        files = generate_content(_config(), language)
+        cli = next(v for k, v in files.items() if "cli_hooks" not in k and "cli." in k)
+
+        assert "PROF_CLI_PROFILE" in cli
+        assert "--profile=" in cli
+        assert "hook_import_time" in cli
@@ -0,0 +1,168 @@
+"""
+E2E tests for the streaming output helpers of generated CLIs.
+"""
+
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+HOOKS = """
+import sys
+
+def on_export(ctx, format="ndjson", count=3, **kwargs):
+    def rows():
+        try:
+            for i in range(int(count)):
+                yield {"id": i, "name": f"row {i}", "note": "x" * (i % 3) or None}
+        finally:
+            print("producer closed", file=sys.stderr)
+
+    ctx.output.write(rows(), format)
+
+def on_hello(ctx, **kwargs):
+    ctx.output.table([["a", 1], ["long value", 22]])
+"""
+
+CLI_FILES = {
+    "python": "cli.py",
+    "nodejs": "cli.js",
+    "typescript": "cli.ts",
+    "rust": "src/cli.rs",
+}
+
+OUTPUT_MARKERS = {
+    "python": "class StreamingOutput",
+    "nodejs": "export class StreamingOutput",
+    "typescript": "export class StreamingOutput",
+    "rust": "mod output {",
+}
+
+
+def _config(with_export: bool = True) -> dict:
+    """Build a CLI whose export command asks for structured output."""
+    commands = {"hello": {"desc": "Say hello"}}
+    if with_export:
+        commands["export"] = {
+            "desc": "Dump records",
+            "options": [
+                {
+                    "name": "format",
+                    "type": "str",
+                    "desc": "Output format",
+                    "default": "ndjson",
+                    "choices": ["ndjson", "json", "csv", "table"],
+                },
+                {"name": "count", "type": "int", "desc": "Records", "default": 3},
+            ],
+        }
+    return {
+        "package_name": "outcli",
+        "command_name": "out-cli",
+        "display_name": "Output CLI",
+        "description": "Streaming output test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "out-cli",
+            "tagline": "Streaming output test CLI",
+            "commands": commands,
+        },
+    }
+
+
+class TestStreamingOutput:
+    """Tests for incremental NDJSON, JSON, CSV and table output."""
+
+    @pytest.fixture
+    def cli_dir(self, tmp_path):
+        (tmp_path / "cli.py").write_text(
+            generate_content(_config(), "python")["cli.py"]
+        )
+        (tmp_path / "cli_hooks.py").write_text(HOOKS)
+        return tmp_path
+
+    def _run(self, cli_dir, *args):
+        return subprocess.run(
+            [sys.executable, "cli.py", *args],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=cli_dir,
+        )
+
+    @pytest.mark.parametrize(
+        "fmt,expected",
+        [
+            (
+                "ndjson",
+                '{"id": 0, "name": "row 0", "note": null}\n'
+                '{"id": 1, "name": "row 1", "note": "x"}\n'
+                '{"id": 2, "name": "row 2", "note": "xx"}\n',
+            ),
+            (
+                "json",
+                '[\n{"id": 0, "name": "row 0", "note": null},\n'
+                '{"id": 1, "name": "row 1", "note": "x"},\n'
+                '{"id": 2, "name": "row 2", "note": "xx"}\n]\n',
+            ),
+            ("csv", "id,name,note\n0,row 0,\n1,row 1,x\n2,row 2,xx\n"),
+            (
+                "table",
+                "id  name   note\n--  -----  ----\n0   row 0\n1   row 1  x\n2   row 2  xx\n",
+            ),
+        ],
+    )
+    def test_formats(self, cli_dir, fmt, expected):
+        """Every format renders the rows the generator yields."""
+        result = self._run(cli_dir, "export", "--format", fmt)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.replace("\r\n", "\n") == expected
+        assert "producer closed" in result.stderr
+
+    def test_empty_json_and_sequence_rows(self, cli_dir):
+        """Empty results are valid JSON and sequence rows need no header."""
+        result = self._run(cli_dir, "export", "--format", "json", "--count", "0")
+        assert result.stdout == "[]\n"
+
+        result = self._run(cli_dir, "hello")
+        assert result.stdout == "a           1\nlong value  22\n"
+
+    def test_closed_pipe_stops_producer(self, cli_dir):
+        """A reader that goes away ends the command quietly with exit code 0."""
+        process = subprocess.Popen(
+            [sys.executable, "cli.py", "export", "--count", "100000000"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cli_dir,
+        )
+        first = process.stdout.readline()
+        process.stdout.close()
+        _, stderr = process.communicate(timeout=30)
+
+        assert first.startswith(b'{"id": 0')
+        assert process.returncode == 0
+        assert stderr.decode() == "producer closed\n"
+
+    @pytest.mark.parametrize("language", sorted(CLI_FILES))
+    def test_output_helper_is_feature_gated(self, language, tmp_path):
+        """Only CLIs with table, CSV or JSON output ship the helper."""
+        with_export = generate_content(_config(), language)[CLI_FILES[language]]
+        plain = generate_content(_config(with_export=False), language)[
+            CLI_FILES[language]
+        ]
+
+        assert OUTPUT_MARKERS[language] in with_export
+        assert OUTPUT_MARKERS[language] not in plain
+        if language == "nodejs" and shutil.which("node"):
+            (tmp_path / "cli.mjs").write_text(with_export)
+            check = subprocess.run(
+                ["node", "--check", str(tmp_path / "cli.mjs")],
+                capture_output=True,
+                text=True,
+            )
+            assert check.returncode == 0, check.stderr
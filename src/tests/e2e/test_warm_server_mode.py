@@ -0,0 +1,188 @@
+"""
+E2E tests for the warm-process server mode of generated Python CLIs.
+
+The first invocation runs in-process and starts a background server; later
+invocations are forwarded to it over a per-user Unix socket.
+"""
+
+import importlib.util
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix sockets not available"
+)
+
+HOOKS = """
+import os
+import sys
+
+def on_hello(ctx, name=None, **kwargs):
+    print(f"hello {name} pid={os.getpid()} cwd={os.getcwd()} tag={os.environ.get('WARM_TAG')}")
+    if name == "fail":
+        sys.exit(7)
+
+def on_shout(ctx, **kwargs):
+    sys.stdout.write(sys.stdin.read().upper())
+    print("done", file=sys.stderr)
+"""
+
+
+def _config(enabled: bool = True) -> dict:
+    return {
+        "package_name": "warmcli",
+        "command_name": "warmcli",
+        "display_name": "Warm CLI",
+        "description": "Warm server test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "features": {"server_mode": {"enabled": enabled, "idle_timeout": 10}},
+        "cli": {
+            "name": "warmcli",
+            "tagline": "Warm server test CLI",
+            "commands": {
+                "hello": {
+                    "desc": "Say hello",
+                    "args": [{"name": "name", "desc": "Name"}],
+                },
+                "shout": {"desc": "Upper-case stdin"},
+            },
+        },
+    }
+
+
+class TestWarmServerMode:
+    """Tests for the opt-in warm server in generated Python CLIs."""
+
+    def test_server_code_only_emitted_when_enabled(self):
+        """Disabled server mode leaves the generated CLI untouched."""
+        enabled = generate_content(_config(True), "python")["cli.py"]
+        disabled = generate_content(_config(False), "python")["cli.py"]
+
+        assert "def _warm_serve()" in enabled
+        assert "WARMCLI_NO_SERVER" in enabled
+        assert "_warm" not in disabled
+        compile(enabled, "cli.py", "exec")
+
+    def test_forwarded_invocations(self, tmp_path):
+        """Invocations after the first run on the server with full passthrough."""
+        cli_file = tmp_path / "cli.py"
+        cli_file.write_text(generate_content(_config(), "python")["cli.py"])
+        (tmp_path / "cli_hooks.py").write_text(HOOKS)
+
+        # Keep the socket path short and isolated from the real runtime dir
+        runtime_dir = tempfile.mkdtemp(prefix="warm")
+        env = {**os.environ, "XDG_RUNTIME_DIR": runtime_dir}
+        env.pop("WARMCLI_NO_SERVER", None)
+        workdir = tmp_path / "work"
+        workdir.mkdir()
+
+        def run(*args, **kwargs):
+            return subprocess.run(
+                [sys.executable, str(cli_file), *args],
+                capture_output=True,
+                text=True,
+                timeout=30,
+                cwd=kwargs.pop("cwd", workdir),
+                env={**env, **kwargs.pop("extra_env", {})},
+                **kwargs,
+            )
+
+        first = run("hello", "one", cwd=tmp_path)
+        assert first.returncode == 0, first.stderr
+        local_pid = int(first.stdout.split("pid=")[1].split()[0])
+
+        # The first call runs in-process and starts the server in the background
+        deadline = time.time() + 15
+        while not list(Path(runtime_dir).glob("*/*.sock")) and time.time() < deadline:
+            time.sleep(0.1)
+
+        server_pid = None
+        try:
+            second = run("hello", "two", extra_env={"WARM_TAG": "x"})
+            assert second.returncode == 0, second.stderr
+            server_pid = int(second.stdout.split("pid=")[1].split()[0])
+
+            assert server_pid != local_pid
+            assert f"cwd={workdir}" in second.stdout
+            assert "tag=x" in second.stdout
+
+            failed = run("hello", "fail")
+            assert failed.returncode == 7
+            assert f"pid={server_pid}" in failed.stdout
+
+            shouted = run("shout", input="quiet words\n")
+            assert shouted.returncode == 0
+            assert shouted.stdout == "QUIET WORDS\n"
+            assert "done" in shouted.stderr
+
+            usage = run("missing-command")
+            assert usage.returncode == 2
+            assert "No such command" in usage.stderr
+        finally:
+            if server_pid and server_pid != local_pid:
+                os.kill(server_pid, signal.SIGTERM)
+            shutil.rmtree(runtime_dir, ignore_errors=True)
+
+    @pytest.fixture
+    def warm_module(self, tmp_path):
+        """Import a generated server-mode CLI and give it a short socket path."""
+        cli_file = tmp_path / "cli.py"
+        cli_file.write_text(generate_content(_config(), "python")["cli.py"])
+        spec = importlib.util.spec_from_file_location("warm_cli", cli_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        runtime_dir = tempfile.mkdtemp(prefix="warm")
+        yield module, os.path.join(runtime_dir, "s.sock")
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+    def _stale_socket(self, path: str) -> None:
+        """Leave a socket file behind with nobody listening on it."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.close()
+
+    def test_bind_replaces_stale_socket(self, warm_module, monkeypatch):
+        """A dead server's socket is replaced, even if it vanishes meanwhile."""
+        module, path = warm_module
+        self._stale_socket(path)
+        unlink = os.unlink
+
+        def unlink_raced(target):
+            unlink(target)
+            raise FileNotFoundError(target)
+
+        monkeypatch.setattr(os, "unlink", unlink_raced)
+        server = module._warm_bind(path)
+
+        assert server is not None
+        server.close()
+
+    def test_bind_loses_race_to_another_server(self, warm_module, monkeypatch):
+        """If another server binds the replaced socket first, this one runs cold."""
+        module, path = warm_module
+        self._stale_socket(path)
+        unlink = os.unlink
+        winner = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        def unlink_then_rebind(target):
+            unlink(target)
+            winner.bind(target)
+
+        monkeypatch.setattr(os, "unlink", unlink_then_rebind)
+        try:
+            assert module._warm_bind(path) is None
+        finally:
+            winner.close()
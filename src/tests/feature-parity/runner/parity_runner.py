@@ -257,7 +257,10 @@ class ParityTestRunner:
 
             if language == "typescript":
                 built_cli = self._discover_cli_path(generated_root / "dist", "nodejs")
-                if built_cli is not None:
+                if built_cli is None and cli_path is not None:
+                    # The generated tsconfig compiles cli.ts in place
+                    built_cli = cli_path.with_suffix(".js")
+                if built_cli is not None and built_cli.exists():
                     cli_path = built_cli
 
             if cli_path is None:
@@ -0,0 +1,292 @@
+"""
+Completion latency benchmarks.
+
+Each scenario drives get_smart_completions end to end with a mix of requests
+and reports the latency distribution of the first (cold) request and of the
+rest, along with the per-provider statistics of the engine.
+
+These tests verify that:
+1. Completion in large directory trees meets the latency target
+2. Completion against a 50,000 command history meets the latency target
+3. Completion of keys from a config file with 5,000 keys meets the target
+4. Completion with 40 providers, some slow, meets the target, with the
+   providers that miss the budget counted as timeouts
+5. Fuzzy completion in a 200,000 file directory that is being written to
+   meets the target, with the fuzzy provider itself within the budget
+"""
+
+import asyncio
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+import yaml
+
+from goobits_cli.universal.integrations.completion.history_store import (
+    DEFAULT_HALF_LIFE,
+    HistoryStore,
+)
+from goobits_cli.universal.integrations.completion.latency import LatencyHistogram
+from goobits_cli.universal.integrations.completion.providers import (
+    setup_default_providers,
+)
+from goobits_cli.universal.integrations.completion.registry import (
+    CompletionContext,
+    CompletionProvider,
+)
+from goobits_cli.universal.integrations.completion.smart_completion import (
+    SmartCompletionEngine,
+)
+
+REQUESTS = 400  # per scenario, after the cold one
+
+# Latency targets for warm requests; the registry's own budget is 50 ms
+MAX_P95 = 0.075
+MAX_P99 = 0.150
+
+WORDS = [
+    "build", "test", "install", "config", "deploy", "status", "commit",
+    "remote", "server", "client", "cache", "index", "parser", "render",
+]  # fmt: skip
+
+Request = Tuple[str, str]
+
+
+def _report(name: str, cold: float, warm: LatencyHistogram, stats: Dict) -> str:
+    """Format a scenario's latency distribution and provider statistics."""
+    summary = warm.summary()
+    lines = [
+        f"\n{name}: cold {cold * 1000:.1f} ms, {summary['count']} warm requests "
+        f"p50 {summary['p50_ms']:.2f} ms, p95 {summary['p95_ms']:.2f} ms, "
+        f"p99 {summary['p99_ms']:.2f} ms, max {summary['max_ms']:.2f} ms"
+    ]
+    for provider, latency in sorted(stats["provider_latency"].items()):
+        lines.append(
+            f"  {provider}: {latency['calls']} calls, "
+            f"p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms, "
+            f"p99 {latency['p99_ms']:.2f} ms, {latency['timeouts']} timeouts, "
+            f"{latency['cancellations']} cancellations, {latency['errors']} errors"
+        )
+    lines.append(f"  cache hit rate {stats['cache_hit_rate']:.0%}")
+    return "\n".join(lines)
+
+
+def _engine(
+    history: Optional[HistoryStore] = None,
+    providers: Optional[List[CompletionProvider]] = None,
+) -> SmartCompletionEngine:
+    """Create an engine with the default providers and any extra ones."""
+    engine = SmartCompletionEngine(history_store=history)
+    for provider in setup_default_providers() + (providers or []):
+        engine.register_provider(provider)
+    return engine
+
+
+def _run(
+    engine: SmartCompletionEngine,
+    requests: List[Request],
+    cwd: Path,
+    before: Optional[Callable[[], None]] = None,
+) -> Tuple[float, LatencyHistogram]:
+    """Time one cold request, then the rest, end to end, calling before first."""
+
+    async def run() -> Tuple[float, LatencyHistogram]:
+        histogram = LatencyHistogram()
+        cold = 0.0
+        for number, (word, line) in enumerate(requests):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            await engine.get_smart_completions(word, line, cwd=cwd)
+            elapsed = time.perf_counter() - start
+            if number:
+                histogram.record(elapsed)
+            else:
+                cold = elapsed
+        return cold, histogram
+
+    return asyncio.run(run())
+
+
+def _mix(candidates: List[Request], count: int, seed: int) -> List[Request]:
+    """Pick count requests, repeating some as users do."""
+    rng = random.Random(seed)
+    return [rng.choice(candidates) for _ in range(count)]
+
+
+def _check(name: str, cold: float, warm: LatencyHistogram, stats, capsys) -> None:
+    """Report a scenario and hold it to the latency targets."""
+    with capsys.disabled():
+        print(_report(name, cold, warm, stats))
+
+    assert warm.percentile(95) < MAX_P95, f"{name}: p95 {warm.percentile(95):.3f}s"
+    assert warm.percentile(99) < MAX_P99, f"{name}: p99 {warm.percentile(99):.3f}s"
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory) -> Path:
+    """A project with 40 packages of 250 files each and a 50,000 file directory."""
+    root = tmp_path_factory.mktemp("tree")
+    for package in range(40):
+        directory = root / "src" / f"pkg{package:02d}"
+        directory.mkdir(parents=True)
+        for module in range(250):
+            (directory / f"{WORDS[module % len(WORDS)]}_{module}.py").touch()
+    flat = root / "data"
+    flat.mkdir()
+    for i in range(50_000):
+        (flat / f"sample_{i:05d}.json").touch()
+
+    # Listings of just-modified directories are not cached; a checkout is older
+    day_ago = time.time() - 24 * 3600
+    for directory in [root, root / "src", flat, *(root / "src").iterdir()]:
+        os.utime(directory, (day_ago, day_ago))
+    return root
+
+
+@pytest.fixture(scope="module")
+def history(tmp_path_factory) -> HistoryStore:
+    """A history store with 50,000 distinct commands used over a year."""
+    rng = random.Random(3)
+    now = time.time()
+    tools = ["git", "docker", "make", "npm", "cargo", "kubectl", "mycli"]
+    lines = []
+    for i in range(50_000):
+        used = now - rng.random() * 365 * 24 * 3600
+        command = f"{rng.choice(tools)} {rng.choice(WORDS)} --{rng.choice(WORDS)} {i}"
+        lines.append(f"{used:.3f}\t1\t{used / DEFAULT_HALF_LIFE!r}\t{command}\n")
+    path = tmp_path_factory.mktemp("history") / "completion_history"
+    path.write_text("".join(lines))
+    return HistoryStore(path)
+
+
+@pytest.fixture(scope="module")
+def busy_directory(tmp_path_factory) -> Path:
+    """A directory of 200,000 files."""
+    directory = tmp_path_factory.mktemp("busy")
+    for i in range(200_000):
+        (directory / f"file_{i:06d}.log").touch()
+    return directory
+
+
+class SyntheticProvider(CompletionProvider):
+    """Provider that answers after a fixed delay, blocking its thread or not."""
+
+    cacheable = False
+
+    def __init__(self, index: int, delay: float, blocking: bool = False):
+        super().__init__(priority=index)
+        self.delay = delay
+        self.blocking = blocking
+        self.completions = [
+            f"{WORDS[index % len(WORDS)]}_{index}_{i}" for i in range(5)
+        ]
+
+    def can_provide(self, context: CompletionContext) -> bool:
+        return True
+
+    async def provide_completions(self, context: CompletionContext) -> List[str]:
+        if self.blocking:
+            time.sleep(self.delay)
+        elif self.delay:
+            await asyncio.sleep(self.delay)
+        return [c for c in self.completions if c.startswith(context.current_word)]
+
+
+@pytest.mark.performance
+class TestCompletionLatency:
+    """Benchmark end-to-end completion latency under large inputs."""
+
+    def test_directory_trees(self, tree: Path, capsys):
+        """Paths in nested packages and in a 50,000 file directory."""
+        candidates = [("./", "mycli ./"), ("data/", "mycli data/")]
+        for package in range(40):
+            candidates.append((f"src/pkg{package:02d}/", f"edit src/pkg{package:02d}/"))
+            for word in WORDS[:4]:
+                path = f"src/pkg{package:02d}/{word}"
+                candidates.append((path, f"edit {path}"))
+        for i in range(0, 50_000, 500):
+            candidates.append((f"data/sample_{i:03d}"[:-1], "mycli data/sample"))
+
+        engine = _engine()
+        cold, warm = _run(engine, _mix(candidates, REQUESTS + 1, 1), tree)
+
+        _check("directory trees", cold, warm, engine.get_statistics(), capsys)
+
+    def test_large_history(self, history: HistoryStore, tmp_path: Path, capsys):
+        """Commands completed from a 50,000 entry frecency-ranked history."""
+        candidates = [
+            (prefix, prefix)
+            for tool in ["git", "docker", "make", "npm", "cargo", "kubectl"]
+            for prefix in [tool[:2], tool, f"{tool} ", f"{tool} s", f"{tool} co"]
+        ]
+
+        engine = _engine(history)
+        cold, warm = _run(engine, _mix(candidates, REQUESTS + 1, 2), tmp_path)
+
+        _check("large history", cold, warm, engine.get_statistics(), capsys)
+
+    def test_big_config(self, tmp_path: Path, capsys):
+        """Keys completed from a config file with 5,000 keys."""
+        config: Dict[str, Any] = {
+            f"{WORDS[i % len(WORDS)]}_{i}": {"enabled": True, "value": i}
+            for i in range(5_000)
+        }
+        (tmp_path / "goobits.yaml").write_text(yaml.safe_dump(config))
+        candidates = [
+            (f"{word}_{digit}", f"mycli config set {word}_{digit}")
+            for word in WORDS
+            for digit in range(10)
+        ]
+
+        engine = _engine()
+        cold, warm = _run(engine, _mix(candidates, REQUESTS + 1, 3), tmp_path)
+
+        _check("big config", cold, warm, engine.get_statistics(), capsys)
+
+    def test_many_providers(self, tmp_path: Path, capsys):
+        """40 extra providers, a few of them blocking and a few too slow."""
+        providers = []
+        for index in range(40):
+            if index % 10 == 0:
+                delay, blocking = 0.2, index % 20 == 0  # misses the budget
+            elif index % 5 == 0:
+                delay, blocking = 0.002, True
+            else:
+                delay, blocking = (index % 3) * 0.001, False
+            providers.append(SyntheticProvider(index, delay, blocking))
+        candidates = [
+            (word[:length], word[:length]) for word in WORDS for length in (1, 2, 3)
+        ]
+
+        engine = _engine(providers=providers)
+        requests = _mix(candidates, REQUESTS // 4 + 1, 4)
+        cold, warm = _run(engine, requests, tmp_path)
+
+        stats = engine.get_statistics()
+        _check("many providers", cold, warm, stats, capsys)
+        timeouts = stats["provider_latency"]["SyntheticProvider"]["timeouts"]
+        assert timeouts >= len(requests)
+
+    def test_fuzzy_in_busy_directory(self, busy_directory: Path, capsys):
+        """Fuzzy matches in a 200,000 file directory written to before each TAB."""
+        candidates = [
+            (word, f"mycli {word}") for word in ("fi", "lg", "fl0", "f12", "og")
+        ]
+
+        # Recently modified directories are listed again on every request
+        def write() -> None:
+            os.utime(busy_directory)
+
+        engine = _engine()
+        requests = _mix(candidates, REQUESTS // 4 + 1, 5)
+        cold, warm = _run(engine, requests, busy_directory, write)
+
+        stats = engine.get_statistics()
+        _check("fuzzy in busy directory", cold, warm, stats, capsys)
+        fuzzy = stats["provider_latency"]["FuzzyMatchProvider"]
+        assert cold < MAX_P99, f"cold {cold:.3f}s"
+        assert fuzzy["p95_ms"] < engine._time_budget * 1000
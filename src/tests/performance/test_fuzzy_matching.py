@@ -0,0 +1,87 @@
+"""
+Performance tests for fuzzy completion matching.
+
+These tests verify that:
+1. A fuzzy search over 100,000 candidates finishes within 10 ms
+2. Searching does not fall back to scoring every candidate
+"""
+
+import random
+import time
+from typing import List
+
+import pytest
+
+from goobits_cli.universal.integrations.completion.fuzzy import MAX_SCORED, FuzzyIndex
+
+CANDIDATE_COUNT = 100_000
+MAX_SEARCH_TIME = 0.010  # 10 ms per search
+
+WORDS = [
+    "build", "test", "install", "config", "deploy", "status", "commit",
+    "remote", "server", "client", "cache", "index", "parser", "render",
+    "template", "module", "utils", "helper", "runner", "worker", "session",
+    "history", "complete", "provider", "registry", "engine", "plugin",
+]  # fmt: skip
+
+QUERIES = ["bld", "tst", "cfg", "srvr", "rgstr", "tr", "compl", "instRen", "gcm"]
+
+
+def _candidates(count: int) -> List[str]:
+    """Generate a mix of file paths, options, camelCase names and commands."""
+    rng = random.Random(7)
+    candidates = []
+    for i in range(count):
+        a, b, c = rng.choice(WORDS), rng.choice(WORDS), rng.choice(WORDS)
+        kind = i % 4
+        if kind == 0:
+            candidates.append(f"src/{a}/{b}_{c}{i}.py")
+        elif kind == 1:
+            candidates.append(f"--{a}-{b}{i}")
+        elif kind == 2:
+            candidates.append(f"{a}{b.capitalize()}{i}")
+        else:
+            candidates.append(f"git {a} --{b} {i}")
+    return candidates
+
+
+@pytest.fixture(scope="module")
+def index() -> FuzzyIndex:
+    """Index the benchmark candidates once for all tests."""
+    return FuzzyIndex(_candidates(CANDIDATE_COUNT))
+
+
+@pytest.mark.performance
+class TestFuzzyMatching:
+    """Test that fuzzy matching scales to large candidate sets."""
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_search_within_budget(self, index: FuzzyIndex, query: str):
+        """Each search over 100k candidates completes within 10 ms."""
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            matches = index.search(query, 10)
+            timings.append(time.perf_counter() - start)
+
+        assert matches
+        assert min(timings) < MAX_SEARCH_TIME, (
+            f"Searching {query!r} took {min(timings) * 1000:.1f} ms, "
+            f"expected < {MAX_SEARCH_TIME * 1000:.0f} ms"
+        )
+
+    def test_scoring_is_bounded(self, index: FuzzyIndex, monkeypatch):
+        """Only the most promising survivors of the prefilter are scored."""
+        from goobits_cli.universal.integrations.completion import fuzzy
+
+        calls = []
+        score = fuzzy._score
+
+        def counting_score(*args):
+            calls.append(args)
+            return score(*args)
+
+        monkeypatch.setattr(fuzzy, "_score", counting_score)
+        index.search("tr", 10)
+
+        assert len(calls) <= MAX_SCORED
@@ -0,0 +1,212 @@
+"""
+Performance tests for the size and startup cost of generated CLIs.
+
+These tests verify that:
+1. Config management is always emitted, and Rust only compiles its loader
+   for CLIs with a config command
+2. Generated CLI files stay within a size budget per feature combination, and
+   Python CLIs only embed the subsystems their features call for
+3. The generated Python CLI imports within a startup budget and only imports
+   a TOML parser when the configuration is used
+"""
+
+import copy
+import functools
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from goobits_cli.universal.engine.orchestrator import generate_content
+
+CLI_FILES = {
+    "python": "cli.py",
+    "nodejs": "cli.js",
+    "typescript": "cli.ts",
+    "rust": "src/cli.rs",
+}
+
+# Upper bounds in bytes for the main CLI file, with headroom over current sizes
+SIZE_BUDGETS = {
+    ("nodejs", False): 21_000,
+    ("nodejs", True): 22_000,
+    ("typescript", False): 24_000,
+    ("typescript", True): 25_000,
+    ("rust", False): 16_000,
+    ("rust", True): 19_000,
+}
+
+# Python feature combinations, as (colors, config command, variadic argument,
+# table command), with their size budgets in bytes
+PYTHON_SIZE_BUDGETS = {
+    (False, False, False, False): 21_500,
+    (True, False, False, False): 22_000,
+    (True, True, False, False): 23_500,
+    (True, False, True, False): 24_000,
+    (True, False, False, True): 29_000,
+    (True, True, True, True): 32_000,
+}
+
+# Python subsystems and the features (by index in the combination) that
+# require each of them
+PYTHON_SUBSYSTEMS = {
+    "class ColoredFormatter": (0,),
+    "def save_config": (1,),
+    "class ConfigError": (1,),
+    "def fan_out": (2,),
+    "class UsageError": (2, 3),
+    "class StreamingOutput": (3,),
+}
+
+# Markers of the config scaffolding in each language
+CONFIG_MARKERS = {
+    "python": "class ConfigManager",
+    "nodejs": "class ConfigManager",
+    "typescript": "class ConfigManager",
+    "rust": "mod config",
+}
+
+MAX_PYTHON_IMPORT_TIME = 0.5  # seconds, including click itself
+
+
+def _config(with_config: bool) -> Dict[str, Any]:
+    """Build a one-command CLI, optionally with a config command."""
+    config = {
+        "package_name": "sizecli",
+        "command_name": "sizecli",
+        "display_name": "Size CLI",
+        "description": "Generated size test CLI",
+        "cli_path": "cli.py",
+        "cli_hooks_path": "cli_hooks.py",
+        "cli": {
+            "name": "sizecli",
+            "tagline": "Generated size test CLI",
+            "commands": {
+                "hello": {
+                    "desc": "Say hello",
+                    "args": [{"name": "name", "desc": "Name"}],
+                },
+            },
+        },
+    }
+    if with_config:
+        config = copy.deepcopy(config)
+        config["cli"]["commands"]["config"] = {"desc": "Manage configuration"}
+    return config
+
+
+@functools.lru_cache(maxsize=None)
+def _cli_file(language: str, with_config: bool) -> str:
+    """Generate a CLI and return the content of its main file."""
+    return generate_content(_config(with_config), language)[CLI_FILES[language]]
+
+
+@functools.lru_cache(maxsize=None)
+def _python_cli(colors: bool, with_config: bool, variadic: bool, table: bool) -> str:
+    """Generate a Python CLI for one feature combination."""
+    config = copy.deepcopy(_config(with_config))
+    config["cli"]["colors"] = colors
+    if variadic:
+        config["cli"]["commands"]["hello"]["args"][0]["nargs"] = "*"
+    if table:
+        config["cli"]["commands"]["ls"] = {"desc": "List items as a table"}
+    return generate_content(config, "python")["cli.py"]
+
+
+@pytest.mark.performance
+class TestGeneratedSize:
+    """Test that generated code only carries the features it uses."""
+
+    @pytest.mark.parametrize("language", sorted(set(CLI_FILES) - {"python"}))
+    @pytest.mark.parametrize("with_config", [False, True])
+    def test_size_budget(self, language: str, with_config: bool):
+        """Each feature combination stays within its size budget."""
+        size = len(_cli_file(language, with_config).encode("utf-8"))
+        budget = SIZE_BUDGETS[(language, with_config)]
+
+        assert size < budget, (
+            f"{language} CLI (config={with_config}) is {size} bytes, "
+            f"expected < {budget}"
+        )
+
+    @pytest.mark.parametrize("features", sorted(PYTHON_SIZE_BUDGETS))
+    def test_python_size_budget(self, features):
+        """Each Python feature combination stays within its own budget."""
+        size = len(_python_cli(*features).encode("utf-8"))
+        budget = PYTHON_SIZE_BUDGETS[features]
+
+        assert size < budget, (
+            f"Python CLI {features} is {size} bytes, expected < {budget}"
+        )
+
+    @pytest.mark.parametrize("features", sorted(PYTHON_SIZE_BUDGETS))
+    def test_python_subsystems(self, features):
+        """Python CLIs embed a subsystem only when a feature requires it."""
+        cli = _python_cli(*features)
+
+        for marker, required_by in PYTHON_SUBSYSTEMS.items():
+            expected = any(features[index] for index in required_by)
+            assert (marker in cli) == expected, marker
+
+    @pytest.mark.parametrize("language", sorted(CLI_FILES))
+    def test_config_scaffolding(self, language: str):
+        """Config management does not depend on a config command, except in Rust."""
+        minimal = _cli_file(language, with_config=False)
+        full = _cli_file(language, with_config=True)
+
+        assert CONFIG_MARKERS[language] in full
+        assert (CONFIG_MARKERS[language] in minimal) == (language != "rust")
+
+    def test_python_config_option_without_config_command(self, tmp_path: Path):
+        """--config and ctx.config work in CLIs without a config command."""
+        (tmp_path / "cli.py").write_text(_cli_file("python", with_config=False))
+        (tmp_path / "cli_hooks.py").write_text(
+            "def on_hello(ctx, name=None, **kwargs):\n"
+            "    print(ctx.config.get('greeting'), name)\n"
+        )
+        (tmp_path / "settings.toml").write_text('[sizecli]\ngreeting = "hi"\n')
+
+        result = subprocess.run(
+            [sys.executable, "cli.py", "--config", "settings.toml", "hello", "x"],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=tmp_path,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "hi x"
+
+    @pytest.mark.parametrize("language", ["nodejs", "typescript"])
+    def test_node_cli_has_no_unused_logger(self, language: str):
+        """Node.js and TypeScript CLIs do not ship an unused winston logger."""
+        cli = _cli_file(language, with_config=True)
+
+        assert "winston" not in cli
+        assert "getLogger" not in cli
+
+    @pytest.mark.parametrize("with_config", [False, True])
+    def test_python_import_time(self, with_config: bool, tmp_path: Path):
+        """The generated Python CLI imports quickly and only what it needs."""
+        (tmp_path / "cli.py").write_text(_cli_file("python", with_config))
+        probe = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import cli\n"
+            "print(time.perf_counter() - start)\n"
+            "print(int('tomllib' in sys.modules or 'toml' in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=tmp_path,
+        )
+
+        assert result.returncode == 0, result.stderr
+        elapsed, loaded_toml = result.stdout.split()
+        assert float(elapsed) < MAX_PYTHON_IMPORT_TIME
+        assert loaded_toml == "0"
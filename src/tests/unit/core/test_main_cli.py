@@ -160,6 +160,41 @@ class TestMainCLICommands(TestMainCLIBase):
         assert result.exit_code == 0
         assert "Detected language: typescript" in result.stdout
 
+    def test_build_command_typescript_runs_tsc(self):
+        """TypeScript builds compile cli.ts so the CLI runs right away."""
+        config_content = self.get_minimal_valid_config(
+            package_name="ts-test-cli", command_name="tstestcli", language="typescript"
+        )
+        config_path = self.create_test_config_file(config_content)
+
+        with patch(
+            "goobits_cli.commands.build.shutil.which", return_value="/usr/bin/tsc"
+        ), patch(
+            "goobits_cli.commands.build.subprocess.run",
+            return_value=subprocess.CompletedProcess([], 0, "", ""),
+        ) as mock_run:
+            result = self.runner.invoke(app, ["build", str(config_path)])
+
+        assert result.exit_code == 0
+        assert "Compiled TypeScript with tsc" in result.output
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == ["/usr/bin/tsc", "-p", "tsconfig.json"]
+        assert mock_run.call_args.kwargs["cwd"] == config_path.parent
+
+    def test_build_command_typescript_without_tsc(self):
+        """Without tsc the build succeeds and says how to compile."""
+        config_content = self.get_minimal_valid_config(
+            package_name="ts-test-cli", command_name="tstestcli", language="typescript"
+        )
+        config_path = self.create_test_config_file(config_content)
+
+        with patch("goobits_cli.commands.build.shutil.which", return_value=None):
+            result = self.runner.invoke(app, ["build", str(config_path)])
+
+        assert result.exit_code == 0
+        assert "TypeScript compiler not found" in result.output
+        assert "npm install && npm run build" in result.output
+
     def test_build_command_default_templates(self):
         """Test build command with template system."""
         config_content = self.get_minimal_valid_config()
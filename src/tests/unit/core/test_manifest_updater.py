@@ -153,3 +153,39 @@ def test_update_manifests_for_build_handles_none_installation_and_scans_node_imp
     assert package_data["dependencies"]["commander"].startswith("^")
     assert package_data["dependencies"]["ora"] == "latest"
     assert package_data["dependencies"]["winston"] == "latest"
+
+
+def test_extract_nodejs_import_dependencies_includes_lazy_loads(tmp_path: Path):
+    node_cli = tmp_path / "cli.js"
+    node_cli.write_text(
+        "import { createRequire } from 'module';\n"
+        "import chalk from 'chalk';\n"
+        "const lazyRequire = createRequire(import.meta.url);\n"
+        "const yaml = () => lazyRequire('js-yaml');\n"
+        "const { AsyncLocalStorage } = lazyRequire('async_hooks');\n"
+        "const { default: ora } = await import('ora');\n"
+        "const hooks = await import('./cli_hooks.mjs');\n",
+        encoding="utf-8",
+    )
+
+    deps = ManifestUpdater().extract_nodejs_import_dependencies(node_cli)
+
+    assert deps == {"chalk": "latest", "js-yaml": "latest", "ora": "latest"}
+
+
+def test_update_manifests_for_build_typescript_points_bin_at_compiled_js(
+    tmp_path: Path,
+):
+    ts_cfg = {"language": "typescript", "cli": {"name": "tscli"}}
+    (tmp_path / "cli.ts").write_text("import x from 'commander';\n", encoding="utf-8")
+    pkg = tmp_path / "package.json"
+    pkg.write_text(json.dumps({"scripts": {"build": "custom"}}), encoding="utf-8")
+
+    result = update_manifests_for_build(ts_cfg, tmp_path, Path("cli.ts"))
+
+    assert not result.is_err()
+    data = json.loads(pkg.read_text(encoding="utf-8"))
+    assert data["bin"]["tscli"] == "cli.js"
+    assert data["scripts"]["build"] == "custom"
+    assert data["devDependencies"]["typescript"] == "^5.0.0"
+    assert data["dependencies"]["commander"]
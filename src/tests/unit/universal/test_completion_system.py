@@ -15,29 +15,64 @@ Test suite for the dynamic completion system.
 Tests the DynamicCompletionRegistry, providers, and integration components.
 """
 
+import asyncio
+import json
+import os
+import shutil
+import subprocess
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 import pytest
+import yaml
 
+from goobits_cli.universal.integrations.completion import (
+    daemon,
+    history_store,
+    providers,
+)
+from goobits_cli.universal.integrations.completion.fuzzy import (
+    FuzzyIndex,
+    fuzzy_score,
+    merge_matches,
+)
+from goobits_cli.universal.integrations.completion.history_store import HistoryStore
 from goobits_cli.universal.integrations.completion.integration import (
     InteractiveCompletionIntegrator,
     setup_completion_for_language,
 )
+from goobits_cli.universal.integrations.completion.latency import (
+    LatencyHistogram,
+    ProviderLatencyStats,
+)
+from goobits_cli.universal.integrations.completion.prefix_index import (
+    PrefixIndex,
+    history_index,
+)
 from goobits_cli.universal.integrations.completion.providers import (
+    CommandTreeProvider,
     ConfigKeyProvider,
+    DirectoryListingCache,
     EnvironmentVariableProvider,
     FilePathCompletionProvider,
     HistoryProvider,
     setup_default_providers,
 )
 from goobits_cli.universal.integrations.completion.registry import (
+    CompletionCache,
     CompletionContext,
+    CompletionContextCache,
     CompletionProvider,
     DynamicCompletionRegistry,
     get_completion_registry,
 )
+from goobits_cli.universal.integrations.completion.smart_completion import (
+    FuzzyMatchProvider,
+    SmartCompletionContext,
+    SmartCompletionEngine,
+)
 
 
 class MockCompletionProvider(CompletionProvider):
@@ -175,6 +210,494 @@ class TestDynamicCompletionRegistry:
         assert completions == []
 
 
+class SlowCompletionProvider(MockCompletionProvider):
+    """Provider that answers after a delay, blocking its thread or not."""
+
+    def __init__(self, priority: int, delay: float, blocking: bool = False, **kwargs):
+        super().__init__(priority, **kwargs)
+        self.delay = delay
+        self.blocking = blocking
+        self.cancelled = False
+        self.calls = []
+
+    async def provide_completions(self, context: CompletionContext) -> list:
+        self.calls.append("start")
+        if self.blocking:
+            time.sleep(self.delay)
+        else:
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        self.calls.append("end")
+        return await super().provide_completions(context)
+
+
+class TestConcurrentProviders:
+    """Test concurrent provider execution under the time budget."""
+
+    def setup_method(self):
+        """Setup test registry."""
+        self.registry = DynamicCompletionRegistry()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("blocking", [False, True])
+    async def test_slow_provider_is_cut_off(self, blocking):
+        """A provider past the budget is dropped from the result."""
+        slow = SlowCompletionProvider(90, 1.0, blocking, test_completions=["test_slow"])
+        self.registry.register_provider(slow)
+        self.registry.register_provider(MockCompletionProvider(10, ["test_fast"]))
+
+        start = time.perf_counter()
+        completions = await self.registry.get_completions("test", "test", "python")
+
+        assert time.perf_counter() - start < 0.5
+        assert completions == ["test_fast"]
+        assert slow.cancelled != blocking
+
+    @pytest.mark.asyncio
+    async def test_late_blocking_result_serves_next_request(self):
+        """A blocking provider that misses the deadline is cached once it ends."""
+        slow = SlowCompletionProvider(90, 0.1, True, test_completions=["test_slow"])
+        self.registry.register_provider(slow)
+
+        assert await self.registry.get_completions("test", "test", "python") == []
+        await asyncio.sleep(0.2)
+        completions = await self.registry.get_completions("test", "test", "python")
+
+        assert completions == ["test_slow"]
+        assert slow.calls == ["start", "end"]
+
+    @pytest.mark.asyncio
+    async def test_results_merge_in_priority_order(self):
+        """Providers overlap and their results are merged by priority."""
+        log = []
+        for priority, name in [(10, "test_low"), (50, "test_mid"), (90, "test_high")]:
+            provider = SlowCompletionProvider(priority, 0.01, test_completions=[name])
+            provider.calls = log
+            self.registry.register_provider(provider)
+
+        completions = await self.registry.get_completions("test", "test", "python")
+
+        assert log == ["start"] * 3 + ["end"] * 3
+        assert completions == ["test_high", "test_mid", "test_low"]
+
+    @pytest.mark.asyncio
+    async def test_early_exit_with_enough_high_priority_results(self):
+        """Lower-priority providers are not awaited once enough results exist."""
+        many = [f"test{i}" for i in range(30)]
+        self.registry.register_provider(MockCompletionProvider(90, many))
+        slow = SlowCompletionProvider(10, 0.04, test_completions=["test_slow"])
+        self.registry.register_provider(slow)
+
+        completions = await self.registry.get_completions("test", "test", "python")
+
+        assert completions == many
+        assert slow.cancelled
+
+    @pytest.mark.asyncio
+    async def test_provider_latency_statistics(self):
+        """Latencies, timeouts and cancellations are reported per provider."""
+        fast = MockCompletionProvider(90, ["test_fast"])
+        fast.cacheable = False
+        slow = SlowCompletionProvider(50, 1.0, test_completions=["test_slow"])
+        self.registry.register_provider(fast)
+        self.registry.register_provider(slow)
+
+        # The slow provider misses the budget, then is no longer awaited
+        await self.registry.get_completions("test", "test", "python")
+        self.registry._enough_results = 1
+        await self.registry.get_completions("test", "test", "python")
+
+        latency = self.registry.get_statistics()["provider_latency"]
+        assert latency["MockCompletionProvider"]["calls"] == 2
+        assert 0 < latency["MockCompletionProvider"]["p99_ms"] < 50
+        assert latency["SlowCompletionProvider"] == {
+            "calls": 0,
+            "mean_ms": 0.0,
+            "p50_ms": 0.0,
+            "p95_ms": 0.0,
+            "p99_ms": 0.0,
+            "max_ms": 0.0,
+            "errors": 0,
+            "timeouts": 1,
+            "cancellations": 1,
+        }
+
+
+class TestLatencyHistogram:
+    """Test the logarithmic latency histogram."""
+
+    def test_percentiles_within_bucket_precision(self):
+        """Percentiles are within one bucket (about 9%) of the exact values."""
+        histogram = LatencyHistogram()
+        samples = [i / 10_000 for i in range(1, 1001)]  # 0.1 ms to 100 ms
+        for sample in reversed(samples):
+            histogram.record(sample)
+
+        for percent, exact in [(50, 0.050), (95, 0.095), (99, 0.099)]:
+            assert exact <= histogram.percentile(percent) <= exact * 1.1
+        assert histogram.percentile(100) == histogram.max == 0.1
+        assert histogram.summary()["mean_ms"] == pytest.approx(50.05)
+
+    def test_empty_and_extreme_durations(self):
+        """Empty histograms report zeros; tiny and huge durations are kept."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(99) == 0.0
+
+        histogram.record(0.0)
+        histogram.record(1e6)
+        assert histogram.percentile(50) == 1e-6
+        assert histogram.percentile(99) == 1e6
+
+    def test_errors_are_counted_with_their_latency(self):
+        """Failed calls count as calls and as errors."""
+        stats = ProviderLatencyStats()
+        stats.record(0.002)
+        stats.record(0.004, failed=True)
+
+        summary = stats.summary()
+        assert summary["calls"] == 2
+        assert summary["errors"] == 1
+        assert summary["max_ms"] == pytest.approx(4.0)
+
+
+class TestCompletionContextCache:
+    """Test the environment and config state reused across requests."""
+
+    def test_environment_snapshot_refreshes_on_change(self, monkeypatch):
+        """The snapshot is reused until a variable is set or removed."""
+        cache = CompletionContextCache()
+        first = cache.environment()
+
+        assert cache.environment() is first
+        monkeypatch.setenv("GOOBITS_COMPLETION_TEST", "1")
+        second = cache.environment()
+        assert second is not first
+        assert second["GOOBITS_COMPLETION_TEST"] == "1"
+        monkeypatch.delenv("GOOBITS_COMPLETION_TEST")
+        assert "GOOBITS_COMPLETION_TEST" not in cache.environment()
+
+    def test_config_parsed_once_per_mtime(self, tmp_path):
+        """Config files are parsed again only after they change."""
+        cache = CompletionContextCache()
+        broken = tmp_path / "broken.yaml"
+        broken.write_text("key: [unclosed")
+        config = tmp_path / "goobits.yaml"
+        config.write_text("name: one\n")
+        paths = [tmp_path / "missing.yaml", broken, config]
+
+        with patch("yaml.safe_load", wraps=yaml.safe_load) as load:
+            first = cache.config(paths)
+            assert cache.config(paths) is first
+            assert load.call_count == 2
+
+        assert first == {"name": "one"}
+        config.write_text("name: two, longer\n")
+        assert cache.config(paths) == {"name": "two, longer"}
+        assert cache.config([tmp_path / "missing.yaml"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_context_fields_load_lazily(self):
+        """Building a context reads neither the environment nor config files."""
+        registry = DynamicCompletionRegistry()
+
+        with patch.object(
+            CompletionContextCache, "environment", return_value={"HOME": "/h"}
+        ) as environment, patch.object(
+            CompletionContextCache, "config", return_value={"name": "x"}
+        ) as config:
+            context = await registry._build_context("", "cmd", "python")
+            assert not environment.called and not config.called
+
+            assert list(context.env) == ["HOME"]
+            assert context.config["name"] == "x"
+            assert environment.call_count == config.call_count == 1
+
+
+class CountingFileProvider(CompletionProvider):
+    """Lists the working directory and counts how often it runs."""
+
+    def __init__(self, cacheable: bool = True):
+        super().__init__(50)
+        self.cacheable = cacheable
+        self.runs = 0
+
+    def can_provide(self, context: CompletionContext) -> bool:
+        return True
+
+    async def provide_completions(self, context: CompletionContext) -> list:
+        self.runs += 1
+        return sorted(item.name for item in context.cwd.iterdir())
+
+
+class TestCompletionCaching:
+    """Test the per-provider LRU and TTL result cache."""
+
+    @pytest.mark.asyncio
+    async def test_cache_follows_cwd_and_directory_changes(self, tmp_path, monkeypatch):
+        """Results are reused until cd or a change to the listed directory."""
+        for name in ("one", "two"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / f"{name}.txt").write_text("")
+        registry = DynamicCompletionRegistry()
+        provider = CountingFileProvider()
+        registry.register_provider(provider)
+
+        monkeypatch.chdir(tmp_path / "one")
+        assert await registry.get_completions("", "cmd") == ["one.txt"]
+        assert await registry.get_completions("", "cmd") == ["one.txt"]
+        monkeypatch.chdir(tmp_path / "two")
+        assert await registry.get_completions("", "cmd") == ["two.txt"]
+        (tmp_path / "two" / "new.txt").write_text("")
+        os.utime(tmp_path / "two", ns=(0, 10**18))
+        assert await registry.get_completions("", "cmd") == ["new.txt", "two.txt"]
+
+        assert provider.runs == 3
+        stats = registry.get_statistics()
+        assert (stats["cache_hits"], stats["cache_misses"]) == (1, 3)
+        assert stats["cache_hit_rate"] == 0.25
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_providers_always_run(self, tmp_path, monkeypatch):
+        """Providers that opt out of caching answer every request."""
+        monkeypatch.chdir(tmp_path)
+        registry = DynamicCompletionRegistry()
+        provider = CountingFileProvider(cacheable=False)
+        registry.register_provider(provider)
+
+        for _ in range(3):
+            await registry.get_completions("", "cmd")
+
+        assert provider.runs == 3
+        assert registry.get_statistics()["cache_size"] == 0
+
+    def test_lru_bound_and_ttl(self):
+        """The least recently used entry is evicted and old entries expire."""
+        cache = CompletionCache(max_size=2, ttl=60)
+        cache.put("a", ["1"])
+        cache.put("b", ["2"])
+        assert cache.get("a") == ["1"]
+        cache.put("c", ["3"])
+
+        assert cache.get("b") is None
+        assert cache.get("c") == ["3"]
+        assert cache.get_statistics()["cache_evictions"] == 1
+        cache.ttl = 0
+        time.sleep(0.01)
+        assert cache.get("a") is None
+        assert len(cache) == 1
+
+
+class TestPrefixIndex:
+    """Test the sorted prefix index and the shared history index."""
+
+    def test_prefix_lookup_and_discard(self):
+        """Lookups return the sorted slice sharing a prefix."""
+        index = PrefixIndex(["deploy", "debug", "build", "delete"])
+
+        assert index.keys_with_prefix("de") == ["debug", "delete", "deploy"]
+        assert index.keys_with_prefix("de", limit=2) == ["debug", "delete"]
+        assert index.keys_with_prefix("x") == []
+
+        index.discard("debug")
+        index.discard("missing")
+        assert index.keys_with_prefix("de") == ["delete", "deploy"]
+        assert len(index) == 3
+
+    def test_fold_case(self):
+        """Case-folded indexes match any case and keep the latest spelling."""
+        index = PrefixIndex(["Deploy"], fold_case=True)
+        index.add("DEBUG")
+
+        assert index.keys_with_prefix("de") == ["DEBUG", "Deploy"]
+        assert "deploy" in index
+
+    def test_top_by_score(self):
+        """top() orders by score, then by key, and rescoring moves entries."""
+        index = PrefixIndex()
+        index.update([("git status", 1), ("git push", 3), ("git pull", 3), ("ls", 9)])
+
+        assert index.top("git", 2) == ["git pull", "git push"]
+
+        index.add("git status", 5)
+        assert index.top("git", 3) == ["git status", "git pull", "git push"]
+        assert index.score("git status") == 5
+
+    def test_bulk_and_incremental_updates_agree(self):
+        """Inserting in bulk or one at a time yields the same index."""
+        items = [(f"cmd{i % 97}", i) for i in range(300)]
+        bulk = PrefixIndex()
+        bulk.update(items)
+        incremental = PrefixIndex()
+        for item, score in items:
+            incremental.add(item, score)
+
+        assert bulk.keys_with_prefix("cmd") == incremental.keys_with_prefix("cmd")
+        assert bulk.top("cmd1", 5) == incremental.top("cmd1", 5)
+
+    def test_history_index_extends_and_rebuilds(self):
+        """Appended history extends the shared index; replaced history rebuilds it."""
+        history = ["make test", "make build"]
+        index = history_index(history)
+        history.append("make test")
+
+        assert history_index(history) is index
+        assert index.top("make", 2) == ["make test", "make build"]
+
+        replaced = history_index(["make lint"])
+        assert replaced is not index
+        assert replaced.keys_with_prefix("make") == ["make lint"]
+
+
+class TestFuzzyMatching:
+    """Test the fuzzy scorer, index and provider."""
+
+    def test_subsequence_scoring(self):
+        """Characters must appear in order; boundaries and runs score higher."""
+        assert fuzzy_score("bld", "build") is not None
+        assert fuzzy_score("dlb", "build") is None
+
+        # Word starts, camelCase humps and path segments beat mid-word matches
+        mid_word = fuzzy_score("fb", "xfbx")
+        assert fuzzy_score("fb", "foo_bar") > mid_word
+        assert fuzzy_score("fb", "fooBar") > mid_word
+        assert fuzzy_score("fb", "foo/bar") > fuzzy_score("fb", "foo_bar")
+
+        # Consecutive characters beat scattered ones
+        assert fuzzy_score("test", "pytest") > fuzzy_score("test", "txtxexsxt")
+
+    def test_index_top_k(self):
+        """search() returns the best k matches and can skip prefix matches."""
+        index = FuzzyIndex(["rebuild", "xyz", "src/build.py", "build.py"])
+
+        matches = index.search("bld", 2)
+        assert [candidate for _, candidate in matches] == ["src/build.py", "build.py"]
+        assert matches[0][0] > matches[1][0]
+
+        skipped = index.search("bu", 5, skip_prefix_matches=True)
+        assert "build" not in [candidate for _, candidate in skipped]
+        assert index.search("zzz", 5) == []
+
+    def test_index_extend_and_budget(self):
+        """Extending indexes new candidates once; the budget bounds scoring."""
+        index = FuzzyIndex(["alpha"])
+        index.extend(["alpha", "beta", "alpha_beta"])
+        assert len(index) == 3
+        assert [c for _, c in index.search("ab", 5)] == ["alpha_beta"]
+
+        limited = FuzzyIndex([f"item{i}" for i in range(100)], max_scored=10)
+        assert len(limited.search("im", 50)) == 10
+
+    def test_merge_matches(self):
+        """Merged results keep each candidate's best score."""
+        merged = merge_matches([[(50, "a"), (10, "b")], [(30, "b"), (40, "c")]], 2)
+        assert merged == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_provider_searches_known_candidates(self, tmp_path):
+        """Commands, options, history and files all feed fuzzy matches."""
+        (tmp_path / "setup_tools.py").write_text("")
+        provider = FuzzyMatchProvider()
+        context = CompletionContext(
+            current_word="stl",
+            cwd=tmp_path,
+            available_commands={"stats-list"},
+            available_options={"--style"},
+            history=["git stash list"],
+        )
+
+        completions = await provider.provide_completions(context)
+
+        assert {"stats-list", "--style", "git stash list", "setup_tools.py"} <= set(
+            completions
+        )
+
+
+class TestHistoryStore:
+    """Test the persistent frecency-ranked history store."""
+
+    DAY = 24 * 3600.0
+
+    def test_frecency_ranks_frequent_and_recent(self, tmp_path):
+        """Frequent and recent commands rank above old one-off commands."""
+        store = HistoryStore(tmp_path / "history", half_life=self.DAY)
+        now = 1_700_000_000.0
+        store.record("git status", now - 30 * self.DAY)
+        for hours in (1, 2, 3):
+            store.record("git stash", now - hours * 3600)
+        store.record("git push", now)
+        store.record("ls", now)
+
+        assert store.top("git", 3) == ["git stash", "git push", "git status"]
+        assert store.get("git stash").count == 3
+        assert store.get("git push").last_used == now
+        assert store.frecency("never used") is None
+
+    def test_cached_prefixes_follow_new_uses(self, tmp_path):
+        """Prefix results already asked for are updated as commands are used."""
+        store = HistoryStore(tmp_path / "history")
+        store.record("make build", 100.0)
+        store.record("make test", 200.0)
+        assert store.top("make", 1) == ["make test"]
+
+        store.record("make build", 300.0)
+        store.record("make lint", 400.0)
+
+        fresh = HistoryStore(tmp_path / "history")
+        assert store.top("make", 3) == fresh.top("make", 3)
+        assert store.top("make", 1) == ["make build"]
+
+    def test_shared_log_and_compaction(self, tmp_path, monkeypatch):
+        """Stores see each other's commands; compaction keeps the most frecent."""
+        monkeypatch.setattr(history_store, "_COMPACT_SLACK", 5)
+        path = tmp_path / "history"
+        writer = HistoryStore(path, max_entries=3)
+        reader = HistoryStore(path)
+        for i in range(4):
+            writer.record(f"cmd{i}", 1000.0 + i)
+        assert reader.top("cmd", 10) == ["cmd3", "cmd2", "cmd1", "cmd0"]
+
+        for i in range(6):
+            writer.record("cmd3", 2000.0 + i)
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        assert reader.top("cmd", 10) == ["cmd3", "cmd2", "cmd1"]
+        assert reader.get("cmd3").count == 7
+
+    def test_commands_are_single_log_lines(self, tmp_path):
+        """Tabs and newlines in commands do not corrupt the log."""
+        store = HistoryStore(tmp_path / "history")
+        store.record("echo a\tb\nc", 1.0)
+        store.record("   ", 2.0)
+
+        assert HistoryStore(tmp_path / "history").top("echo", 5) == ["echo a b c"]
+
+    @pytest.mark.asyncio
+    async def test_providers_and_ranking_use_store(self, tmp_path):
+        """History providers and smart ranking read the store's frecency."""
+        store = HistoryStore(tmp_path / "history")
+        store.record("deploy staging", 100.0)
+        store.record("deploy prod", 200.0)
+        context = CompletionContext(current_word="deploy ", history_store=store)
+
+        assert HistoryProvider().can_provide(context)
+        completions = await HistoryProvider().provide_completions(context)
+        assert completions == ["deploy prod", "deploy staging"]
+
+        engine = SmartCompletionEngine(history_store=store)
+        ranked = engine._apply_smart_history_ranking(
+            ["other", "deploy staging", "deploy prod"],
+            SmartCompletionContext(history_store=store),
+        )
+        assert ranked == ["deploy prod", "deploy staging", "other"]
+
+        engine.record_command("deploy staging")
+        assert store.get("deploy staging").count == 2
+
+
 class TestFilePathCompletionProvider:
     """Test FilePathCompletionProvider."""
 
@@ -227,6 +750,296 @@ class TestFilePathCompletionProvider:
         matching = [c for c in completions if c.startswith("test")]
         assert len(matching) >= 2
 
+    @pytest.mark.asyncio
+    async def test_hidden_files_and_context_filtering(self):
+        """Hidden files need a leading dot; config commands get config files."""
+        (self.temp_dir / ".hidden").touch()
+        (self.temp_dir / "test3.yaml").touch()
+
+        context = CompletionContext(current_word="", cwd=self.temp_dir)
+        assert ".hidden" not in await self.provider.provide_completions(context)
+
+        context = CompletionContext(current_word=".h", cwd=self.temp_dir)
+        assert await self.provider.provide_completions(context) == [".hidden"]
+
+        context = CompletionContext(
+            current_word="test", current_command="config", cwd=self.temp_dir
+        )
+        assert await self.provider.provide_completions(context) == ["test3.yaml"]
+
+
+class TestDirectoryListingCache:
+    """Test the mtime-keyed directory listing cache."""
+
+    @pytest.fixture
+    def directory(self, tmp_path, monkeypatch):
+        """A directory with 50 files and one subdirectory, old enough to cache."""
+        monkeypatch.setattr(providers, "_RACY_WINDOW_NS", 0)
+        for i in range(50):
+            (tmp_path / f"file{i:02d}.txt").touch()
+        (tmp_path / "files").mkdir()
+        return tmp_path
+
+    def _wait_until_cached(self, cache, directory):
+        key = os.fspath(directory)
+        for _ in range(200):
+            if cache._cached(key, os.stat(key).st_mtime_ns) is not None:
+                return
+            time.sleep(0.01)
+        pytest.fail("listing was not cached")
+
+    def test_stops_early_and_finishes_in_background(self, directory, monkeypatch):
+        """A scan returns after limit matches; later lookups skip the disk."""
+        cache = DirectoryListingCache()
+
+        assert len(cache.matches(directory, "file", 5)) == 5
+        self._wait_until_cached(cache, directory)
+
+        def no_scandir(path):
+            raise AssertionError("directory was scanned again")
+
+        monkeypatch.setattr(providers.os, "scandir", no_scandir)
+        assert cache.matches(directory, "file", 3) == [
+            "file00.txt",
+            "file01.txt",
+            "file02.txt",
+        ]
+        assert cache.matches(directory, "files", 5) == ["files/"]
+        assert len(cache.matches(directory, "", 100)) == 51
+
+    def test_directory_changes_invalidate(self, directory):
+        """A changed directory mtime discards the cached listing."""
+        cache = DirectoryListingCache()
+        assert cache.matches(directory, "new", 10) == []
+
+        (directory / "new.txt").touch()
+        stat = directory.stat()
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.matches(directory, "new", 10) == ["new.txt"]
+
+    def test_recently_changed_directories_are_not_cached(self, tmp_path):
+        """Listings of directories changed within the racy window are not kept."""
+        cache = DirectoryListingCache()
+        (tmp_path / "a.txt").touch()
+
+        assert cache.matches(tmp_path, "", 10) == ["a.txt"]
+        assert cache._cached(os.fspath(tmp_path), tmp_path.stat().st_mtime_ns) is None
+
+
+# Command tree of a CLI with "run deploy" and "status" commands
+TREE = {
+    "options": ["--help", "--version"],
+    "commands": {
+        "run": {
+            "options": ["--help"],
+            "commands": {"deploy": {"options": ["--help", "--force", "-f"]}},
+        },
+        "status": {"options": ["--help"]},
+    },
+}
+
+
+class TestCompletionServer:
+    """Test the completion server, its client and the shell shims."""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        """A smart engine with file completion and a private history store."""
+        engine = SmartCompletionEngine(history_store=HistoryStore(tmp_path / "history"))
+        engine.register_provider(FilePathCompletionProvider())
+        engine.register_provider(CommandTreeProvider())
+        return engine
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """A directory to complete in."""
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "setup.py").touch()
+        (project / "src").mkdir()
+        return project
+
+    async def _request(self, path, *fields):
+        loop = asyncio.get_running_loop()
+        request = daemon.format_request(*fields)
+        return await loop.run_in_executor(None, daemon.send_request, request, path)
+
+    async def _start(self, server):
+        task = asyncio.ensure_future(server.serve())
+        for _ in range(100):
+            if server.path.exists():
+                return task
+            await asyncio.sleep(0.01)
+        pytest.fail("server did not start")
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path, engine, project):
+        """The server completes relative to the client's directory."""
+        server = daemon.CompletionServer(tmp_path / "run" / "c.sock", engine=engine)
+        task = await self._start(server)
+
+        response = await self._request(
+            server.path, "complete", "python", str(project), "./s", "mycli ./s"
+        )
+        assert sorted(response.splitlines()) == ["./setup.py", "./src/"]
+
+        tree = json.dumps(TREE)
+        response = await self._request(
+            server.path, "complete", "python", str(project), "de", "mycli run de", tree
+        )
+        assert response == "deploy\n"
+
+        await self._request(server.path, "record", "mycli build")
+        assert engine.history_store.top("mycli", 1) == ["mycli build"]
+        assert await self._request(server.path, "ping") == f"{os.getpid()}\n"
+
+        await self._request(server.path, "stop")
+        assert await task is True
+        assert not server.path.exists()
+        assert (tmp_path / "run").stat().st_mode & 0o777 == 0o700
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout_and_single_server(self, tmp_path, engine):
+        """A second server backs off, and an idle server exits."""
+        path = tmp_path / "c.sock"
+        server = daemon.CompletionServer(path, idle_timeout=0.3, engine=engine)
+        task = await self._start(server)
+
+        second = daemon.CompletionServer(path, engine=engine)
+        assert await second.serve() is False
+
+        assert await asyncio.wait_for(task, 5) is True
+        assert not path.exists()
+
+    def test_falls_back_in_process(self, tmp_path, project, monkeypatch):
+        """Without a server, completion runs in-process."""
+        engine = SmartCompletionEngine(history_store=HistoryStore(tmp_path / "h"))
+        monkeypatch.setattr(daemon, "get_smart_completion_registry", lambda: engine)
+
+        completions = daemon.complete(
+            "./s", "mycli ./s", cwd=project, path=tmp_path / "none.sock", spawn=False
+        )
+
+        assert sorted(completions) == ["./setup.py", "./src/"]
+        assert daemon.send_request(b"ping\n", tmp_path / "none.sock") is None
+
+    @pytest.mark.parametrize("shell", daemon.SHELLS)
+    def test_shims(self, shell, tmp_path):
+        """Shims ask the socket and fall back to the module's client."""
+        path = tmp_path / "c.sock"
+        script = daemon.completion_shim(shell, "my-cli", "nodejs", path, tree=TREE)
+
+        assert f"socket={path}" in script or f"socket {path}" in script
+        assert "UNIX-CONNECT:" in script
+        assert (
+            f'{daemon._MODULE} complete --socket "$socket" --language nodejs '
+            '--tree "$tree"'
+        ) in script
+        assert json.dumps(TREE, separators=(",", ":")) in script
+        assert "my-cli" in script and "my_cli" in script
+        if shutil.which(shell):
+            subprocess.run([shell, "-n"], input=script, text=True, check=True)
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not shutil.which("bash"), reason="needs bash")
+    async def test_bash_shim_completes_subcommands(self, tmp_path, engine, project):
+        """The bash shim sends the command tree with its request."""
+        server = daemon.CompletionServer(tmp_path / "c.sock", engine=engine)
+        task = await self._start(server)
+        script = daemon.completion_shim("bash", "mycli", path=server.path, tree=TREE)
+        script += (
+            "COMP_WORDS=(mycli run deploy --f); COMP_CWORD=3\n"
+            'COMP_LINE="mycli run deploy --f"\n'
+            '_goobits_mycli_complete; printf "%s\\n" "${COMPREPLY[@]}"\n'
+        )
+
+        process = await asyncio.create_subprocess_exec(
+            "bash",
+            "-c",
+            script,
+            cwd=project,
+            stdout=asyncio.subprocess.PIPE,
+            env={**os.environ, "PATH": os.defpath},  # no socat: the Python client
+        )
+        output, _ = await process.communicate()
+
+        assert output.decode().splitlines() == ["--force"]
+        await self._request(server.path, "stop")
+        await task
+
+    def test_command_tree(self):
+        """Trees list each command's options and subcommands."""
+        cli = {
+            "root_command": {
+                "options": [{"name": "verbose", "short": "v"}],
+                "subcommands": [
+                    {
+                        "name": "run",
+                        "options": [],
+                        "subcommands": [
+                            {"name": "deploy", "options": [{"name": "force"}]}
+                        ],
+                    }
+                ],
+            }
+        }
+
+        assert daemon.command_tree(cli) == {
+            "options": ["--help", "--version", "--verbose", "-v"],
+            "commands": {
+                "run": {
+                    "options": ["--help"],
+                    "commands": {"deploy": {"options": ["--help", "--force"]}},
+                }
+            },
+        }
+        assert daemon.parse_command_tree("") == {}
+        assert daemon.parse_command_tree("[not json") == {}
+
+    def test_unsupported_shell(self):
+        """Unknown shells are rejected."""
+        with pytest.raises(ValueError, match="powershell"):
+            daemon.completion_shim("powershell", "mycli")
+
+
+class TestCommandTreeProvider:
+    """Test CommandTreeProvider and the command analyzer feeding it."""
+
+    @pytest.fixture
+    def registry(self):
+        """A registry with only the command tree provider."""
+        registry = DynamicCompletionRegistry()
+        registry.register_provider(CommandTreeProvider())
+        return registry
+
+    @pytest.mark.asyncio
+    async def test_completes_subcommands_of_typed_command(self, registry):
+        """Subcommands of the command being typed are offered."""
+        completions = await registry.get_completions(
+            "de", "mycli run de", command_tree=TREE
+        )
+
+        assert completions == ["deploy"]
+        assert await registry.get_completions("", "mycli ", command_tree=TREE) == [
+            "run",
+            "status",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_completes_options_of_typed_command(self, registry):
+        """Words starting with - are completed from the command's options."""
+        completions = await registry.get_completions(
+            "--f", "mycli run deploy --f", command_tree=TREE
+        )
+
+        assert completions == ["--force"]
+
+    @pytest.mark.asyncio
+    async def test_nothing_without_tree(self, registry):
+        """Without a command tree the provider stays out."""
+        assert await registry.get_completions("de", "mycli run de") == []
+
 
 class TestEnvironmentVariableProvider:
     """Test EnvironmentVariableProvider."""
@@ -322,6 +1135,18 @@ class TestHistoryProvider:
         assert "cmd1 different" in completions
         assert "other command" not in completions
 
+    @pytest.mark.asyncio
+    async def test_history_most_recent_first(self):
+        """Repeated commands appear once, most recently used first."""
+        context = CompletionContext(
+            current_word="git",
+            history=["git pull", "git push", "git", "git pull"],
+        )
+
+        completions = await self.provider.provide_completions(context)
+
+        assert completions == ["git pull", "git push"]
+
 
 class TestInteractiveCompletionIntegrator:
     """Test InteractiveCompletionIntegrator."""
@@ -363,10 +1188,11 @@ class TestProviderSetup:
         """Test setting up default providers."""
         providers = setup_default_providers()
 
-        assert len(providers) == 4  # File, Env, Config, History
+        assert len(providers) == 5  # Commands, File, Env, Config, History
 
         # Check types
         provider_types = [type(p).__name__ for p in providers]
+        assert "CommandTreeProvider" in provider_types
         assert "FilePathCompletionProvider" in provider_types
         assert "EnvironmentVariableProvider" in provider_types
         assert "ConfigKeyProvider" in provider_types
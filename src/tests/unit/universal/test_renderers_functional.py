@@ -5,8 +5,12 @@ Tests the actual rendering functionality, template context generation,
 and language-specific code generation for Node.js and TypeScript renderers.
 """
 
+from pathlib import Path
+
 from goobits_cli.universal.renderers.nodejs_renderer import NodeJSRenderer
 
+COMPONENTS_DIR = Path(__file__).parents[3] / "goobits_cli" / "universal" / "components"
+
 
 class TestNodeJSRendererFunctional:
     """Functional tests for NodeJSRenderer with real template rendering"""
@@ -266,3 +270,27 @@ class TestNodeJSRendererFunctional:
         deploy_hook = next(hook for hook in hooks if hook["command_name"] == "deploy")
         assert deploy_hook["name"] == "on_deploy"
         assert deploy_hook["js_name"] == "onDeploy"
+
+    def test_feature_dependencies_are_lazy_loaded(self):
+        """Test that feature-specific dependencies stay off the startup path"""
+        template = (COMPONENTS_DIR / "nodejs_cli_consolidated.j2").read_text()
+
+        def render(**features):
+            ir = {**self.test_ir, "feature_requirements": features}
+            context = self.renderer.get_template_context(ir)
+            return self.renderer.render_component("cli", template, context)
+
+        plain = render()
+        for module in ("winston", "js-yaml", "ora", "async_hooks"):
+            assert f"from '{module}'" not in plain
+        assert "winston" not in plain
+        assert "lazyRequire('js-yaml')" in plain
+        assert "createSpinner" not in plain
+        assert "module.enableCompileCache?.()" in plain
+
+        with_progress = render(progress_features=True)
+        assert "await import('ora')" in with_progress
+
+        without_config = render(config_management=False)
+        assert "class ConfigManager" in without_config
+        assert "from 'js-yaml'" not in without_config
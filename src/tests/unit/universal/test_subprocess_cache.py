@@ -0,0 +1,501 @@
+"""
+Unit tests for the session subprocess cache, its persistent store and
+concurrent use from threads and asyncio tasks.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from goobits_cli.universal.performance.subprocess_cache import (
+    CacheEntry,
+    PersistentCacheStore,
+    SessionSubprocessCache,
+    dependency_watch_paths,
+)
+
+# Prints a fresh value on every run, so cache hits are observable
+PROBE = [sys.executable, "-c", "import time; print(time.perf_counter_ns())"]
+
+
+def _entry(stdout: str, age: float = 0.0, ttl: float = 60.0) -> CacheEntry:
+    result = subprocess.CompletedProcess(["tool", "--version"], 0, stdout, "")
+    return CacheEntry(result=result, timestamp=time.time() - age, ttl=ttl)
+
+
+def _counting_probe(log: Path, delay: float = 0.3) -> List[str]:
+    """A slow command that records each execution in log."""
+    code = (
+        "import sys, time; "
+        f"open({str(log)!r}, 'a').write('run\\n'); "
+        f"time.sleep({delay}); print('done')"
+    )
+    return [sys.executable, "-c", code]
+
+
+def _runs(log: Path) -> int:
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PersistentCacheStore(tmp_path / "cache" / "results.db")
+
+
+class TestPersistentCacheStore:
+    """Tests for the SQLite-backed store shared across processes."""
+
+    def test_round_trip_keeps_ttl(self, store):
+        """Stored entries come back with their result and original TTL."""
+        entry = _entry("tool 1.0\n", age=5, ttl=600)
+        store.put("key", entry)
+
+        loaded = store.get("key")
+        assert loaded.result.args == ["tool", "--version"]
+        assert loaded.result.stdout == "tool 1.0\n"
+        assert loaded.ttl == 600
+        assert loaded.timestamp == pytest.approx(entry.timestamp)
+        assert not loaded.is_expired()
+
+    def test_expired_entries_are_misses(self, store):
+        """An entry past its TTL is not returned."""
+        store.put("old", _entry("stale", age=120, ttl=60))
+
+        assert store.get("old") is None
+        assert store.get_stats()["entries"] == 0
+
+    def test_size_limit_drops_oldest(self, tmp_path):
+        """Captured output beyond max_bytes evicts the oldest entries."""
+        store = PersistentCacheStore(tmp_path / "results.db", max_bytes=250)
+        for index in range(5):
+            store.put(f"k{index}", _entry("x" * 100, age=10 - index))
+        store.put("huge", _entry("x" * 1000))
+
+        assert [store.get(f"k{i}") is not None for i in range(5)] == [
+            False,
+            False,
+            False,
+            True,
+            True,
+        ]
+        assert store.get("huge") is None
+        assert store.get_stats()["bytes"] == 200
+
+    def test_invalidate_and_clear(self, store):
+        """Pattern invalidation matches the command, clear drops everything."""
+        store.put("a", _entry("1"))
+
+        assert store.invalidate_pattern("TOOL --ver") == 1
+        store.put("a", _entry("1"))
+        store.clear()
+        assert store.get("a") is None
+
+    def test_unwritable_location_degrades_to_miss(self, tmp_path):
+        """A store that cannot be created behaves like an empty cache."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        store = PersistentCacheStore(blocker / "results.db")
+
+        store.put("key", _entry("1"))
+        assert store.get("key") is None
+
+
+class TestSessionSubprocessCachePersistence:
+    """Tests for reusing persisted results across cache instances."""
+
+    def test_persisted_result_reused_by_new_session(self, tmp_path):
+        """A second process (modelled by a new cache) skips the subprocess."""
+        path = tmp_path / "results.db"
+        first = SessionSubprocessCache(store=PersistentCacheStore(path))
+        result = first.run_cached(PROBE, persist=True)
+
+        second = SessionSubprocessCache(store=PersistentCacheStore(path))
+        assert second.run_cached(PROBE, persist=True).stdout == result.stdout
+        assert second.get_stats()["persistent"]["entries"] == 1
+
+    def test_results_are_not_persisted_without_opt_in(self, tmp_path):
+        """Only calls with persist=True touch the store."""
+        path = tmp_path / "results.db"
+        first = SessionSubprocessCache(store=PersistentCacheStore(path))
+        result = first.run_cached(PROBE)
+
+        second = SessionSubprocessCache(store=PersistentCacheStore(path))
+        assert second.run_cached(PROBE, persist=True).stdout != result.stdout
+
+    def test_force_refresh_rewrites_store(self, tmp_path):
+        """force_refresh runs the command again and replaces the stored result."""
+        path = tmp_path / "results.db"
+        cache = SessionSubprocessCache(store=PersistentCacheStore(path))
+        first = cache.run_cached(PROBE, persist=True)
+        refreshed = cache.run_cached(PROBE, persist=True, force_refresh=True)
+
+        assert refreshed.stdout != first.stdout
+        fresh = SessionSubprocessCache(store=PersistentCacheStore(path))
+        assert fresh.run_cached(PROBE, persist=True).stdout == refreshed.stdout
+
+    def test_call_options_are_part_of_the_key(self, tmp_path):
+        """Calls differing in env, text or check do not share a result."""
+        path = tmp_path / "results.db"
+        cache = SessionSubprocessCache(store=PersistentCacheStore(path))
+        env = dict(os.environ, PROBE_MODE="a")
+        first = cache.run_cached(PROBE, persist=True, env=env)
+
+        fresh = SessionSubprocessCache(store=PersistentCacheStore(path))
+        assert fresh.run_cached(PROBE, persist=True, env=env).stdout == first.stdout
+        other_env = dict(env, PROBE_MODE="b")
+        assert fresh.run_cached(PROBE, persist=True, env=other_env).stdout != (
+            first.stdout
+        )
+        assert isinstance(
+            fresh.run_cached(PROBE, persist=True, text=False).stdout, bytes
+        )
+        unchecked = fresh.run_cached(PROBE, persist=True, env=env, check=False)
+        assert unchecked.stdout != first.stdout
+
+
+class TestBoundedCache:
+    """Tests for LRU eviction, the byte budget, lazy expiry and statistics."""
+
+    def test_hits_refresh_recency(self):
+        """The least recently used entry is evicted, not the oldest one."""
+        cache = SessionSubprocessCache(max_entries=2)
+        first = cache.run_cached(["echo", "a"])
+        cache.run_cached(["echo", "b"])
+        assert cache.run_cached(["echo", "a"]) is first
+        cache.run_cached(["echo", "c"])
+
+        assert [entry.result.stdout for entry in cache.cache.values()] == [
+            "a\n",
+            "c\n",
+        ]
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        """Entries are evicted to fit max_bytes and oversized ones are skipped."""
+        cache = SessionSubprocessCache(max_bytes=250)
+        for index in range(3):
+            cache.run_cached(["printf", f"{index}" * 100])
+        assert cache.get_stats()["bytes_held"] == 200
+        assert len(cache.cache) == 2
+
+        cache.run_cached(["printf", "x" * 300])
+        assert cache.get_stats()["bytes_held"] == 200
+        assert len(cache.cache) == 2
+
+    def test_expired_entries_are_dropped_on_lookup(self):
+        """An expired entry is removed and re-run when next requested."""
+        cache = SessionSubprocessCache()
+        cache.run_cached(PROBE)
+        (entry,) = cache.cache.values()
+        entry.timestamp -= 3600
+
+        assert cache.run_cached(PROBE).stdout != entry.result.stdout
+        assert len(cache.cache) == 1
+        assert (
+            cache.get_stats()["bytes_held"] == cache.cache[next(iter(cache.cache))].size
+        )
+
+    def test_stats_count_lookups(self):
+        """hit_rate is hits over lookups and clear releases the byte count."""
+        cache = SessionSubprocessCache()
+        for _ in range(3):
+            cache.run_cached(["echo", "a"])
+        cache.run_cached(["echo", "b"])
+
+        stats = cache.get_stats()
+        assert (stats["total_hits"], stats["misses"]) == (2, 2)
+        assert stats["hit_rate"] == 0.5
+        assert stats["bytes_held"] == 4
+        cache.clear()
+        assert cache.get_stats()["bytes_held"] == 0
+
+
+def _touch(path: Path, content: str) -> None:
+    """Rewrite a file and move its mtime forward, even on coarse clocks."""
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestWatchedPaths:
+    """Tests for invalidation by the stat signatures of watched paths."""
+
+    def test_change_to_watched_file_invalidates(self, tmp_path):
+        """Editing a watched lockfile reruns the command, other hits are kept."""
+        lockfile = tmp_path / "package-lock.json"
+        lockfile.write_text("{}")
+        cache = SessionSubprocessCache()
+        first = cache.run_cached(PROBE, cwd=tmp_path, watch=["package-lock.json"])
+
+        assert (
+            cache.run_cached(PROBE, cwd=tmp_path, watch=["package-lock.json"]) is first
+        )
+        _touch(lockfile, '{"v": 2}')
+        second = cache.run_cached(PROBE, cwd=tmp_path, watch=["package-lock.json"])
+        assert second.stdout != first.stdout
+
+    def test_created_and_removed_paths_invalidate(self, tmp_path):
+        """A watched path that appears or disappears also invalidates."""
+        cache = SessionSubprocessCache()
+        first = cache.run_cached(PROBE, cwd=tmp_path, watch=["Cargo.lock"])
+        (tmp_path / "Cargo.lock").write_text("")
+
+        second = cache.run_cached(PROBE, cwd=tmp_path, watch=["Cargo.lock"])
+        assert second.stdout != first.stdout
+        (tmp_path / "Cargo.lock").unlink()
+        assert cache.run_cached(PROBE, cwd=tmp_path, watch=["Cargo.lock"]) is not second
+
+    def test_watched_entries_get_long_ttl(self, tmp_path):
+        """Watched entries use watched_ttl unless a ttl is passed."""
+        cache = SessionSubprocessCache()
+        cache.run_cached(["git", "--version"], cwd=tmp_path, watch=["pyproject.toml"])
+        cache.run_cached(["echo", "x"], cwd=tmp_path, watch=["a"], ttl=5)
+
+        ttls = sorted(entry.ttl for entry in cache.cache.values())
+        assert ttls == [5, cache.watched_ttl]
+
+    def test_persisted_signatures_are_checked(self, tmp_path):
+        """A later process does not reuse a persisted result made stale."""
+        path = tmp_path / "results.db"
+        manifest = tmp_path / "pyproject.toml"
+        manifest.write_text("")
+        first = SessionSubprocessCache(store=PersistentCacheStore(path))
+        result = first.run_cached(PROBE, cwd=tmp_path, watch=[manifest], persist=True)
+
+        second = SessionSubprocessCache(store=PersistentCacheStore(path))
+        reused = second.run_cached(PROBE, cwd=tmp_path, watch=[manifest], persist=True)
+        assert reused.stdout == result.stdout
+        _touch(manifest, "[project]")
+        third = SessionSubprocessCache(store=PersistentCacheStore(path))
+        rerun = third.run_cached(PROBE, cwd=tmp_path, watch=[manifest], persist=True)
+        assert rerun.stdout != result.stdout
+
+    def test_dependency_watch_paths(self, tmp_path):
+        """The default paths cover lockfiles, manifests and site-packages."""
+        names = {path.name for path in dependency_watch_paths(tmp_path)}
+
+        assert {"package-lock.json", "Cargo.lock", "pyproject.toml"} <= names
+        assert "site-packages" in names or "dist-packages" in names
+
+
+class TestRunMany:
+    """Tests for running independent probes as one batch."""
+
+    def test_results_keep_order_and_respect_limit(self, tmp_path):
+        """Commands overlap up to max_concurrency and results keep input order."""
+        log = tmp_path / "runs.log"
+        code = (
+            "import sys, time; "
+            f"open({str(log)!r}, 'a').write(f'{{time.time()}} start\\n'); "
+            "time.sleep(0.3); "
+            f"open({str(log)!r}, 'a').write(f'{{time.time()}} end\\n'); "
+            "print(sys.argv[1])"
+        )
+        cmds = [[sys.executable, "-c", code, str(i)] for i in range(6)]
+        cache = SessionSubprocessCache()
+
+        started = time.perf_counter()
+        results = cache.run_many(cmds, max_concurrency=3)
+        elapsed = time.perf_counter() - started
+
+        assert [result.stdout for result in results] == [f"{i}\n" for i in range(6)]
+        assert elapsed < 6 * 0.3
+        events = sorted(
+            (float(stamp), kind)
+            for stamp, kind in (line.split() for line in log.read_text().splitlines())
+        )
+        running = peak = 0
+        for _, kind in events:
+            running += 1 if kind == "start" else -1
+            peak = max(peak, running)
+        assert peak <= 3
+
+    def test_composes_with_cache_and_coalescing(self, tmp_path):
+        """Duplicates in a batch run once and later batches hit the cache."""
+        log = tmp_path / "runs.log"
+        cmd = _counting_probe(log)
+        cache = SessionSubprocessCache()
+
+        first = cache.run_many([cmd, cmd, cmd])
+        assert cache.run_many([cmd]) == [first[0]]
+        assert _runs(log) == 1
+        assert all(result is first[0] for result in first)
+
+    def test_failures_and_per_command_timeouts(self):
+        """Timeouts apply per command and failures are raised or returned."""
+        cache = SessionSubprocessCache()
+        cmds = [
+            ["echo", "ok"],
+            [sys.executable, "-c", "import time; time.sleep(5)"],
+            [sys.executable, "-c", "exit(2)"],
+        ]
+
+        outcomes = cache.run_many(
+            cmds, timeout=[None, 0.2, None], return_exceptions=True
+        )
+        assert outcomes[0].stdout == "ok\n"
+        assert isinstance(outcomes[1], subprocess.TimeoutExpired)
+        assert isinstance(outcomes[2], subprocess.CalledProcessError)
+        with pytest.raises(subprocess.CalledProcessError):
+            cache.run_many([cmds[0], cmds[2]])
+        with pytest.raises(ValueError):
+            cache.run_many(cmds, timeout=[1])
+
+    def test_async_batch(self, tmp_path):
+        """run_many_async keeps order and shares the cache with run_many."""
+        cache = SessionSubprocessCache()
+        cmds = [["echo", str(i)] for i in range(5)]
+
+        async def main():
+            return await cache.run_many_async(cmds, max_concurrency=2)
+
+        results = asyncio.run(main())
+        assert [result.stdout for result in results] == [f"{i}\n" for i in range(5)]
+        assert cache.run_many(cmds) == results
+
+
+class TestConcurrentCallers:
+    """Tests for single-flight coalescing and thread safety."""
+
+    def test_threads_share_one_execution(self, tmp_path):
+        """Concurrent callers of the same command wait for the first run."""
+        log = tmp_path / "runs.log"
+        cmd = _counting_probe(log)
+        cache = SessionSubprocessCache()
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: cache.run_cached(cmd), range(16)))
+
+        assert _runs(log) == 1
+        assert all(result is results[0] for result in results)
+        assert results[0].stdout == "done\n"
+
+    def test_failures_reach_every_waiter(self, tmp_path):
+        """A failed run raises in all coalesced callers and is not cached."""
+        cmd = [sys.executable, "-c", "import time, sys; time.sleep(0.2); sys.exit(4)"]
+        cache = SessionSubprocessCache()
+
+        def call(_):
+            with pytest.raises(subprocess.CalledProcessError) as info:
+                cache.run_cached(cmd)
+            return info.value.returncode
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert set(pool.map(call, range(8))) == {4}
+        assert cache.get_stats()["total_entries"] == 0
+
+    def test_full_cache_does_not_deadlock(self):
+        """Evicting while storing a result must not re-acquire the lock."""
+        cache = SessionSubprocessCache(max_entries=5)
+        worker = threading.Thread(
+            target=lambda: [cache.run_cached(["echo", str(i)]) for i in range(12)],
+            daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=30)
+
+        assert not worker.is_alive()
+        assert cache.get_stats()["total_entries"] <= 5
+
+    def test_stress_many_threads_small_cache(self):
+        """Heavy concurrent use with constant eviction stays consistent."""
+        cache = SessionSubprocessCache(max_entries=4)
+        errors = []
+
+        def hammer(seed):
+            try:
+                for i in range(40):
+                    key = str((seed * 7 + i) % 10)
+                    assert cache.run_cached(["echo", key]).stdout == f"{key}\n"
+            except BaseException as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        threads = [threading.Thread(target=hammer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert errors == []
+        assert cache.get_stats()["total_entries"] <= 4
+        assert cache._inflight == {}
+
+
+class TestRunCachedAsync:
+    """Tests for the asyncio-based API."""
+
+    def test_tasks_share_one_execution(self, tmp_path):
+        """Concurrent tasks coalesce and later calls hit the cache."""
+        log = tmp_path / "runs.log"
+        cmd = _counting_probe(log)
+        cache = SessionSubprocessCache()
+
+        async def main():
+            results = await asyncio.gather(
+                *(cache.run_cached_async(cmd) for _ in range(10))
+            )
+            again = await cache.run_cached_async(cmd)
+            return results, again
+
+        results, again = asyncio.run(main())
+        assert _runs(log) == 1
+        assert {result.stdout for result in results} == {"done\n"}
+        assert again is results[0]
+
+    def test_async_waits_for_thread_run(self, tmp_path):
+        """A task joins a run already started by run_cached in a thread."""
+        log = tmp_path / "runs.log"
+        cmd = _counting_probe(log)
+        cache = SessionSubprocessCache()
+
+        async def main():
+            thread_run = asyncio.get_running_loop().run_in_executor(
+                None, cache.run_cached, cmd
+            )
+            await asyncio.sleep(0.1)
+            return await asyncio.gather(thread_run, cache.run_cached_async(cmd))
+
+        from_thread, from_task = asyncio.run(main())
+        assert _runs(log) == 1
+        assert from_task is from_thread
+
+    def test_check_timeout_and_bytes(self):
+        """check, timeout and text behave like subprocess.run."""
+        cache = SessionSubprocessCache()
+
+        async def main():
+            with pytest.raises(subprocess.CalledProcessError):
+                await cache.run_cached_async([sys.executable, "-c", "exit(3)"])
+            with pytest.raises(subprocess.TimeoutExpired):
+                await cache.run_cached_async(
+                    [sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2
+                )
+            return await cache.run_cached_async(["echo", "raw"], text=False)
+
+        assert asyncio.run(main()).stdout == b"raw\n"
+
+    def test_cancelled_runner_hands_over_to_waiter(self, tmp_path):
+        """When the task running a command is cancelled, a waiter runs it."""
+        log = tmp_path / "runs.log"
+        cmd = _counting_probe(log, delay=0.5)
+        cache = SessionSubprocessCache()
+
+        async def main():
+            runner = asyncio.ensure_future(cache.run_cached_async(cmd))
+            await asyncio.sleep(0.1)
+            waiter = asyncio.ensure_future(cache.run_cached_async(cmd))
+            await asyncio.sleep(0.1)
+            runner.cancel()
+            return await waiter
+
+        assert asyncio.run(main()).stdout == "done\n"
+        assert _runs(log) == 2
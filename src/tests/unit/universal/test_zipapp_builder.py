@@ -0,0 +1,221 @@
+"""Tests for the reproducible, cached zipapp builder used by Python consolidation."""
+
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from goobits_cli.core.errors import DependencyError, GeneratorError
+from goobits_cli.universal.engine import Orchestrator
+from goobits_cli.universal.renderers import PythonRenderer
+from goobits_cli.universal.renderers.zipapp import ZipappBuilder
+
+SOURCES = {
+    "cli.py": "import cli_hooks\n\ndef main():\n    cli_hooks.greet()\n    return 3\n",
+    "cli_hooks.py": "def greet():\n    print('hello from zipapp')\n",
+}
+
+
+class TestZipappBuilder:
+    """Tests for ZipappBuilder."""
+
+    def test_identical_inputs_produce_identical_bytes(self, tmp_path):
+        """Separate caches build byte-identical archives for the same inputs."""
+        first = ZipappBuilder(cache_dir=tmp_path / "a").build(SOURCES, "cli:main")
+        second = ZipappBuilder(cache_dir=tmp_path / "b").build(SOURCES, "cli:main")
+
+        assert first.input_hash == second.input_hash
+        assert first.path.read_bytes() == second.path.read_bytes()
+
+    def test_unchanged_inputs_skip_rebuild(self, tmp_path):
+        """A second build with the same inputs reuses the cached archive."""
+        builder = ZipappBuilder(cache_dir=tmp_path)
+        first = builder.build(SOURCES, "cli:main")
+        mtime = first.path.stat().st_mtime_ns
+
+        second = builder.build(SOURCES, "cli:main")
+
+        assert not first.cached
+        assert second.cached
+        assert second.path == first.path
+        assert second.path.stat().st_mtime_ns == mtime
+
+    def test_changed_source_changes_hash(self, tmp_path):
+        """Any source change produces a new archive."""
+        builder = ZipappBuilder(cache_dir=tmp_path)
+        changed = {**SOURCES, "cli_hooks.py": "def greet():\n    print('changed')\n"}
+
+        assert builder.input_hash(SOURCES, "cli:main") != builder.input_hash(
+            changed, "cli:main"
+        )
+
+    def test_archive_is_runnable(self, tmp_path):
+        """The archive runs its entry point and propagates the exit code."""
+        result = ZipappBuilder(cache_dir=tmp_path).build(SOURCES, "cli:main")
+
+        with zipfile.ZipFile(result.path) as zf:
+            assert sorted(zf.namelist()) == ["__main__.py", "cli.py", "cli_hooks.py"]
+            assert {info.date_time for info in zf.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+        run = subprocess.run(
+            [sys.executable, str(result.path)], capture_output=True, text=True
+        )
+        assert run.returncode == 3
+        assert "hello from zipapp" in run.stdout
+
+    def test_nested_modules_are_importable(self, tmp_path):
+        """Sources keep their directories, which become importable packages."""
+        sources = {
+            "pkg/cli.py": SOURCES["cli.py"],
+            "cli_hooks.py": SOURCES["cli_hooks.py"],
+        }
+        result = ZipappBuilder(cache_dir=tmp_path).build(sources, "pkg.cli:main")
+
+        with zipfile.ZipFile(result.path) as zf:
+            assert "pkg/__init__.py" in zf.namelist()
+
+        run = subprocess.run(
+            [sys.executable, str(result.path)], capture_output=True, text=True
+        )
+        assert run.returncode == 3
+        assert "hello from zipapp" in run.stdout
+
+    def test_offline_install_failure_raises_dependency_error(
+        self, tmp_path, monkeypatch
+    ):
+        """Unresolvable requirements surface as DependencyError."""
+        builder = ZipappBuilder(cache_dir=tmp_path)
+        monkeypatch.setattr(
+            builder,
+            "_pip",
+            lambda args: subprocess.CompletedProcess(args, 1, "", "no network"),
+        )
+
+        with pytest.raises(DependencyError):
+            builder.build(SOURCES, "cli:main", requirements=["click"])
+        assert not list((tmp_path / "site").glob("*/"))
+
+
+class TestPythonRendererConsolidation:
+    """Tests for PythonRenderer.consolidate_files."""
+
+    def test_consolidate_writes_zipapp(self, tmp_path, monkeypatch):
+        """Python files are replaced by a zipapp in the output directory."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        renderer = PythonRenderer(consolidate=True)
+        monkeypatch.setattr(renderer, "zipapp_requirements", ())
+
+        files = {
+            "pkg/cli.py": SOURCES["cli.py"],
+            "pkg/cli_hooks.py": SOURCES["cli_hooks.py"],
+            "setup.sh": "#!/bin/bash\n",
+        }
+        remaining = renderer.consolidate_files(files, tmp_path / "out")
+
+        assert remaining == {"setup.sh": "#!/bin/bash\n"}
+        archive = tmp_path / "out" / "pkg" / "cli.pyz"
+        assert archive.exists()
+        assert archive.read_bytes().startswith(b"#!/usr/bin/env python3\n")
+
+    def test_consolidate_keeps_relative_paths(self, tmp_path, monkeypatch):
+        """Modules keep their paths in the archive; hooks go where they are imported."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        renderer = PythonRenderer(consolidate=True)
+        monkeypatch.setattr(renderer, "zipapp_requirements", ())
+
+        files = {
+            "src/pkg/cli.py": "import cli_hooks as hooks_module\n\ndef main():\n    return 0\n",
+            "src/pkg/util/helpers.py": "",
+            "pkg/cli_hooks.py": "",
+        }
+        renderer.consolidate_files(files, tmp_path / "out")
+
+        with zipfile.ZipFile(tmp_path / "out" / "src" / "pkg" / "cli.pyz") as zf:
+            names = set(zf.namelist())
+            main = zf.read("__main__.py").decode()
+        assert {"pkg/cli.py", "pkg/util/helpers.py", "cli_hooks.py"} <= names
+        assert "from pkg.cli import main" in main
+
+    def test_consolidate_rejects_colliding_paths(self, tmp_path, monkeypatch):
+        """Two modules that map to the same archive path are an error."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        files = {
+            "cli.py": SOURCES["cli.py"],
+            "src/helpers.py": "A = 1\n",
+            "helpers.py": "A = 2\n",
+        }
+
+        with pytest.raises(GeneratorError, match="helpers.py"):
+            PythonRenderer(consolidate=True).consolidate_files(files, tmp_path)
+
+    def test_single_file_is_left_alone(self, tmp_path):
+        """Nothing to consolidate when there is only one Python file."""
+        files = {"cli.py": SOURCES["cli.py"], "setup.sh": ""}
+
+        assert PythonRenderer().consolidate_files(files, Path(tmp_path)) == files
+
+    def test_generate_with_consolidate_writes_zipapp(self, tmp_path, monkeypatch):
+        """Orchestrator.generate(consolidate=True) bundles the existing hooks."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.setattr(PythonRenderer, "zipapp_requirements", ())
+        config = {
+            "package_name": "demo_cli",
+            "command_name": "demo",
+            "display_name": "Demo CLI",
+            "description": "Demo",
+            "language": "python",
+            "cli": {
+                "name": "demo",
+                "tagline": "Demo",
+                "commands": {"hello": {"desc": "Say hello"}},
+            },
+        }
+        config_path = tmp_path / "goobits.yaml"
+        config_path.write_text(yaml.safe_dump(config))
+
+        out = tmp_path / "out"
+        generated = Orchestrator().generate(config_path, "python", out)
+        hooks = next(path for path in generated if "hooks" in path.name)
+        hooks.write_text("# user implementation\n")
+
+        written = Orchestrator().generate(config_path, "python", out, consolidate=True)
+
+        assert all(path.suffix != ".py" for path in written)
+        archive = next(out.rglob("*.pyz"))
+        with zipfile.ZipFile(archive) as bundle:
+            assert bundle.read(hooks.name) == b"# user implementation\n"
+
+    def test_first_consolidated_build_writes_hooks_stub(self, tmp_path, monkeypatch):
+        """A consolidated build into a fresh directory still writes the hooks stub."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+        monkeypatch.setattr(PythonRenderer, "zipapp_requirements", ())
+        config = {
+            "package_name": "demo_cli",
+            "command_name": "demo",
+            "display_name": "Demo CLI",
+            "description": "Demo",
+            "language": "python",
+            "cli": {
+                "name": "demo",
+                "tagline": "Demo",
+                "commands": {"hello": {"desc": "Say hello"}},
+            },
+        }
+        config_path = tmp_path / "goobits.yaml"
+        config_path.write_text(yaml.safe_dump(config))
+
+        out = tmp_path / "out"
+        written = Orchestrator().generate(config_path, "python", out, consolidate=True)
+
+        hooks = [path for path in written if "hooks" in path.name]
+        assert len(hooks) == 1 and hooks[0].exists()
+        run = subprocess.run(
+            [sys.executable, str(next(out.rglob("*.pyz"))), "--help"],
+            capture_output=True,
+            text=True,
+        )
+        assert run.returncode == 0, run.stderr
+        assert "hello" in run.stdout